@@ -1,22 +1,34 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
 import streamlit.components.v1 as components 
 import math
 
+from pallet_opt import (Incremental, ResultCache, cached_pallet, header_html, layout_geometry, pallet_boxes, pallet_unit,
+                        viewer_html)
+from pallet_opt.anytime import DEFAULT_TIME_BUDGET, AnytimeLayer
+from pallet_opt.layers import MIN_DIM, check_box
+from pallet_opt.report import pallet_report, workbook_bytes
+from pallet_opt.profiling import Profiler, enabled_by_env, read_log, summarize
+from pallet_opt.notify import API_BASE, TelegramNotifier
+
 TOKEN = st.secrets.get("TELEGRAM_TOKEN", "TON_TOKEN_BOT_TELEGRAM") 
 CHAT_ID = st.secrets.get("TELEGRAM_CHAT_ID", "")
+# Serveur de test local : python -m pallet_opt.notify stub
+TELEGRAM_API = st.secrets.get("TELEGRAM_API_BASE", API_BASE)
+
+# Un thread d'envoi par processus, partagé par toutes les sessions
+@st.cache_resource
+def get_notifier():
+    return TelegramNotifier(TOKEN, CHAT_ID, api_base=TELEGRAM_API)
 
 def send_telegram_feedback(name, message):
+    # Dépôt dans la file d'envoi : rend la main immédiatement, l'envoi
+    # (nouvelles tentatives, fichier d'attente) se fait en arrière-plan
     if TOKEN == "TON_TOKEN_BOT_TELEGRAM":
-        return 
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
+        return True
     text = f"🚀 *Nouvel avis sur l'app PALLET OPTIMIZER *\n\n*Nom:* {name}\n*Message:* {message}"
-    try:
-        requests.post(url, json={"chat_id": CHAT_ID, "text": text, "parse_mode": "Markdown"})
-    except:
-        pass
+    return get_notifier().submit(text)
 
 # --- 1. CONFIGURATION DE LA PAGE ---
 st.set_page_config(
@@ -26,6 +38,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Profilage opt-in (PALLET_OPT_PROFILE=1 ou ?debug=1) : durée de chaque étape
+# du rerun, journalisée pour les percentiles p50 / p95
+prof = Profiler("app", enabled=enabled_by_env() or st.query_params.get("debug") == "1")
+
+# Cache de résultats commun à toutes les sessions
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# Étapes du calcul mémoïsées par session : un rerun ne recalcule que celles
+# dont une entrée a changé (le poids d'une box ne relance pas la géométrie)
+if 'incremental' not in st.session_state:
+    st.session_state.incremental = Incremental()
+inc = st.session_state.incremental
+inc.begin(prof)
+
 # Initialisation des états pour la navigation
 if 'view_mode' not in st.session_state:
     st.session_state.view_mode = 'dashboard'
@@ -95,6 +123,21 @@ def local_css():
             background-color: #ffffff;
             border-right: 1px solid #eaeaea;
         }
+
+        /* Bouton du formulaire d'avis, forcé en orange sur tous les états */
+        button[kind="primaryFormSubmit"] {
+            background-color: #e67e22 !important;
+            color: white !important;
+            border: none !important;
+        }
+        button[kind="primaryFormSubmit"]:hover,
+        button[kind="primaryFormSubmit"]:active,
+        button[kind="primaryFormSubmit"]:focus {
+            background-color: #d35400 !important;
+            color: white !important;
+            border: none !important;
+            box-shadow: none !important;
+        }
         </style>
         """,
         unsafe_allow_html=True
@@ -113,15 +156,15 @@ with st.sidebar:
     
     # On utilise key="..." pour lier ces champs au session_state
     with st.expander("🏗️ Dimensions Palette", expanded=True):
-        pal_L = st.number_input("Longueur Palette (cm)", value=120.0, key="pal_L")
-        pal_w = st.number_input("Largeur Palette (cm)", value=80.0, key="pal_w")
-        pal_H = st.number_input("Hauteur Max (cm)", value=200.0, key="pal_H")
+        pal_L = st.number_input("Longueur Palette (cm)", value=120.0, min_value=MIN_DIM, key="pal_L")
+        pal_w = st.number_input("Largeur Palette (cm)", value=80.0, min_value=MIN_DIM, key="pal_w")
+        pal_H = st.number_input("Hauteur Max (cm)", value=200.0, min_value=MIN_DIM, key="pal_H")
         pal_p_max = st.number_input("Poids Max (kg)", value=1000.0, key="pal_p_max")
 
     with st.expander("📦 Dimensions Box", expanded=True):
-        L = st.number_input("Longueur Box (cm)", value=45.0, key="L")
-        W = st.number_input("Largeur Box (cm)", value=35.0, key="W")
-        H = st.number_input("Hauteur Box (cm)", value=25.0, key="H")
+        L = st.number_input("Longueur Box (cm)", value=45.0, min_value=MIN_DIM, key="L")
+        W = st.number_input("Largeur Box (cm)", value=35.0, min_value=MIN_DIM, key="W")
+        H = st.number_input("Hauteur Box (cm)", value=25.0, min_value=MIN_DIM, key="H")
         box_poids = st.number_input("Poids Unitaire (kg)", value=15.0, key="box_poids")
 
 # --- 4. MODE PARAMÈTRES PLEINE PAGE (CORRECTION CALLBACK) ---
@@ -133,16 +176,16 @@ if st.session_state.view_mode == 'settings':
     # Ici on affiche les champs. Les valeurs par défaut viennent des variables actuelles (sidebar)
     with col_full1:
         st.subheader("Dimensions du Support")
-        st.number_input("Longueur Palette (cm)", value=pal_L, key="full_pal_L")
-        st.number_input("Largeur Palette (cm)", value=pal_w, key="full_pal_w")
-        st.number_input("Hauteur Palette (cm)", value=pal_H, key="full_pal_H")
+        st.number_input("Longueur Palette (cm)", value=pal_L, min_value=MIN_DIM, key="full_pal_L")
+        st.number_input("Largeur Palette (cm)", value=pal_w, min_value=MIN_DIM, key="full_pal_w")
+        st.number_input("Hauteur Palette (cm)", value=pal_H, min_value=MIN_DIM, key="full_pal_H")
         st.number_input("Poids Limite (kg)", value=pal_p_max, key="full_pal_p")
     
     with col_full2:
         st.subheader("Dimensions du Colis")
-        st.number_input("Longueur Box (cm)", value=L, key="full_L")
-        st.number_input("Largeur Box (cm)", value=W, key="full_W")
-        st.number_input("Hauteur Box (cm)", value=H, key="full_H")
+        st.number_input("Longueur Box (cm)", value=L, min_value=MIN_DIM, key="full_L")
+        st.number_input("Largeur Box (cm)", value=W, min_value=MIN_DIM, key="full_W")
+        st.number_input("Hauteur Box (cm)", value=H, min_value=MIN_DIM, key="full_H")
         st.number_input("Poids par Box (kg)", value=box_poids, key="full_poids")
 
     st.markdown("<br><br>", unsafe_allow_html=True)
@@ -166,72 +209,73 @@ if st.session_state.view_mode == 'settings':
 
 # --- 5. ALGORITHME DE CALCUL ---
 # (Utilise les variables pal_L, etc. qui sont mises à jour par la sidebar ou le callback)
-orientations = [(L,W,H), (L,H,W), (W,L,H), (W,H,L), (H,L,W), (H,W,L)]
-results = []
-
-for i, (bl, bw, bh) in enumerate(orientations):
-    nx, ny = (int(pal_L / bl) if bl > 0 else 0), (int(pal_w / bw) if bw > 0 else 0)
-    pc = nx * ny
-    nc_vol = int(pal_H / bh) if bh > 0 else 0
-    t_vol = pc * nc_vol
-    max_p = int(pal_p_max / box_poids) if box_poids > 0 else t_vol
-    total = min(t_vol, max_p)
-    nc_final = total // pc if pc > 0 else 0
-    
-    results.append({
-        "Orientation": f"{bl}x{bw}",
-        "Hauteur": bh,
-        "Total": total,
-        "Par Couche": pc,
-        "Nb Couches": nc_final,
-        "Poids (kg)": total * box_poids,
-        "nx": nx,
-        "ny": ny
-    })
-
-best = max(results, key=lambda x: x['Total'])
+# Couches mixtes (blocs tournés / non tournés) si elles battent la grille simple.
+# Le résultat est partagé entre toutes les sessions via le cache disque ; en
+# cas d'absence, seule l'étape de poids est recalculée si les dimensions
+# n'ont pas changé.
+try:
+    check_box(pal_L, pal_w, L, W, H)
+except ValueError as exc:
+    st.error(f"⚠️ {exc}")
+    st.stop()
+results, best = inc.stage("solveur", (pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids), lambda: cached_pallet(
+    get_result_cache(), pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids,
+    geometry=lambda *dims: inc.stage("geometrie", dims, lambda: layout_geometry(*dims))))
+heuristic = best
+
+# Optimisation exacte en arrière-plan (interrupteur sous les KPI) : un thread
+# par session, annulé dès que les entrées changent, qui part de la réponse
+# immédiate. Les KPI et le visuel suivent son meilleur motif connu pendant le
+# calcul ; le reste de la page le reprend une fois le calcul terminé.
+exact_key = (pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids, float(st.session_state.get('exact_budget', DEFAULT_TIME_BUDGET)))
+exact_solver = st.session_state.get('exact_solver')
+if exact_solver is not None and (not st.session_state.get('exact_on') or exact_solver.key != exact_key):
+    exact_solver.cancel()
+    exact_solver = None
+if exact_solver is None and st.session_state.get('exact_on'):
+    exact_solver = AnytimeLayer(*exact_key, seed=heuristic).start()
+st.session_state.exact_solver = exact_solver
+# Tant que le calcul tourne, les fragments relisent son état chaque seconde
+polling = exact_solver is not None and exact_solver.running
+live_every = 1.0 if polling else None
+
+
+def live_best():
+    # Meilleur motif connu du calcul exact s'il bat la réponse immédiate
+    if exact_solver is not None:
+        found = exact_solver.snapshot()['best']
+        if found is not None and found['Total'] > heuristic['Total']:
+            return found
+    return heuristic
+
+
+if exact_solver is not None and not polling:
+    best = live_best()
 
 # Sauvegarde des résultats globaux pour usage ailleurs
 if 'pallet_data' not in st.session_state:
     st.session_state.pallet_data = {}
 
+# Unité de charge de la page conteneur : même conversion que pipeline.run_pipeline
+load_unit = pallet_unit(best, pal_L, pal_w, box_poids)
 st.session_state.pallet_data = {
     'pal_L': pal_L,
     'pal_w': pal_w,
-    'pal_H': best['Hauteur'] * best['Nb Couches'], 
+    'pal_H': best.get('Hauteur Totale', best['Hauteur'] * best['Nb Couches']), 
     'box_per_pal': best['Total'],
-    'weight_per_pal': best['Poids (kg)'] + 25 
+    'weight_per_pal': best['Poids (kg)'] + load_unit['w_pal'],
+    'unit': load_unit,
+    # Carton et limites de la palette (page de balayage des dimensions)
+    'box': (L, W, H),
+    'box_poids': box_poids,
+    'pal_H_max': pal_H,
+    'pal_p_max': pal_p_max
 }
 
 # --- 6. HEADER HTML ---
-header_code = """
-<!DOCTYPE html><html><head>
-<link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
-<style>
-    body { margin: 0; padding: 0; background-color: transparent; font-family: 'Roboto', sans-serif; overflow: hidden; }
-    .main-header { position: relative; padding: 30px; background: #0a0a0a; border-radius: 10px; border-left: 12px solid #e67e22; overflow: hidden; box-shadow: 0 20px 40px rgba(0,0,0,0.6); min-height: 120px; display: flex; flex-direction: column; justify-content: center; }
-    #bg-carousel { position: absolute; top: 0; left: 0; width: 100%; height: 100%; background-size: cover; background-position: center; opacity: 0.3; transition: background-image 1.5s ease-in-out; z-index: 0; }
-    .overlay { position: absolute; top: 0; left: 0; width: 100%; height: 100%; background: linear-gradient(rgba(18, 16, 16, 0) 50%, rgba(0, 0, 0, 0.15) 50%); background-size: 100% 4px; z-index: 1; pointer-events: none; }
-    .content { position: relative; z-index: 2; }
-    h1 { font-family: 'Orbitron', sans-serif; text-transform: uppercase; letter-spacing: 5px; font-size: 2.2rem; margin: 0; color: #ffffff; text-shadow: 0 0 15px rgba(230, 126, 34, 0.8); }
-    .status { color: #e67e22; font-weight: 700; letter-spacing: 4px; font-size: 0.8rem; text-transform: uppercase; margin-top: 10px; }
-    @keyframes blink { 0% { opacity: 1; } 50% { opacity: 0.4; } 100% { opacity: 1; } }
-    .active-dot { display: inline-block; width: 10px; height: 10px; background: #fff; border-radius: 50%; margin-left: 10px; animation: blink 1.5s infinite; box-shadow: 0 0 8px #fff; }
-</style></head><body>
-    <div class="main-header">
-        <div id="bg-carousel"></div><div class="overlay"></div><div class="content">
-            <h1>📦 Pallet Optimizer <span style="color:#e67e22;">Pro</span></h1>
-            <div class="status">Logistics Intelligence  <span class="active-dot"></span></div>
-        </div>
-    </div>
-    <script>
-        const images = ["https://img.freepik.com/photos-premium/entrepot-rempli-beaucoup-palettes-bois-ai-generative_797840-6266.jpg", "https://img.freepik.com/photos-premium/enorme-entrepot-centre-distribution-produits-entrepot-detail-plein-etageres-marchandises-dans-cartons-palettes-chariots-elevateurs-logistique-transport-arriere-plan-flou-format-photo-32_177786-4792.jpg?w=2000"];
-        let index = 0; const bgDiv = document.getElementById('bg-carousel');
-        function changeBackground() { bgDiv.style.backgroundImage = "url('" + images[index] + "')"; index = (index + 1) % images.length; }
-        changeBackground(); setInterval(changeBackground, 5000);
-    </script></body></html>
-"""
-components.html(header_code, height=200)
+# Gabarit statique (pallet_opt/header.html) lu une seule fois par processus
+with prof.stage("rendu_composants"):
+    components.html(header_html("📦 Pallet Optimizer"), height=200)
 
 # Bouton pour passer en mode plein écran (paramètres)
 if st.button("🛠️ CONFIGURATION"):
@@ -239,12 +283,43 @@ if st.button("🛠️ CONFIGURATION"):
     st.rerun()
 
 # --- 7. SECTION KPI ---
-col1, col2, col3, col4 = st.columns(4)
-kpis = [("Capacité Totale", best['Total'], "Colis"), ("Par Couche", best['Par Couche'], "Colis"), ("Nombre de Couches", best['Nb Couches'], "Niveaux"), ("Poids Estimé", f"{int(best['Poids (kg)'])}", "kg")]
-
-for col, (label, value, unit) in zip([col1, col2, col3, col4], kpis):
-    with col:
-        st.markdown(f'<div class="metric-container"><p class="metric-label">{label}</p><p class="metric-value">{value} <span style="font-size:0.9rem; color:#bdc3c7;">{unit}</span></p></div>', unsafe_allow_html=True)
+@st.fragment(run_every=live_every)
+def kpi_section():
+    shown = live_best()
+    col1, col2, col3, col4 = st.columns(4)
+    kpis = [("Capacité Totale", shown['Total'], "Colis"), ("Par Couche", shown['Par Couche'], "Colis"), ("Nombre de Couches", shown['Nb Couches'], "Niveaux"), ("Poids Estimé", f"{int(shown['Poids (kg)'])}", "kg")]
+
+    for col, (label, value, unit) in zip([col1, col2, col3, col4], kpis):
+        with col:
+            st.markdown(f'<div class="metric-container"><p class="metric-label">{label}</p><p class="metric-value">{value} <span style="font-size:0.9rem; color:#bdc3c7;">{unit}</span></p></div>', unsafe_allow_html=True)
+
+kpi_section()
+
+# --- 7b. OPTIMISATION EXACTE (ARRIÈRE-PLAN) ---
+col_ex1, col_ex2 = st.columns([3, 1])
+with col_ex1:
+    st.toggle("🧮 Optimisation exacte en arrière-plan", key="exact_on",
+              help="Cherche de meilleures couches (motifs non guillotine) jusqu'à la preuve d'optimalité, "
+                   "sans bloquer la page. Annulée dès qu'une dimension change.")
+with col_ex2:
+    st.number_input("Budget (s)", value=DEFAULT_TIME_BUDGET, min_value=1.0, step=5.0, key="exact_budget",
+                    disabled=not st.session_state.get('exact_on'))
+
+if exact_solver is not None:
+    # État du calcul (les KPI et le visuel suivent le meilleur motif) ; à la
+    # fin, un rerun complet reporte le résultat sur toute la page
+    @st.fragment(run_every=live_every)
+    def exact_section():
+        snap = exact_solver.snapshot()
+        if polling and not snap['running']:
+            st.rerun()
+        cols = st.columns(3)
+        cols[0].metric("Gain sur la réponse immédiate", live_best()['Total'] - heuristic['Total'])
+        # La preuve ne couvre que les couches identiques (pas l'empilement mixte)
+        cols[1].metric("Borne (couches identiques)", snap['upper_bound'] if snap['upper_bound'] is not None else "-")
+        cols[2].metric("Statut", snap['status'], help=f"{snap['elapsed']:.1f} s")
+
+    exact_section()
 
 st.markdown("---")
 
@@ -253,94 +328,57 @@ c1, c2 = st.columns([1.5, 1], gap="large")
 
 with c1:
     st.subheader("📐 Schémas de Palettisation")
-    nx, ny = int(best['nx']), int(best['ny'])
-    par_couche, nb_layers = int(best['Par Couche']), int(best['Nb Couches'])
-    label_box = "Box" if nx < 12 else ""
-    grid_boxes_html = f'<div style="background: #ecf0f1; border: 1px solid #bdc3c7; border-radius: 2px; display: flex; align-items: center; justify-content: center; font-size: 10px; color: #95a5a6; font-family: sans-serif;">{label_box}</div>' * par_couche
-    
-    max_visu = min(nb_layers, 15)
-    layers_stack_html = ""
-    for i in range(max_visu):
-        progression = i / max_visu if max_visu > 1 else 0
-        r, g, b = int(211 + (32 * progression)), int(84 + (72 * progression)), int(0 + (18 * progression))
-        delay = i * 0.15 
-        layers_stack_html += f"""
-        <div class="layer-item" data-delay="{delay}" style="
-            position: absolute; bottom: {i * 14}px; left: calc(50% + {i * 3}px); 
-            transform: translateX(-50%) skewX(-20deg); width: 75%; height: 22px; 
-            background: linear-gradient(to right, rgb({r},{g},{b}), #e67e22); 
-            border: 1.5px solid rgb({r-30},{g-30},{b}); border-radius: 3px; z-index: {100-i}; 
-            display: flex; align-items: center; justify-content: center; color: white; 
-            font-family: sans-serif; font-size: 10px; font-weight: 800;
-            box-shadow: 3px 3px 8px rgba(0,0,0,0.15); opacity: 0;
-            animation: slideUp 0.5s ease-out {delay}s forwards;
-        ">
-            <span style="transform: skewX(20deg);">COUCHE {i+1}</span>
-        </div>
-        """
 
-    html_visual = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-    <style>
-        body {{ margin: 0; padding: 0; background: white; font-family: 'Segoe UI', sans-serif; overflow: hidden; }}
-        @keyframes slideUp {{
-            0% {{ opacity: 0; transform: translateY(50px) translateX(-50%) skewX(-20deg); }}
-            100% {{ opacity: 1; transform: translateY(0) translateX(-50%) skewX(-20deg); }}
-        }}
-        .main-container {{ display: flex; flex-direction: column; height: 100vh; padding: 15px; box-sizing: border-box; }}
-        .btn-replay {{ background: #e67e22; color: white; border: none; padding: 6px 15px; border-radius: 20px; cursor: pointer; font-size: 0.75rem; font-weight: bold; }}
-        .canvas-3d {{ background: #f8f9fa; flex-grow: 1; width: 100%; position: relative; border-radius: 12px; border: 1px solid #eee; overflow: hidden; min-height: 300px; }}
-        .grid-2d {{ background: #5e2f0d; padding: 10px; border-radius: 8px; width: 80%; max-width: 400px; margin-bottom: 20px; }}
-    </style>
-    </head>
-    <body>
-    <div class="main-container">
-        <p style="color:#7f8c8d; font-size:0.75rem; font-weight:bold; text-transform:uppercase; margin:0 0 10px 0;">Plan au sol</p>
-        <div class="grid-2d">
-            <div style="display: grid; grid-template-columns: repeat({nx}, 1fr); grid-template-rows: repeat({ny}, 1fr); gap: 4px; aspect-ratio: {pal_L}/{pal_w};">
-                {grid_boxes_html}
-            </div>
-        </div>
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-            <p style="color:#7f8c8d; font-size:0.75rem; font-weight:bold; text-transform:uppercase; margin:0;">Volume ({nb_layers} couches)</p>
-            <button class="btn-replay" onclick="replayAnimation()">🔄 Rejouer l'animation</button>
-        </div>
-        <div class="canvas-3d">
-            <div id="stack-container" style="position: absolute; bottom: 60px; width: 100%; height: 100%;">
-                {layers_stack_html}
-                <div style="position: absolute; bottom: -18px; left: 50%; transform: translateX(-50%); width: 82%; height: 14px; background: #8b4513; border-radius: 2px; z-index: 101;"></div>
-            </div>
-        </div>
-    </div>
-    <script>
-        function replayAnimation() {{
-            const container = document.getElementById('stack-container');
-            const layers = container.querySelectorAll('.layer-item');
-            layers.forEach(layer => {{
-                layer.style.animation = 'none';
-                layer.offsetHeight; 
-                const d = layer.getAttribute('data-delay');
-                layer.style.animation = `slideUp 0.5s ease-out ${{d}}s forwards`;
-            }});
-        }}
-    </script>
-    </body>
-    </html>
-    """
-    components.html(html_visual, height=750, scrolling=False)
+    # Fragment : suit le meilleur motif du calcul exact pendant qu'il tourne
+    # (l'iframe n'est rechargée que si le motif change)
+    @st.fragment(run_every=live_every)
+    def visual_section():
+        shown = live_best()
+        nb_layers = int(shown['Nb Couches'])
+        # Placements réels (grille, couche mixte ou empilement mixte) envoyés au
+        # visuel sous forme de tableau compact, dessinés en Canvas 2D / WebGL
+        html_visual = inc.stage("html_visuel", (pal_L, pal_w, pal_H, nb_layers, shown['Orientation'], shown['Total']), lambda: viewer_html(
+            pallet_boxes(shown), (pal_L, pal_w, pal_H), volume_label=f"Volume ({nb_layers} couches)"), after=("solveur",))
+        with prof.stage("rendu_composants"):
+            components.html(html_visual, height=750, scrolling=False)
+
+    visual_section()
 
 
 with c2:
     st.subheader("📋 Rapport d'Optimisation")
     st.markdown(f"**Orientation Retenue :** Face de {best['Orientation']} cm")
+    if best.get('couches'):
+        groups = {}
+        for c in best['couches']:
+            key = (c['Orientation'], c['Hauteur'], c['Par Couche'])
+            groups[key] = groups.get(key, 0) + 1
+        st.caption(f"Empilement mixte sur {best['Hauteur Totale']:g} cm : " + " + ".join(
+            f"{n} x {pc} box ({o}, h {h:g} cm)" for (o, h, pc), n in groups.items()))
     poids_utilise = (best['Poids (kg)'] / pal_p_max) * 100 if pal_p_max > 0 else 0
     st.progress(min(poids_utilise/100, 1.0))
     st.write(f"Utilisation du poids : {poids_utilise:.1f}%")
     
-    df_results = pd.DataFrame(results)
-    st.download_button("📥 TÉLÉCHARGER LE RAPPORT CSV", df_results.to_csv(index=False).encode('utf-8'), "rapport.csv")
+    df_results = inc.stage("dataframe", (), lambda: pd.DataFrame(results), after=("solveur",))
+    # Téléchargements différés et sans rerun (on_click="ignore") : le fichier
+    # n'est produit et envoyé qu'au clic
+    st.download_button("📥 TÉLÉCHARGER LE RAPPORT CSV", lambda: df_results.to_csv(index=False).encode('utf-8'), "rapport.csv",
+                       mime="text/csv", on_click="ignore")
+    # Classeur construit seulement au clic (téléchargement différé)
+    report_params = {"Palette (cm)": f"{pal_L:g} x {pal_w:g}", "Hauteur max (cm)": pal_H, "Poids max (kg)": pal_p_max,
+                     "Box (cm)": f"{L:g} x {W:g} x {H:g}", "Poids box (kg)": box_poids}
+
+    def build_excel_report():
+        # Exécuté au clic, après le rerun : journalisé comme un passage à part
+        export_prof = Profiler("app.export", enabled=prof.enabled)
+        with export_prof.stage("export_excel"):
+            data = workbook_bytes(pallet_report(report_params, results, best))
+        export_prof.flush()
+        return data
+
+    st.download_button("📥 TÉLÉCHARGER LE RAPPORT EXCEL", build_excel_report,
+                       "rapport_palette.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                       on_click="ignore")
     
     st.markdown("---")
     st.markdown("### 🚢 Calcul Conteneur")
@@ -348,52 +386,68 @@ with c2:
     if st.button("Aller au Calculateur Conteneur"):
         st.switch_page("pages/app3.py")
 
+    st.markdown("### 📚 Catalogue SKU")
+    st.info("Calculer toutes les références d'un fichier CSV / Excel en une fois.")
+    if st.button("Ouvrir le Mode Catalogue"):
+        st.switch_page("pages/batch.py")
+
+    st.markdown("### 📏 Dimensions du Carton")
+    st.info("À volume égal, chercher le format de carton qui remplit le mieux palettes et conteneurs.")
+    if st.button("Ouvrir le Balayage des Dimensions"):
+        st.switch_page("pages/sweep.py")
+
+    st.markdown("### 🧺 Palette Multi-Références")
+    st.info("Construire une palette de commande avec des cartons de dimensions et de poids différents.")
+    if st.button("Ouvrir la Palette Multi-Références"):
+        st.switch_page("pages/mixed.py")
+
 with st.expander("Comparaison des 6 orientations possibles"):
     st.table(df_results[['Orientation', 'Hauteur', 'Total', 'Par Couche', 'Nb Couches', 'Poids (kg)']])
 
 # --- SECTION AVIS & TELEGRAM ---
-# --- SECTION AVIS & TELEGRAM ---
-st.divider()
-st.subheader("💬 Votre Avis")
-
-# Injection CSS ultra-spécifique pour forcer l'orange
-st.markdown("""
-    <style>
-    /* On cible le bouton par son type et on force avec !important sur tous les états */
-    button[kind="primaryFormSubmit"] {
-        background-color: #e67e22 !important;
-        color: white !important;
-        border: none !important;
-    }
-    
-    /* On force aussi l'état au survol et au clic */
-    button[kind="primaryFormSubmit"]:hover, 
-    button[kind="primaryFormSubmit"]:active, 
-    button[kind="primaryFormSubmit"]:focus {
-        background-color: #d35400 !important;
-        color: white !important;
-        border: none !important;
-        box-shadow: none !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-with st.form("feedback_form", clear_on_submit=True):
-    name = st.text_input("👤 Votre Nom (ou entreprise)")
-    msg = st.text_area("✍️ Votre commentaire ou suggestion")
-    
-    # Utilisation du type="primary" qui sera intercepté par le CSS ci-dessus
-    submit_button = st.form_submit_button("🚀 Envoyer l'avis", type="primary", use_container_width=True)
-
-    if submit_button:
-        if msg:
-            with st.status("Transmission de votre message ...", expanded=False) as status:
-                send_telegram_feedback(name, msg)
-                status.update(label="Message transmis avec succès ! ✅", state="complete")
-            
-
-        else:
-            st.warning("⚠️ Le champ commentaire ne peut pas être vide.")
+# Fragment : l'envoi du formulaire ne relance que ce bloc, pas le solveur,
+# le bandeau ni le visuel
+@st.fragment
+def feedback_section():
+    st.divider()
+    st.subheader("💬 Votre Avis")
+
+    with st.form("feedback_form", clear_on_submit=True):
+        name = st.text_input("👤 Votre Nom (ou entreprise)")
+        msg = st.text_area("✍️ Votre commentaire ou suggestion")
+
+        # Utilisation du type="primary" qui sera intercepté par le CSS de local_css()
+        submit_button = st.form_submit_button("🚀 Envoyer l'avis", type="primary", use_container_width=True)
+
+        if submit_button:
+            if msg:
+                # Rerun partiel : journalisé comme un passage à part
+                feedback_prof = Profiler("app.avis", enabled=prof.enabled)
+                with feedback_prof.stage("telegram"):
+                    queued = send_telegram_feedback(name, msg)
+                feedback_prof.flush()
+                if queued:
+                    st.success("Message transmis avec succès ! ✅")
+                else:
+                    st.info("Message enregistré : il sera transmis dès que possible. ✅")
+            else:
+                st.warning("⚠️ Le champ commentaire ne peut pas être vide.")
+
+feedback_section()
+
+# --- PANNEAU DE PROFILAGE (OPT-IN) ---
+if prof.enabled:
+    prof.flush()
+    with st.expander("🐞 Profilage du rerun", expanded=True):
+        st.caption(f"Rerun {prof.run_id} : {prof.total() * 1e3:.1f} ms — journal : {prof.log_path}")
+        st.dataframe(pd.DataFrame(prof.rows()), hide_index=True, use_container_width=True,
+                     column_config={"Durée (ms)": st.column_config.NumberColumn(format="%.2f")})
+        st.caption("Étapes du calcul incrémental")
+        st.dataframe(pd.DataFrame(inc.rows()), hide_index=True, use_container_width=True)
+        summary = summarize(read_log(prof.log_path))
+        st.dataframe(pd.DataFrame([{"Page": page, "Étape": stage, "Reruns": s["count"], "p50 (ms)": s["p50"] * 1e3, "p95 (ms)": s["p95"] * 1e3}
+                                   for (page, stage), s in sorted(summary.items())]),
+                     hide_index=True, use_container_width=True)
 
 
 
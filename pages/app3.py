@@ -2,7 +2,11 @@ import streamlit as st
 import streamlit.components.v1 as components 
 import math
 import pandas as pd
-from io import BytesIO
+
+from pallet_opt import (CONTAINER_TYPES, Incremental, ResultCache, cached_container, floor_layout, header_html, load_mixed_container,
+                        plan_shipment, viewer_html)
+from pallet_opt.report import container_report, workbook_bytes
+from pallet_opt.profiling import Profiler, enabled_by_env
 
 # ==========================================
 # 1. CONFIGURATION ET CONSTANTES
@@ -13,13 +17,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Dimensions techniques réelles
-CONTAINER_TYPES = {
-    "1 EVP (20' Standard)": {"L": 589.8, "W": 235.2, "H": 239.3, "MaxPayload": 28200, "Vol": 33.2},
-    "2 EVP (40' Standard)": {"L": 1203.2, "W": 235.2, "H": 239.3, "MaxPayload": 26700, "Vol": 67.7},
-    "2 EVP (40' High Cube)": {"L": 1203.2, "W": 235.2, "H": 269.8, "MaxPayload": 26500, "Vol": 76.4},
-    "Personnaliser...": {"L": 0.0, "W": 0.0, "H": 0.0, "MaxPayload": 0.0, "Vol": 0.0}
-}
+# Profilage opt-in (PALLET_OPT_PROFILE=1 ou ?debug=1)
+prof = Profiler("app3", enabled=enabled_by_env() or st.query_params.get("debug") == "1")
 
 # Initialisation des états
 if 'view_mode' not in st.session_state:
@@ -31,9 +30,25 @@ if 'params' not in st.session_state:
         'p_L': 120.0, 'p_W': 80.0, 'p_H': 160.0,
         'b_per_p': 40, 'w_box': 12.5, 'w_pal': 25.0,
         'calc_mode': "Plein potentiel", 'target_box': 500,
-        'cust_L': 1200.0, 'cust_W': 235.0, 'cust_H': 240.0, 'cust_Payload': 28000.0
+        'cust_L': 1200.0, 'cust_W': 235.0, 'cust_H': 240.0, 'cust_Payload': 28000.0,
+        'optimize_mix': True, 'costs': {name: spec['Cost'] for name, spec in CONTAINER_TYPES.items()},
+        # Chargement mixte : une ligne par type de palette
+        'mixed_pallets': [
+            {"Type": "EUR", "Longueur": 120.0, "Largeur": 80.0, "Hauteur": 110.0, "Quantité": 20, "Poids box (kg)": 400.0, "Poids support (kg)": 25.0, "Gerbable": True},
+            {"Type": "ISO", "Longueur": 120.0, "Largeur": 100.0, "Hauteur": 140.0, "Quantité": 8, "Poids box (kg)": 500.0, "Poids support (kg)": 30.0, "Gerbable": True},
+            {"Type": "Demi", "Longueur": 80.0, "Largeur": 60.0, "Hauteur": 90.0, "Quantité": 10, "Poids box (kg)": 150.0, "Poids support (kg)": 10.0, "Gerbable": True},
+        ]
     }
 
+# Unité de charge de la page palette (pipeline.pallet_unit) : reprise à
+# chaque nouveau résultat palette, les saisies faites ici restent sinon
+# (sauf palette vide : aucun box ne tient, les saisies actuelles restent)
+load_unit = st.session_state.get('pallet_data', {}).get('unit')
+empty_unit = bool(load_unit) and load_unit['b_per_p'] == 0
+if load_unit and not empty_unit and st.session_state.params.get('pallet_source') != load_unit:
+    st.session_state.params.update(load_unit)
+    st.session_state.params['pallet_source'] = dict(load_unit)
+
 # ==========================================
 # 2. STYLE CSS COMPLET (SANS AUCUNE RÉDUCTION)
 # ==========================================
@@ -97,45 +112,24 @@ local_css()
 # ==========================================
 # 3. ALGORITHME DE CALCUL (INTÉGRAL)
 # ==========================================
-def professional_load_calc(cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load):
-    if cont_L <= 0 or cont_W <= 0 or cont_H <= 0:
-        return {"palettes_sol": 0, "niveaux": 0, "total_palettes": 0, "poids_total_brut": 0, "utilisation_vol": 0, "nx": 1, "ny": 1, "extra_p": 0, "orient": "N/A"}
-        
-    weight_of_all_boxes = b_per_p * box_unit_weight
-    p_total_gross_weight = weight_of_all_boxes + pallet_support_weight
-    stack_levels = max(1, int((cont_H - 5) / p_H))
-
-    # Calcul Orientation 1
-    nx1, ny1 = int(cont_L / p_L) if p_L > 0 else 0, int(cont_W / p_W) if p_W > 0 else 0
-    rem_L1 = cont_L - (nx1 * p_L)
-    extra_1 = int(cont_W / p_L) if rem_L1 >= p_W and p_L > 0 else 0
-    total_sol_1 = (nx1 * ny1) + extra_1
-
-    # Calcul Orientation 2
-    nx2, ny2 = int(cont_L / p_W) if p_W > 0 else 0, int(cont_W / p_L) if p_L > 0 else 0
-    rem_L2 = cont_L - (nx2 * p_W)
-    extra_2 = int(cont_W / p_W) if rem_L2 >= p_L and p_W > 0 else 0
-    total_sol_2 = (nx2 * ny2) + extra_2
-    
-    if total_sol_1 >= total_sol_2:
-        best_sol, f_nx, f_ny, f_extra, f_orient = total_sol_1, nx1, ny1, extra_1, "Longitudinale"
-    else:
-        best_sol, f_nx, f_ny, f_extra, f_orient = total_sol_2, nx2, ny2, extra_2, "Transversale"
-    
-    theoretical_total = best_sol * stack_levels
-    final_palettes = min(theoretical_total, int(max_load / p_total_gross_weight)) if p_total_gross_weight > 0 else theoretical_total
-    
-    vol_pal = (p_L * p_W * p_H) * final_palettes
-    vol_cont = cont_L * cont_W * cont_H
-    utilization = (vol_pal / vol_cont) * 100 if vol_cont > 0 else 0
-    
-    return {
-        "palettes_sol": best_sol, "niveaux": stack_levels, "total_palettes": final_palettes,
-        "poids_total_brut": final_palettes * p_total_gross_weight,
-        "poids_total_box": final_palettes * weight_of_all_boxes,
-        "poids_total_supports": final_palettes * pallet_support_weight,
-        "utilisation_vol": utilization, "nx": f_nx, "ny": f_ny, "extra_p": f_extra, "orient": f_orient
-    }
+# professional_load_calc vit dans pallet_opt.containers ; les résultats sont
+# partagés entre sessions via le cache disque.
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# Étapes mémoïsées par session : le plan au sol ne dépend que des longueurs
+# et largeurs, il n'est pas recalculé quand seuls les poids changent
+if 'incremental_app3' not in st.session_state:
+    st.session_state.incremental_app3 = Incremental()
+inc = st.session_state.incremental_app3
+inc.begin(prof)
+
+
+def container_load(stage, cont_L, cont_W, cont_H, p_L, p_W, p_H, w_box, w_pal, b_per_p, max_payload):
+    args = (cont_L, cont_W, cont_H, p_L, p_W, p_H, w_box, w_pal, b_per_p, max_payload)
+    floor = lambda *dims: inc.stage(stage.replace("solveur", "plan_sol"), dims, lambda: floor_layout(*dims))
+    return inc.stage(stage, args, lambda: cached_container(get_result_cache(), *args, floor=floor))
 
 # ==========================================
 # 4. AFFICHAGE CONDITIONNEL
@@ -156,12 +150,19 @@ if st.session_state.view_mode == 'settings':
             st.session_state.params['cust_H'] = st.number_input("Hauteur Int. (cm)", value=st.session_state.params['cust_H'])
             st.session_state.params['cust_Payload'] = st.number_input("Charge Utile Max (kg)", value=st.session_state.params['cust_Payload'])
         
-        st.session_state.params['calc_mode'] = st.radio("Méthode de calcul :", ["Plein potentiel", "Quantité spécifique"])
+        st.session_state.params['calc_mode'] = st.radio("Méthode de calcul :", ["Plein potentiel", "Quantité spécifique", "Chargement mixte"])
         if st.session_state.params['calc_mode'] == "Quantité spécifique":
             st.session_state.params['target_box'] = st.number_input("Nombre de Box total :", value=st.session_state.params['target_box'])
+            st.session_state.params['optimize_mix'] = st.checkbox("Optimiser le mix de conteneurs (coût minimal)", value=st.session_state.params['optimize_mix'])
+            with st.expander("💶 Coût par conteneur (EUR)"):
+                for name in CONTAINER_TYPES:
+                    if name != "Personnaliser..." or st.session_state.params['cont_choice'] == name:
+                        st.session_state.params['costs'][name] = st.number_input(name, value=float(st.session_state.params['costs'][name]), min_value=0.0, key=f"cost_{name}")
 
     with col_b:
         st.subheader("📦 UNITÉ DE CHARGE (PALETTE)")
+        if empty_unit:
+            st.warning("Aucune box ne tient sur la palette calculée : unité de charge non reprise.")
         st.session_state.params['p_L'] = st.number_input("Longueur (cm)", value=st.session_state.params['p_L'])
         st.session_state.params['p_W'] = st.number_input("Largeur (cm)", value=st.session_state.params['p_W'])
         st.session_state.params['p_H'] = st.number_input("Hauteur totale (cm)", value=st.session_state.params['p_H'])
@@ -169,6 +170,15 @@ if st.session_state.view_mode == 'settings':
         st.session_state.params['w_box'] = st.number_input("Poids d'une box (kg)", value=st.session_state.params['w_box'])
         st.session_state.params['w_pal'] = st.number_input("Poids palette vide (kg)", value=st.session_state.params['w_pal'])
 
+    if st.session_state.params['calc_mode'] == "Chargement mixte":
+        st.subheader("🧩 PALETTES À CONSOLIDER")
+        # Tableau de départ figé : l'éditeur garde les modifications en cours
+        if 'mixed_pallets_base' not in st.session_state:
+            st.session_state.mixed_pallets_base = pd.DataFrame(st.session_state.params['mixed_pallets'])
+        edited = st.data_editor(st.session_state.mixed_pallets_base, key="mixed_pallets_editor", num_rows="dynamic", hide_index=True, use_container_width=True)
+        edited = edited.dropna(subset=["Longueur", "Largeur", "Hauteur"]).fillna({"Type": "Palette", "Quantité": 0, "Poids box (kg)": 0.0, "Poids support (kg)": 0.0, "Gerbable": True})
+        st.session_state.params['mixed_pallets'] = edited.to_dict("records")
+
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("CONFIRMER ET VOIR LES RÉSULTATS"):
         st.session_state.view_mode = 'dashboard'
@@ -179,33 +189,9 @@ else:
     # --- PAGE DASHBOARD (LIGNES ORIGINALES RECONSTRUITES) ---
     
     # 1. HEADER HTML COMPLET AVEC CARROUSEL ET POINT CLIGNOTANT
-    header_html = """
-    <!DOCTYPE html><html><head>
-    <link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
-    <style>
-        body { margin: 0; background: transparent; font-family: 'Roboto', sans-serif; }
-        .main-header { position: relative; padding: 30px; background: #0a0a0a; border-radius: 10px; border-left: 12px solid #e67e22; overflow: hidden; min-height: 120px; display: flex; flex-direction: column; justify-content: center; box-shadow: 0 20px 40px rgba(0,0,0,0.6); }
-        #bg-carousel { position: absolute; top: 0; left: 0; width: 100%; height: 100%; background-size: cover; background-position: center; opacity: 0.3; transition: 1.5s; z-index: 0; }
-        .content { position: relative; z-index: 2; }
-        h1 { font-family: 'Orbitron'; text-transform: uppercase; letter-spacing: 5px; font-size: 2.2rem; margin: 0; color: white; text-shadow: 0 0 15px rgba(230, 126, 34, 0.8); }
-        .status { color: #e67e22; font-weight: 700; letter-spacing: 4px; font-size: 0.8rem; text-transform: uppercase; margin-top: 10px; }
-        .active-dot { display: inline-block; width: 10px; height: 10px; background: #fff; border-radius: 50%; margin-left: 10px; animation: blink 1.5s infinite; box-shadow: 0 0 8px #fff; }
-        @keyframes blink { 0%, 100% { opacity: 1; } 50% { opacity: 0.4; } }
-    </style></head><body>
-    <div class="main-header">
-        <div id="bg-carousel"></div>
-        <div class="content">
-            <h1>Container Optimizer <span style="color:#e67e22;">Pro</span></h1>
-            <div class="status">Logistics Intelligence <span class="active-dot"></span></div>
-        </div>
-    </div>
-    <script>
-        const images = ["https://img.freepik.com/photos-premium/entrepot-rempli-beaucoup-palettes-bois-ai-generative_797840-6266.jpg", "https://img.freepik.com/photos-premium/enorme-entrepot-centre-distribution-produits-entrepot-detail-plein-etageres-marchandises-dans-cartons-palettes-chariots-elevateurs-logistique-transport-arriere-plan-flou-format-photo-32_177786-4792.jpg?w=2000"];
-        let i = 0; setInterval(() => { document.getElementById('bg-carousel').style.backgroundImage = "url('" + images[i] + "')"; i = (i + 1) % images.length; }, 5000);
-        document.getElementById('bg-carousel').style.backgroundImage = "url('" + images[0] + "')";
-    </script></body></html>
-    """
-    components.html(header_html, height=200)
+    # Gabarit statique commun (pallet_opt/header.html), lu une fois par processus
+    with prof.stage("rendu_composants"):
+        components.html(header_html("Container Optimizer"), height=200)
 
     # 2. BOUTON RETOUR & OUVERTURE RÉGLAGES
     col_nav1, col_nav2 = st.columns([1, 4])
@@ -225,34 +211,86 @@ else:
         specs = CONTAINER_TYPES[p['cont_choice']]
         cont_L, cont_W, cont_H, max_payload = specs['L'], specs['W'], specs['H'], specs['MaxPayload']
 
-    res = professional_load_calc(cont_L, cont_W, cont_H, p['p_L'], p['p_W'], p['p_H'], p['w_box'], p['w_pal'], p['b_per_p'], max_payload)
+    if p['calc_mode'] == "Chargement mixte":
+        # Palettes hétérogènes (empreintes et hauteurs différentes) : skyline
+        pallet_types = [{"name": str(row["Type"]), "L": float(row["Longueur"]), "W": float(row["Largeur"]), "H": float(row["Hauteur"]),
+                         "qty": int(row["Quantité"]), "box_weight": float(row["Poids box (kg)"]), "support_weight": float(row["Poids support (kg)"]),
+                         "stackable": bool(row["Gerbable"])} for row in p['mixed_pallets']]
+        res = inc.stage("solveur_mixte", (cont_L, cont_W, cont_H, pallet_types, max_payload),
+                        lambda: load_mixed_container(cont_L, cont_W, cont_H, pallet_types, max_payload))
+    else:
+        res = container_load("solveur", cont_L, cont_W, cont_H, p['p_L'], p['p_W'], p['p_H'], p['w_box'], p['w_pal'], p['b_per_p'], max_payload)
 
     # 4. AFFICHAGE DES MÉTRIQUES
-    if p['calc_mode'] == "Quantité spécifique":
-        disp_pals = math.ceil(p['target_box'] / p['b_per_p'])
+    plan = None
+    if p['calc_mode'] == "Chargement mixte":
+        disp_pals, disp_box, disp_cont = res['total_palettes'], f"{res['poids_total_brut']:,.0f} kg".replace(",", " "), 1
+    elif p['calc_mode'] == "Quantité spécifique":
+        disp_pals = math.ceil(p['target_box'] / p['b_per_p']) if p['b_per_p'] > 0 else 0
+        if p['b_per_p'] <= 0:
+            st.warning("Box par palette nul : renseignez l'unité de charge dans la configuration.")
         disp_box = p['target_box']
-        limit_per_cont = res['total_palettes'] if res['total_palettes'] > 0 else 1
-        disp_cont = math.ceil(disp_pals / limit_per_cont)
+        # Flotte candidate : tous les types standards (mix optimisé) ou le seul type choisi
+        fleet = {}
+        with prof.stage("plan_expedition"):
+            for name, spec in CONTAINER_TYPES.items():
+                if name == p['cont_choice']:
+                    fleet[name] = {"capacity": res['total_palettes'], "cost": p['costs'][name], "payload": max_payload}
+                elif p['optimize_mix'] and name != "Personnaliser...":
+                    r = container_load(f"solveur {name}", spec['L'], spec['W'], spec['H'], p['p_L'], p['p_W'], p['p_H'], p['w_box'], p['w_pal'], p['b_per_p'], spec['MaxPayload'])
+                    fleet[name] = {"capacity": r['total_palettes'], "cost": p['costs'][name], "payload": spec['MaxPayload']}
+            plan = plan_shipment(p['target_box'], p['b_per_p'], fleet, p['w_box'], p['w_pal'])
+        if len(fleet) > 1 and fleet[p['cont_choice']]['cost'] <= 0:
+            st.warning(f"Coût de « {p['cont_choice']} » non renseigné : ce conteneur est écarté du mix (réglages > coût par conteneur).")
+        if plan['feasible']:
+            disp_cont = len(plan['containers'])
+        else:
+            limit_per_cont = res['total_palettes'] if res['total_palettes'] > 0 else 1
+            disp_cont = math.ceil(disp_pals / limit_per_cont)
     else:
         disp_pals, disp_box, disp_cont = res['total_palettes'], res['total_palettes'] * p['b_per_p'], 1.0
 
     m1, m2, m3 = st.columns(3)
-    m1.markdown(f'<div class="metric-container"><p class="metric-label">Nombre de Box</p><p class="metric-value">{disp_box}</p></div>', unsafe_allow_html=True)
+    box_label = "Poids Chargé" if p['calc_mode'] == "Chargement mixte" else "Nombre de Box"
+    m1.markdown(f'<div class="metric-container"><p class="metric-label">{box_label}</p><p class="metric-value">{disp_box}</p></div>', unsafe_allow_html=True)
     m2.markdown(f'<div class="metric-container"><p class="metric-label">Total Palettes</p><p class="metric-value">{disp_pals}</p></div>', unsafe_allow_html=True)
     m3.markdown(f'<div class="metric-container"><p class="metric-label">Nombre Conteneurs</p><p class="metric-value">{disp_cont}</p></div>', unsafe_allow_html=True)
 
+    # PLAN D'EXPÉDITION (QUANTITÉ SPÉCIFIQUE)
+    if plan and plan['containers']:
+        st.markdown("---")
+        st.subheader("🚢 Plan d'Expédition")
+        mix_txt = " + ".join(f"{n} x {name}" for name, n in plan['mix'].items())
+        st.markdown(f"**Mix retenu :** {mix_txt} — **Coût total :** {plan['cost']:,.0f} EUR".replace(",", " "))
+        st.dataframe(pd.DataFrame(plan['containers']), hide_index=True, use_container_width=True,
+                     column_config={"Remplissage (%)": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%"),
+                                    "Charge utile (%)": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%"),
+                                    "Poids (kg)": st.column_config.NumberColumn(format="%.0f")})
+
     # 5. SECTION PINWHEEL (AVEC IMAGE ET TABLEAU COMPLET)
     st.markdown("---")
     st.subheader("📐 Optimisation Pinwheel (Chargement Mixte)")
 
     
 
+    # Une ligne par zone : pinwheel (principale + bande tournée) ou solveur exact (mixte)
+    if p['calc_mode'] == "Chargement mixte":
+        # Une ligne par type de palette : palettes chargées (gerbage compris)
+        zone_rows = "".join(
+            f"<tr><td><b>{zone}</b></td><td>{dims}</td><td>{res['non_chargees'].get(i, 0)} non chargée(s)</td><td>-</td><td><b>{n}</b></td></tr>"
+            for i, (zone, dims, n) in enumerate(res['zones'])
+        )
+    else:
+        zone_rows = "".join(
+            f"<tr><td><b>{zone}</b></td><td>{orient}</td><td>{sol}</td><td>x{res['niveaux']}</td><td><b>{sol * res['niveaux']}</b></td></tr>"
+            for zone, orient, sol in res['zones']
+        )
+
     st.markdown(f"""
     <table class="recap-table">
         <thead><tr><th>Zone</th><th>Orientation</th><th>Sol</th><th>Niveaux</th><th>Total</th></tr></thead>
         <tbody>
-            <tr><td><b>Zone Principale</b></td><td>{res['orient']}</td><td>{res['nx'] * res['ny']}</td><td>x{res['niveaux']}</td><td><b>{(res['nx']*res['ny'])*res['niveaux']}</b></td></tr>
-            <tr><td><b>Zone Pinwheel</b></td><td>Rotation 90°</td><td>{res['extra_p']}</td><td>x{res['niveaux']}</td><td><b>{res['extra_p']*res['niveaux']}</b></td></tr>
+            {zone_rows}
             <tr style="background:#f8f9fa; border-top:3px solid #e67e22;">
                 <td colspan="2"><b>CAPACITÉ PAR ÉQUIPEMENT</b></td><td>{res['palettes_sol']} sol</td><td>Marge -5cm</td><td style="color:#e67e22; font-weight:bold; font-size:1.2rem;">{res['total_palettes']}</td>
             </tr>
@@ -260,5 +298,40 @@ else:
     </table>
     """, unsafe_allow_html=True)
 
+    if p['calc_mode'] == "Chargement mixte" and res['palettes']:
+        # Palettes posées (x, y, z, l, w, h) : même visuel compact que la page palette
+        with prof.stage("html_visuel"):
+            html_visual = viewer_html([pal[:6] for pal in res['palettes']], (cont_L, cont_W, cont_H), base=0,
+                                      floor_label="Plan du conteneur", volume_label=f"Chargement ({res['total_palettes']} palettes)")
+        with prof.stage("rendu_composants"):
+            components.html(html_visual, height=750, scrolling=False)
+
     # 6. EXPORT
-    st.download_button("📥 TÉLÉCHARGER LE RAPPORT EXCEL", BytesIO().getvalue(), "Rapport_Export.xlsx")
+    # Classeur construit seulement au clic (téléchargement différé)
+    if p['calc_mode'] == "Chargement mixte":
+        report_params = {"Conteneur": p['cont_choice'], "Mode": p['calc_mode']}
+    else:
+        report_params = {"Conteneur": p['cont_choice'], "Mode": p['calc_mode'], "Palette (cm)": f"{p['p_L']:g} x {p['p_W']:g} x {p['p_H']:g}",
+                         "Box par palette": p['b_per_p'], "Poids box (kg)": p['w_box'], "Poids palette vide (kg)": p['w_pal']}
+
+    def build_excel_report():
+        # Exécuté au clic, après le rerun : journalisé comme un passage à part
+        export_prof = Profiler("app3.export", enabled=prof.enabled)
+        with export_prof.stage("export_excel"):
+            data = workbook_bytes(container_report(report_params, res, plan))
+        export_prof.flush()
+        return data
+
+    st.download_button("📥 TÉLÉCHARGER LE RAPPORT EXCEL", build_excel_report,
+                       "Rapport_Export.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                       on_click="ignore")
+
+    # PANNEAU DE PROFILAGE (OPT-IN)
+    if prof.enabled:
+        prof.flush()
+        with st.expander("🐞 Profilage du rerun", expanded=True):
+            st.caption(f"Rerun {prof.run_id} : {prof.total() * 1e3:.1f} ms — journal : {prof.log_path}")
+            st.dataframe(pd.DataFrame(prof.rows()), hide_index=True, use_container_width=True,
+                         column_config={"Durée (ms)": st.column_config.NumberColumn(format="%.2f")})
+            st.caption("Étapes du calcul incrémental")
+            st.dataframe(pd.DataFrame(inc.rows()), hide_index=True, use_container_width=True)
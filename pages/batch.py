@@ -0,0 +1,153 @@
+import os
+import tempfile
+import time
+
+import streamlit as st
+
+from pallet_opt import PALLET_TYPES, ResultCache
+from pallet_opt.catalogue import CatalogueRun, DEFAULT_CHUNK
+from pallet_opt.parallel import default_workers
+from pallet_opt.report import batch_report, workbook_bytes
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+st.set_page_config(
+    page_title="Catalogue SKU - Pallet Optimizer Pro",
+    page_icon="📚",
+    layout="wide"
+)
+
+if 'batch_result' not in st.session_state:
+    st.session_state.batch_result = None
+
+# Fichiers résultat dans un dossier dédié : ceux des sessions terminées
+# sont supprimés au lancement suivant
+RESULT_ROOT = os.path.join(tempfile.gettempdir(), "pallet_opt_batches")
+RESULT_MAX_AGE = 24 * 3600
+
+
+def result_dir():
+    # Résultat précédent de la session supprimé, ainsi que ceux des
+    # sessions expirées
+    previous = st.session_state.batch_result
+    if previous and os.path.exists(previous['path']):
+        os.remove(previous['path'])
+    st.session_state.batch_result = None
+    os.makedirs(RESULT_ROOT, exist_ok=True)
+    for entry in os.scandir(RESULT_ROOT):
+        if entry.name.startswith("pallet_batch_") and time.time() - entry.stat().st_mtime > RESULT_MAX_AGE:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    return RESULT_ROOT
+
+# ==========================================
+# 2. STYLE CSS
+# ==========================================
+def local_css():
+    st.markdown(
+        """
+        <style>
+        /* Masquer les éléments natifs */
+        [data-testid="stSidebarNav"] { display: none !important; }
+        button[kind="headerNoPadding"] { display: none !important; }
+        [data-testid="stSidebar"] { display: none; }
+
+        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
+
+        .stApp { background-color: #f8f9fa; font-family: 'Poppins', sans-serif; }
+
+        .stButton > button {
+            background-color: #e67e22 !important; color: white !important;
+            border-radius: 30px !important; padding: 0.8rem 2rem !important;
+            font-weight: 700 !important; width: 100%; border: none !important;
+            text-transform: uppercase; letter-spacing: 1px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+local_css()
+
+# Cache de résultats commun avec la page palette (mêmes calculs)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# ==========================================
+# 3. PARAMÈTRES DU CATALOGUE
+# ==========================================
+col_nav1, col_nav2 = st.columns([1, 4])
+with col_nav1:
+    if st.button("RETOUR"):
+        st.switch_page("app.py")
+with col_nav2:
+    st.markdown("## 📚 Mode Catalogue SKU")
+
+st.info("Importez un catalogue CSV ou Excel avec les colonnes Longueur, Largeur, Hauteur, Poids (et optionnellement Référence). "
+        "Le fichier est traité par blocs : les résultats s'affichent au fur et à mesure.")
+
+col_a, col_b = st.columns(2)
+with col_a:
+    pallet_names = st.multiselect("Palettes à évaluer", list(PALLET_TYPES.keys()), default=list(PALLET_TYPES.keys())[:2])
+    upload = st.file_uploader("Catalogue (CSV / Excel)", type=["csv", "txt", "xlsx", "xlsm"])
+with col_b:
+    batch_pal_H = st.number_input("Hauteur Max (cm)", value=200.0)
+    batch_pal_p_max = st.number_input("Poids Max (kg)", value=1000.0)
+    chunk_size = st.number_input("Lignes par bloc", value=DEFAULT_CHUNK, min_value=100, step=1000)
+    workers = st.number_input("Processus parallèles", value=1, min_value=1, max_value=default_workers(),
+                              help="Répartit le pré-filtre (grille) de chaque bloc sur plusieurs cœurs (utile pour les blocs de plusieurs milliers de lignes).")
+
+# ==========================================
+# 4. CALCUL INCRÉMENTAL
+# ==========================================
+if st.button("LANCER LE CALCUL", disabled=upload is None or not pallet_names):
+    out_dir = result_dir()
+    pallets = {n: (PALLET_TYPES[n]['L'], PALLET_TYPES[n]['W'], batch_pal_H, batch_pal_p_max) for n in pallet_names}
+    try:
+        run = CatalogueRun(upload, upload.name, pallets, chunk_size=int(chunk_size), out_dir=out_dir, workers=int(workers),
+                           cache=get_result_cache())
+    except (ValueError, ImportError) as e:
+        st.error(f"Lecture impossible : {e}")
+        st.stop()
+
+    bar = st.progress(0.0, text="Lecture du catalogue...")
+    summary_slot = st.empty()
+    preview_slot = st.empty()
+    try:
+        for partial in run:
+            bar.progress(run.progress(), text=f"{run.skus} SKU traités")
+            summary_slot.dataframe(run.summary(), hide_index=True, use_container_width=True)
+            preview_slot.dataframe(partial.head(50), hide_index=True, use_container_width=True)
+    except ValueError as e:
+        # Résultat partiel abandonné
+        if os.path.exists(run.path):
+            os.remove(run.path)
+        st.error(f"Lecture impossible : {e}")
+        st.stop()
+    bar.progress(1.0, text=f"Terminé : {run.skus} SKU")
+    st.session_state.batch_result = {"path": run.path, "summary": run.summary(), "skus": run.skus}
+
+# ==========================================
+# 5. RÉSULTAT
+# ==========================================
+result = st.session_state.batch_result
+if result and os.path.exists(result['path']):
+    st.markdown("---")
+    st.subheader(f"📋 Synthèse ({result['skus']} SKU)")
+    st.dataframe(result['summary'], hide_index=True, use_container_width=True)
+
+    # Le fichier n'est lu qu'au clic (téléchargement différé)
+    def read_result_file():
+        with open(result['path'], "rb") as fh:
+            return fh.read()
+
+    st.download_button("📥 TÉLÉCHARGER LES RÉSULTATS CSV", read_result_file, "resultats_catalogue.csv", mime="text/csv",
+                       on_click="ignore")
+    # Excel : le CSV résultat est relu par blocs et écrit ligne à ligne
+    st.download_button("📥 TÉLÉCHARGER LE RAPPORT EXCEL", lambda: workbook_bytes(batch_report(result['path'], result['summary'])),
+                       "resultats_catalogue.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                       on_click="ignore")
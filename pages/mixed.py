@@ -0,0 +1,133 @@
+import time
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from pallet_opt import PALLET_TYPES, build_mixed_pallet, placements_csv, viewer_html
+from pallet_opt.mixed_pallet import MIN_SUPPORT
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+st.set_page_config(
+    page_title="Palette Multi-Références - Pallet Optimizer Pro",
+    page_icon="🧺",
+    layout="wide"
+)
+
+# Carton de départ : celui de la page palette s'il a été calculé
+ref = st.session_state.get('pallet_data', {})
+ref_box = ref.get('box', (45.0, 35.0, 25.0))
+
+if 'mixed_cartons' not in st.session_state:
+    st.session_state.mixed_cartons = pd.DataFrame([
+        {"Référence": "CARTON-1", "Longueur": float(ref_box[0]), "Largeur": float(ref_box[1]), "Hauteur": float(ref_box[2]),
+         "Poids (kg)": float(ref.get('box_poids', 15.0)), "Quantité": 12},
+        {"Référence": "CARTON-2", "Longueur": 40.0, "Largeur": 30.0, "Hauteur": 30.0, "Poids (kg)": 8.0, "Quantité": 20},
+        {"Référence": "CARTON-3", "Longueur": 30.0, "Largeur": 20.0, "Hauteur": 15.0, "Poids (kg)": 3.0, "Quantité": 30},
+    ])
+
+# ==========================================
+# 2. STYLE CSS
+# ==========================================
+def local_css():
+    st.markdown(
+        """
+        <style>
+        /* Masquer les éléments natifs */
+        [data-testid="stSidebarNav"] { display: none !important; }
+        button[kind="headerNoPadding"] { display: none !important; }
+        [data-testid="stSidebar"] { display: none; }
+
+        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
+
+        .stApp { background-color: #f8f9fa; font-family: 'Poppins', sans-serif; }
+
+        .stButton > button {
+            background-color: #e67e22 !important; color: white !important;
+            border-radius: 30px !important; padding: 0.8rem 2rem !important;
+            font-weight: 700 !important; width: 100%; border: none !important;
+            text-transform: uppercase; letter-spacing: 1px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+local_css()
+
+# ==========================================
+# 3. COMMANDE ET PALETTE
+# ==========================================
+col_nav1, col_nav2 = st.columns([1, 4])
+with col_nav1:
+    if st.button("RETOUR"):
+        st.switch_page("app.py")
+with col_nav2:
+    st.markdown("## 🧺 Palette Multi-Références")
+
+st.info("Une ligne par référence de la commande (les lignes peuvent être collées depuis un tableur). "
+        "Les cartons lourds sont posés en bas ; chaque carton doit reposer sur des cartons au moins aussi lourds.")
+
+col_a, col_b = st.columns([2, 1], gap="large")
+with col_a:
+    st.subheader("📦 Cartons de la commande")
+    cartons_df = st.data_editor(
+        st.session_state.mixed_cartons, num_rows="dynamic", hide_index=True, use_container_width=True, key="mixed_editor",
+        column_config={"Longueur": st.column_config.NumberColumn("Longueur (cm)", min_value=0.0),
+                       "Largeur": st.column_config.NumberColumn("Largeur (cm)", min_value=0.0),
+                       "Hauteur": st.column_config.NumberColumn("Hauteur (cm)", min_value=0.0),
+                       "Poids (kg)": st.column_config.NumberColumn(min_value=0.0),
+                       "Quantité": st.column_config.NumberColumn(min_value=0, step=1)})
+with col_b:
+    st.subheader("🏗️ Palette")
+    pal_choice = st.selectbox("Type de Palette", list(PALLET_TYPES.keys()))
+    pal_L, pal_w = PALLET_TYPES[pal_choice]['L'], PALLET_TYPES[pal_choice]['W']
+    pal_H = st.number_input("Hauteur Max (cm)", value=float(ref.get('pal_H_max', 200.0)))
+    pal_p_max = st.number_input("Poids Max (kg)", value=float(ref.get('pal_p_max', 1000.0)))
+    support = st.slider("Appui minimal sous chaque carton (%)", 50, 100, int(MIN_SUPPORT * 100), step=5)
+
+cartons = []
+for row in cartons_df.to_dict("records"):
+    try:
+        carton = {"sku": str(row["Référence"]), "L": float(row["Longueur"]), "W": float(row["Largeur"]),
+                  "H": float(row["Hauteur"]), "weight": float(row["Poids (kg)"]), "qty": int(row["Quantité"])}
+    except (TypeError, ValueError):
+        continue
+    if not any(pd.isna(v) for v in carton.values()):
+        cartons.append(carton)
+
+# ==========================================
+# 4. CONSTRUCTION DE LA PALETTE
+# ==========================================
+start = time.perf_counter()
+res = build_mixed_pallet(pal_L, pal_w, pal_H, pal_p_max, cartons, min_support=support / 100)
+seconds = time.perf_counter() - start
+
+demand = sum(c["qty"] for c in cartons)
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Cartons chargés", f"{res['total']} / {demand}")
+m2.metric("Poids", f"{res['poids']:,.1f} kg".replace(",", " "))
+m3.metric("Hauteur chargée", f"{res['hauteur']:g} cm")
+m4.metric("Remplissage volume", f"{res['utilisation_vol']:.1f} %")
+st.caption(f"Palette construite en {seconds * 1000:.0f} ms")
+
+col_vis, col_tab = st.columns([1.4, 1], gap="large")
+with col_vis:
+    if res['placements']:
+        html_visual = viewer_html([p[:6] for p in res['placements']], (pal_L, pal_w, pal_H),
+                                  volume_label=f"Palette ({res['total']} cartons)")
+        components.html(html_visual, height=750, scrolling=False)
+    else:
+        st.warning("Aucun carton ne tient sur la palette.")
+with col_tab:
+    st.subheader("📋 Par référence")
+    st.dataframe(pd.DataFrame([{"Référence": c["sku"], "Demandés": c["qty"], "Chargés": res['par_reference'].get(i, 0),
+                                "Non chargés": res['non_charges'].get(i, 0)} for i, c in enumerate(cartons)]),
+                 hide_index=True, use_container_width=True)
+    if res['non_charges']:
+        st.warning(f"{sum(res['non_charges'].values())} carton(s) non chargé(s) : hauteur, poids ou appui insuffisant.")
+
+    st.download_button("📥 TÉLÉCHARGER LE PLAN DE CHARGEMENT (CSV)", lambda: placements_csv(res).encode('utf-8'),
+                       "plan_palette_mixte.csv", mime="text/csv", on_click="ignore", disabled=not res['placements'])
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from pallet_opt import CONTAINER_TYPES, PALLET_TYPES, ResultCache, cached_pallet
+from pallet_opt.store import ColumnStore
+from pallet_opt.sweep import evaluate, heatmap_spec, ranking, sweep_store, target_column
+
+# ==========================================
+# 1. CONFIGURATION
+# ==========================================
+st.set_page_config(
+    page_title="Balayage Carton - Pallet Optimizer Pro",
+    page_icon="📏",
+    layout="wide"
+)
+
+if 'sweep_result' not in st.session_state:
+    st.session_state.sweep_result = None
+
+# Résultats écrits sur disque (colonnes en memmap) : la session ne garde que
+# le chemin du stockage et la page affichée
+STORE_ROOT = os.path.join(tempfile.gettempdir(), "pallet_opt_sweeps")
+STORE_MAX_AGE = 24 * 3600
+PAGE_SIZE = 50
+
+
+def new_store_path():
+    # Stockage de la session précédente supprimé, ainsi que ceux des
+    # sessions expirées
+    previous = st.session_state.sweep_result
+    if previous:
+        shutil.rmtree(previous["store"], ignore_errors=True)
+    os.makedirs(STORE_ROOT, exist_ok=True)
+    for entry in os.scandir(STORE_ROOT):
+        if entry.is_dir() and time.time() - entry.stat().st_mtime > STORE_MAX_AGE:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    return os.path.join(STORE_ROOT, uuid.uuid4().hex)
+
+# Carton de référence : celui de la page palette s'il a été calculé
+ref = st.session_state.get('pallet_data', {})
+ref_box = ref.get('box', (45.0, 35.0, 25.0))
+
+# ==========================================
+# 2. STYLE CSS
+# ==========================================
+def local_css():
+    st.markdown(
+        """
+        <style>
+        /* Masquer les éléments natifs */
+        [data-testid="stSidebarNav"] { display: none !important; }
+        button[kind="headerNoPadding"] { display: none !important; }
+        [data-testid="stSidebar"] { display: none; }
+
+        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
+
+        .stApp { background-color: #f8f9fa; font-family: 'Poppins', sans-serif; }
+
+        .stButton > button {
+            background-color: #e67e22 !important; color: white !important;
+            border-radius: 30px !important; padding: 0.8rem 2rem !important;
+            font-weight: 700 !important; width: 100%; border: none !important;
+            text-transform: uppercase; letter-spacing: 1px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+local_css()
+
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# ==========================================
+# 3. PARAMÈTRES DU BALAYAGE
+# ==========================================
+col_nav1, col_nav2 = st.columns([1, 4])
+with col_nav1:
+    if st.button("RETOUR"):
+        st.switch_page("app.py")
+with col_nav2:
+    st.markdown("## 📏 Balayage des Dimensions du Carton")
+
+st.info("À volume intérieur constant, toutes les combinaisons Longueur x Largeur de la plage sont évaluées "
+        "(la hauteur est déduite du volume). Le classement compare chaque format au carton actuel.")
+
+col_a, col_b, col_c = st.columns(3)
+with col_a:
+    st.subheader("📦 Carton")
+    ref_L = st.number_input("Longueur actuelle (cm)", value=float(ref_box[0]))
+    ref_W = st.number_input("Largeur actuelle (cm)", value=float(ref_box[1]))
+    ref_H = st.number_input("Hauteur actuelle (cm)", value=float(ref_box[2]))
+    volume = st.number_input("Volume intérieur (L)", value=round(ref_L * ref_W * ref_H / 1000, 3), min_value=0.001)
+    box_poids = st.number_input("Poids Unitaire (kg)", value=float(ref.get('box_poids', 15.0)))
+with col_b:
+    st.subheader("📐 Plage")
+    span = max(ref_L, ref_W, ref_H)
+    l_range = st.slider("Longueur (cm)", 1.0, 200.0, (max(1.0, float(round(span * 0.4))), min(200.0, float(round(span * 1.6)))))
+    w_range = st.slider("Largeur (cm)", 1.0, 200.0, (max(1.0, float(round(span * 0.3))), min(200.0, float(round(span * 1.2)))))
+    step = st.number_input("Pas L / W (cm)", value=0.5, min_value=0.05, step=0.1)
+    h_step = st.number_input("Pas H (cm)", value=0.1, min_value=0.05, step=0.1)
+    h_range = st.slider("Hauteur admise (cm)", 1.0, 200.0, (5.0, 120.0))
+with col_c:
+    st.subheader("🏗️ Palettes et conteneurs")
+    pallet_names = st.multiselect("Palettes", list(PALLET_TYPES.keys()), default=list(PALLET_TYPES.keys())[:2])
+    pal_H = st.number_input("Hauteur Max (cm)", value=float(ref.get('pal_H_max', 200.0)))
+    pal_p_max = st.number_input("Poids Max (kg)", value=float(ref.get('pal_p_max', 1000.0)))
+    container_names = st.multiselect("Conteneurs", [n for n in CONTAINER_TYPES if n != "Personnaliser..."],
+                                     default=[n for n in CONTAINER_TYPES if n != "Personnaliser..."])
+    base_height = st.number_input("Hauteur du support (cm)", value=15.0)
+    pallet_weight = st.number_input("Poids palette vide (kg)", value=25.0)
+
+n_l = int((l_range[1] - l_range[0]) / step) + 1
+n_w = int((w_range[1] - w_range[0]) / step) + 1
+st.caption(f"≈ {n_l * n_w:,} combinaisons L x W avant filtrage".replace(",", " "))
+
+# ==========================================
+# 4. CALCUL VECTORISÉ
+# ==========================================
+if st.button("LANCER LE BALAYAGE", disabled=not pallet_names):
+    pallets = {n: (PALLET_TYPES[n]['L'], PALLET_TYPES[n]['W'], pal_H, pal_p_max) for n in pallet_names}
+    args = (pallets, container_names, box_poids, base_height, pallet_weight)
+    start = time.perf_counter()
+    path = new_store_path()
+    with st.spinner("Évaluation des cartons candidats..."):
+        sweep_store(path, volume * 1000, l_range, w_range, pallets, container_names, step, h_step, h_range,
+                    box_poids, base_height, pallet_weight)
+        reference = evaluate([(ref_L, ref_W, ref_H)], *args)
+    st.session_state.sweep_result = {"store": path, "reference": reference, "box": (ref_L, ref_W, ref_H),
+                                     "pallets": pallets, "box_poids": box_poids,
+                                     "seconds": time.perf_counter() - start}
+
+# ==========================================
+# 5. CARTE ET CLASSEMENT
+# ==========================================
+state = st.session_state.sweep_result
+if state and not os.path.isdir(state["store"]):
+    st.session_state.sweep_result = state = None
+if state:
+    result, reference = ColumnStore(state["store"]), state["reference"]
+    st.markdown("---")
+    st.subheader(f"🔎 {len(result):,} cartons évalués en {state['seconds']:.2f} s".replace(",", " "))
+    if not len(result):
+        st.warning("Aucun carton candidat : élargissez les plages ou la hauteur admise.")
+        st.stop()
+
+    targets = [("pallet", n) for n in result.meta["pallet_names"]] + [("container", n) for n in result.meta["containers"]]
+    kind, name = st.selectbox("Critère", targets, format_func=lambda t: f"{'Palette' if t[0] == 'pallet' else 'Conteneur'} : {t[1]}")
+    ref_count = int(reference["pallets" if kind == "pallet" else "containers"][name][0])
+
+    col_map, col_rank = st.columns([1.2, 1], gap="large")
+    with col_map:
+        st.vega_lite_chart(heatmap_spec(result, kind, name, reference=sorted(state["box"][:2], reverse=True)), use_container_width=True)
+    with col_rank:
+        rows = ranking(result, kind, name, top=20)
+        df = pd.DataFrame(rows)
+        df.insert(4, "Gain", df["Box"] - ref_count)
+        if kind == "pallet":
+            # Contrôle des meilleurs formats avec le solveur complet (couches
+            # et empilements mixtes), via le cache partagé
+            pal = state["pallets"][name]
+            df.insert(5, "Total (couches mixtes)", [
+                cached_pallet(get_result_cache(), *pal, r["L"], r["W"], r["H"], state["box_poids"])[1]["Total"]
+                for r in rows])
+        st.metric("Carton actuel", f"{ref_count} box", help=f"{state['box'][0]} x {state['box'][1]} x {state['box'][2]} cm")
+        st.dataframe(df, hide_index=True, use_container_width=True)
+
+    # ==========================================
+    # 6. TOUS LES RÉSULTATS (LECTURE PAR PAGE)
+    # ==========================================
+    st.markdown("---")
+    st.subheader("🗂️ Tous les résultats")
+    column = target_column(result, kind, name)
+    col_f, col_p = st.columns([2, 1])
+    with col_f:
+        min_fill = st.slider("Remplissage minimal (%)", 0, 100, 0, help="Volume des box / volume utile de la palette ou du conteneur")
+    # Requête gardée tant que le critère et le filtre ne changent pas : les
+    # pages suivantes reprennent là où la précédente s'est arrêtée
+    query_key = (state["store"], column, min_fill)
+    if st.session_state.get('sweep_query_key') != query_key:
+        st.session_state.sweep_query_key = query_key
+        st.session_state.sweep_query = result.query([(f"fill.{column}", ">=", min_fill)] if min_fill else [], order=column)
+    query = st.session_state.sweep_query
+    matches = query.count()
+    with col_p:
+        page = st.number_input("Page", min_value=1, max_value=max(1, -(-matches // PAGE_SIZE)), value=1)
+    st.caption(f"{matches:,} carton(s) retenu(s)".replace(",", " ") + f", triés par box ({name}) puis surface de carton")
+    data = query.page((page - 1) * PAGE_SIZE, PAGE_SIZE, ["L", "W", "H", column, f"fill.{column}"])
+    st.dataframe(pd.DataFrame({"L": data["L"], "W": data["W"], "H": data["H"], "Box": data[column],
+                               "Remplissage (%)": data[f"fill.{column}"].astype(float).round(1)}),
+                 hide_index=True, use_container_width=True)
@@ -0,0 +1,41 @@
+# Imports paresseux (PEP 562) : "from pallet_opt import solve_pallet" ne
+# charge que le module concerné. NumPy, pandas et SQLite ne sont importés
+# que par les fonctions qui en ont besoin (démarrage rapide de la CLI).
+import importlib
+
+_EXPORTS = {
+    "core": ["ORIENTATIONS", "PALLET_TYPES", "box_orientations", "solve_pallet", "best_result", "pallet_geometry",
+             "apply_weight"],
+    "batch": ["RESULT_DTYPE", "solve_batch", "solve_best", "best_of", "to_records"],
+    "layers": ["best_layer", "solve_layers", "best_layout", "stack_layers", "layout_geometry", "weighted_layout"],
+    "containers": ["CONTAINER_TYPES", "professional_load_calc", "floor_layout", "apply_load"],
+    "fleet": ["LOAD_DTYPE", "container_specs", "floor_batch", "load_batch", "load_record"],
+    "cache": ["ResultCache", "cached_pallet", "cached_container"],
+    "parallel": ["run_sharded", "parallel_solve_best", "parallel_container_calc"],
+    "loading": ["PalletLoadingSolver", "solve_floor"],
+    "shipment": ["plan_shipment"],
+    "consolidation": ["load_mixed_container"],
+    "mixed_pallet": ["build_mixed_pallet", "placements_csv"],
+    "render": ["encode_boxes", "header_html", "pallet_boxes", "viewer_html"],
+    "incremental": ["Incremental"],
+    "store": ["ColumnStore", "StoreWriter"],
+    "pipeline": ["run_pipeline", "pallet_unit"],
+    "cli": ["pallet_record", "container_record"],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
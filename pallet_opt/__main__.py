@@ -0,0 +1,6 @@
+# python -m pallet_opt : ligne de commande (voir cli.py)
+import sys
+
+from .cli import main
+
+sys.exit(main())
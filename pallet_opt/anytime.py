@@ -0,0 +1,269 @@
+# ==========================================
+# OPTIMISATION EXACTE EN ARRIÈRE-PLAN (ANYTIME)
+# ==========================================
+# Couches identiques de box sur une palette, résolues avec le solveur exact
+# de loading.py (coupes guillotine + moulinets, bornes d'aire et de Barnes)
+# dans un thread : la page affiche tout de suite la réponse heuristique,
+# puis chaque amélioration du meilleur motif connu (incumbent) au fil du
+# calcul, jusqu'à la preuve d'optimalité, l'épuisement du budget ou
+# l'annulation (entrées modifiées).
+#
+# Une face posée au sol n'est explorée que si sa borne (borne de la couche
+# x nombre de couches, plafond de poids) dépasse le meilleur total connu ;
+# les faces sont prises de la plus prometteuse à la moins prometteuse.
+#
+# Quand le motif à cinq blocs reste sous la borne, une recherche exhaustive
+# (exact_layer) tente de faire mieux ; si elle échoue, le motif est prouvé
+# optimal pour cette face.
+#
+# La preuve ne couvre que les piles de couches identiques : un empilement
+# mixte (layers.weighted_layout) peut faire mieux. La réponse de la page
+# (seed) sert donc de meilleur total de départ ; la borne affichée n'est
+# jamais inférieure au meilleur total connu et le statut final est
+# OPTIMAL_STATUS (« optimal, couches identiques »).
+import math
+import sys
+import threading
+import time
+
+from .layers import SCALE, _reduce, best_layer, layer_faces, normal_points, to_units
+from .loading import PalletLoadingSolver, upper_bound
+
+DEFAULT_TIME_BUDGET = 30.0
+# Au-delà, la grille des points normaux est trop fine pour une preuve
+MAX_PROOF_CELLS = 4096
+OPTIMAL_STATUS = "optimal (couches identiques)"
+
+
+class _Stop(Exception):
+    pass
+
+
+def exact_layer(X, Y, a, b, lower, deadline=math.inf, cancel=None, on_improve=None, max_cells=MAX_PROOF_CELLS):
+    # Séparation et évaluation sur les motifs normaux (tout chargement peut
+    # être poussé en bas à gauche jusqu'à des points normaux, les bords des
+    # box tombent alors sur la grille des points normaux) : la première
+    # case libre (de bas en haut, de gauche à droite) reçoit le coin d'une
+    # box, dans un sens ou l'autre, ou reste vide. Borne : box posées + aire
+    # libre / aire d'une box.
+    # Renvoie (n, placements) pour le meilleur motif de plus de lower box,
+    # (lower, None) si aucun n'existe, None si la grille est trop fine.
+    # Lève _Stop (budget, annulation).
+    xs, ys = normal_points(X, a, b), normal_points(Y, a, b)
+    X0, Y0 = _reduce(X, xs), _reduce(Y, ys)
+    xs, ys = [v for v in xs if v <= X0], [v for v in ys if v <= Y0]
+    nx, ny = len(xs) - 1, len(ys) - 1
+    if nx <= 0 or ny <= 0:
+        return lower, None
+    if nx * ny > max_cells:
+        return None
+    xi, yi = {v: i for i, v in enumerate(xs)}, {v: j for j, v in enumerate(ys)}
+    area = a * b
+    cell_area = [[(xs[i + 1] - xs[i]) * (ys[j + 1] - ys[j]) for i in range(nx)] for j in range(ny)]
+    used = [bytearray(nx) for _ in range(ny)]
+    state = {"best": lower, "placements": None, "ticks": 0}
+    stack = []
+    shapes = [(a, b), (b, a)] if a != b else [(a, b)]
+
+    def fits(i, j, i2, j2):
+        for row in used[j:j2]:
+            if any(row[i:i2]):
+                return False
+        return True
+
+    def mark(i, j, i2, j2, value):
+        for row in used[j:j2]:
+            row[i:i2] = bytes([value]) * (i2 - i)
+
+    def search(k, placed, free):
+        state["ticks"] += 1
+        if state["ticks"] & 1023 == 0 and (time.perf_counter() > deadline or (cancel is not None and cancel.is_set())):
+            raise _Stop
+        if placed + free // area <= state["best"]:
+            return
+        while k < nx * ny and used[k // nx][k % nx]:
+            k += 1
+        if k == nx * ny:
+            state["best"], state["placements"] = placed, list(stack)
+            if on_improve is not None:
+                on_improve(placed, state["placements"])
+            return
+        j, i = divmod(k, nx)
+        for l, w in shapes:
+            i2, j2 = xi.get(xs[i] + l), yi.get(ys[j] + w)
+            if i2 is None or j2 is None or not fits(i, j, i2, j2):
+                continue
+            mark(i, j, i2, j2, 1)
+            stack.append((xs[i], ys[j], l, w))
+            covered = sum(cell_area[r][c] for r in range(j, j2) for c in range(i, i2))
+            search(k + 1, placed + 1, free - covered)
+            stack.pop()
+            mark(i, j, i2, j2, 0)
+        # Case laissée vide
+        used[j][i] = 2
+        search(k + 1, placed, free - cell_area[j][i])
+        used[j][i] = 0
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, nx * ny + 100))
+    try:
+        search(0, 0, X0 * Y0)
+    finally:
+        sys.setrecursionlimit(limit)
+    return state["best"], state["placements"]
+
+
+class AnytimeLayer:
+    def __init__(self, pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids, time_budget=DEFAULT_TIME_BUDGET, seed=None):
+        # seed : meilleur résultat déjà connu (celui affiché par la page),
+        # seuls les motifs qui le battent sont proposés
+        self.key = (pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids, time_budget)
+        self.pal_L, self.pal_w, self.pal_H = pal_L, pal_w, pal_H
+        self.max_p = int(pal_p_max / box_poids) if box_poids > 0 else None
+        self.box_poids = box_poids
+        self.dims = (L, W, H)
+        self.time_budget = math.inf if time_budget is None else time_budget
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.best = seed
+        self.version = 0
+        self.status = "en attente"
+        self.upper_bound = None
+        self.started = None
+        self.elapsed = 0.0
+
+    # --- cycle de vie ---
+    def start(self):
+        if self._thread is None:
+            self.started = time.perf_counter()
+            self.status = "en cours"
+            self._thread = threading.Thread(target=self._run, name="pallet-opt-anytime", daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        # État cohérent pour l'affichage (appelé depuis le thread Streamlit)
+        with self._lock:
+            elapsed = time.perf_counter() - self.started if self.running else self.elapsed
+            return {"best": self.best, "version": self.version, "status": self.status,
+                    "upper_bound": self.upper_bound, "elapsed": elapsed, "running": self.running}
+
+    # --- calcul ---
+    def _cap(self, count):
+        return count if self.max_p is None else min(count, self.max_p)
+
+    def _offer(self, face, per_layer, placements, scale=SCALE):
+        # placements en unités du solveur (mm) ; scale=1 pour des cm
+        bl, bw, bh, layers = face
+        total = self._cap(per_layer * layers)
+        with self._lock:
+            if self.best is not None and total <= self.best["Total"]:
+                return
+            nc_final = total // per_layer if per_layer > 0 else 0
+            self.best = {
+                "Orientation": f"{bl}x{bw} (exacte)",
+                "Hauteur": bh,
+                "Total": total,
+                "Par Couche": per_layer,
+                "Nb Couches": nc_final,
+                "Poids (kg)": total * self.box_poids,
+                "placements": [(x / scale, y / scale, l / scale, w / scale) for x, y, l, w in placements],
+            }
+            self.version += 1
+
+    def _needed(self, layers):
+        # Box par couche nécessaires pour battre le meilleur total connu
+        total = self._total()
+        if self.max_p is not None and self.max_p <= total:
+            return math.inf
+        return total // layers + 1
+
+    def _run(self):
+        X, Y = to_units(self.pal_L), to_units(self.pal_w)
+        deadline = self.started + self.time_budget
+        faces = []
+        for bl, bw, bh in layer_faces(*self.dims):
+            a, b = to_units(bl, up=True), to_units(bw, up=True)
+            layers = int(self.pal_H / bh) if bh > 0 else 0
+            if X <= 0 or Y <= 0 or a <= 0 or b <= 0 or layers <= 0:
+                continue
+            a, b = max(a, b), min(a, b)
+            faces.append((self._cap(upper_bound(X, Y, a, b) * layers), (bl, bw, bh, layers), a, b))
+        # Réponse immédiate : meilleure couche guillotine de chaque face
+        for bound, face, a, b in faces:
+            count, placements = best_layer(self.pal_L, self.pal_w, face[0], face[1])
+            self._offer(face, count, placements, scale=1)
+        # Puis les plus prometteuses d'abord : le meilleur total connu élague
+        # les suivantes
+        faces.sort(key=lambda f: -f[0])
+        # Bornes des faces dont l'optimum n'est pas (encore) prouvé
+        open_bounds = {i: f[0] for i, f in enumerate(faces)}
+        status = None
+        try:
+            for i, (bound, face, a, b) in enumerate(faces):
+                self._set_bound(open_bounds.values())
+                if self._total() >= bound:
+                    del open_bounds[i]
+                    continue
+                if self._cancel.is_set():
+                    status = "annulé"
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    status = "budget épuisé"
+                    break
+                solver = PalletLoadingSolver(X, Y, a, b, remaining, cancel=self._cancel,
+                                             on_improve=lambda n, p, face=face: self._offer(face, n, p))
+                res = solver.solve()
+                self._offer(face, res["count"], res["placements"])
+                if res["cancelled"]:
+                    status = "annulé"
+                    break
+                if res["timed_out"]:
+                    status = "budget épuisé"
+                    break
+                if self._cap(res["count"] * face[3]) >= bound:
+                    del open_bounds[i]
+                    continue
+                # Motif à cinq blocs sous la borne : recherche exhaustive d'un
+                # motif qui battrait le meilleur total
+                need = self._needed(face[3])
+                if need > upper_bound(X, Y, a, b):
+                    del open_bounds[i]
+                    continue
+                try:
+                    proof = exact_layer(X, Y, a, b, need - 1, deadline, self._cancel,
+                                        on_improve=lambda n, p, face=face: self._offer(face, n, p))
+                except _Stop:
+                    status = "annulé" if self._cancel.is_set() else "budget épuisé"
+                    break
+                if proof is not None:
+                    del open_bounds[i]
+        finally:
+            with self._lock:
+                total = self.best["Total"] if self.best else 0
+                self.upper_bound = max([total] + [ub for ub in open_bounds.values() if ub > total])
+                if status is None:
+                    status = OPTIMAL_STATUS if self.upper_bound <= total else "terminé"
+                self.status = status
+                self.elapsed = time.perf_counter() - self.started
+
+    def _total(self):
+        with self._lock:
+            return self.best["Total"] if self.best else -1
+
+    def _set_bound(self, bounds):
+        with self._lock:
+            self.upper_bound = max([self.best["Total"] if self.best else 0] + list(bounds))
@@ -0,0 +1,118 @@
+# ==========================================
+# MOTEUR DE CALCUL PALETTE (VECTORISÉ)
+# ==========================================
+# Évalue les 6 orientations pour N box x M palettes en une seule passe
+# NumPy. Les règles sont strictement celles de core.solve_pallet :
+# troncature int(), plafond de poids, nombre de couches final.
+import numpy as np
+
+from .core import ORIENTATIONS
+
+# Colonnes d'entrée attendues
+BOX_COLUMNS = ("L", "W", "H", "box_poids")
+PALLET_COLUMNS = ("pal_L", "pal_w", "pal_H", "pal_p_max")
+
+RESULT_DTYPE = np.dtype([
+    ("orientation", "i1"),
+    ("bl", "f8"), ("bw", "f8"), ("bh", "f8"),
+    ("nx", "i8"), ("ny", "i8"),
+    ("per_layer", "i8"), ("layers", "i8"),
+    ("total", "i8"), ("weight", "f8"),
+])
+
+_ORIENT_IDX = np.array(ORIENTATIONS, dtype=np.intp)
+
+# Taille de bloc par défaut pour solve_best (nombre de box traitées à la fois)
+DEFAULT_CHUNK = 20000
+
+
+def _as_matrix(data, ncols, name):
+    arr = np.asarray(data, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2 or arr.shape[1] != ncols:
+        raise ValueError(f"{name} doit être de forme (n, {ncols}), reçu {arr.shape}")
+    return arr
+
+
+def _safe_trunc_div(num, den):
+    # int(num / den) if den > 0 else 0, élément par élément
+    pos = den > 0
+    out = np.zeros(np.broadcast(num, den).shape, dtype=np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.trunc(num / np.where(pos, den, 1.0))
+    np.copyto(out, q.astype(np.int64, copy=False), where=pos)
+    return out
+
+
+def solve_batch(boxes, pallets):
+    boxes = _as_matrix(boxes, 4, "boxes")
+    pallets = _as_matrix(pallets, 4, "pallets")
+
+    # (N, 6, 3) : dimensions orientées de chaque box
+    oriented = boxes[:, :3][:, _ORIENT_IDX]
+    bl = oriented[:, None, :, 0]
+    bw = oriented[:, None, :, 1]
+    bh = oriented[:, None, :, 2]
+    poids = boxes[:, 3][:, None, None]
+
+    pal_L = pallets[:, 0][None, :, None]
+    pal_w = pallets[:, 1][None, :, None]
+    pal_H = pallets[:, 2][None, :, None]
+    pal_p_max = pallets[:, 3][None, :, None]
+
+    nx = _safe_trunc_div(pal_L, bl)
+    ny = _safe_trunc_div(pal_w, bw)
+    pc = nx * ny
+    nc_vol = _safe_trunc_div(pal_H, bh)
+    t_vol = pc * nc_vol
+
+    max_p = np.where(poids > 0, _safe_trunc_div(pal_p_max, poids), t_vol)
+    total = np.minimum(t_vol, max_p)
+    nc_final = np.where(pc > 0, total // np.where(pc > 0, pc, 1), 0)
+
+    shape = (boxes.shape[0], pallets.shape[0], len(ORIENTATIONS))
+    out = np.empty(shape, dtype=RESULT_DTYPE)
+    out["orientation"] = np.arange(len(ORIENTATIONS))
+    out["bl"] = bl
+    out["bw"] = bw
+    out["bh"] = bh
+    out["nx"] = nx
+    out["ny"] = ny
+    out["per_layer"] = pc
+    out["layers"] = nc_final
+    out["total"] = total
+    out["weight"] = total * poids
+    return out
+
+
+def best_of(table):
+    # argmax renvoie la première orientation en cas d'égalité, comme best_result
+    idx = np.argmax(table["total"], axis=-1)
+    return np.take_along_axis(table, idx[..., None], axis=-1)[..., 0]
+
+
+def solve_best(boxes, pallets, chunk_size=DEFAULT_CHUNK):
+    # Meilleure orientation par couple (box, palette), calculée par blocs pour
+    # ne jamais matérialiser le tableau complet (N, M, 6) sur de gros catalogues.
+    boxes = _as_matrix(boxes, 4, "boxes")
+    pallets = _as_matrix(pallets, 4, "pallets")
+    out = np.empty((boxes.shape[0], pallets.shape[0]), dtype=RESULT_DTYPE)
+    for start in range(0, boxes.shape[0], chunk_size):
+        stop = start + chunk_size
+        out[start:stop] = best_of(solve_batch(boxes[start:stop], pallets))
+    return out
+
+
+def to_records(row):
+    # Convertit une ligne du tableau structuré au format dict de core.solve_pallet
+    return {
+        "Orientation": f"{float(row['bl'])}x{float(row['bw'])}",
+        "Hauteur": float(row["bh"]),
+        "Total": int(row["total"]),
+        "Par Couche": int(row["per_layer"]),
+        "Nb Couches": int(row["layers"]),
+        "Poids (kg)": float(row["weight"]),
+        "nx": int(row["nx"]),
+        "ny": int(row["ny"]),
+    }
@@ -0,0 +1,357 @@
+# ==========================================
+# BANCS DE PERFORMANCE ET CORPUS DE CORRECTION
+# ==========================================
+# Hors ligne, en ligne de commande :
+#   python -m pallet_opt.bench run [--quick] [--out bench.json] [--workers N]
+#   python -m pallet_opt.bench check
+#   python -m pallet_opt.bench compare ancien.json nouveau.json [--threshold 1.2]
+#   python -m pallet_opt.bench corpus      (régénère bench_corpus.py)
+#
+# "run" mesure la latence d'un calcul unitaire (boucle des orientations,
+# couches mixtes, conteneur), le débit du calcul par lots en fonction du
+# nombre de SKU et des cas défavorables (très petites box, conteneurs
+# personnalisés hors table). Le résultat est un JSON (métadonnées + une
+# ligne par mesure) que "compare" sait confronter à un autre passage.
+#
+# "check" rejoue le corpus d'instances à optimum prouvé (le solveur exact y
+# atteint la borne de Barnes) : un solveur ne doit jamais placer moins de
+# box que sa référence enregistrée, ni plus que l'optimum. Il vérifie aussi
+# que le calcul vectorisé et les tables reproduisent le calcul scalaire.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_PALLET = (120.0, 80.0, 200.0, 1000.0)
+DEFAULT_BOX = (45.0, 35.0, 25.0, 15.0)
+BATCH_SIZES = (100, 1000, 10000, 100000)
+QUICK_BATCH_SIZES = (100, 1000, 10000)
+
+
+# ==========================================
+# MESURE
+# ==========================================
+def measure(fn, setup=None, repeat=5, min_time=0.2):
+    # Meilleur temps et médiane par appel (s). Sans setup, le nombre d'appels
+    # par répétition est ajusté pour durer au moins min_time ; avec setup
+    # (cache vidé, etc.), chaque appel est mesuré seul.
+    number = 1
+    if setup is None:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if time.perf_counter() - start >= min_time or number >= 1 << 20:
+                break
+            number *= 2
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {"number": number, "repeat": repeat, "best_s": min(times), "median_s": statistics.median(times)}
+
+
+def _record(name, params, stats, items=None):
+    rec = {"name": name, "params": params, **stats}
+    if items:
+        rec["items"] = items
+        rec["throughput_per_s"] = items / stats["median_s"] if stats["median_s"] > 0 else None
+    return rec
+
+
+def metadata():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git": rev,
+    }
+
+
+# ==========================================
+# BANCS
+# ==========================================
+def _random_boxes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(5, 80, n).round(1), rng.uniform(5, 60, n).round(1),
+        rng.uniform(5, 60, n).round(1), rng.uniform(0.5, 30, n).round(2),
+    ])
+
+
+def _random_pallet_loads(n, seed=0):
+    # Palettes chargées (PALLET_COLUMNS de fleet.py) sur les empreintes de
+    # la table des plans au sol
+    from .loading import COMMON_FOOTPRINTS
+
+    rng = np.random.default_rng(seed)
+    footprints = np.array(COMMON_FOOTPRINTS)[rng.integers(0, len(COMMON_FOOTPRINTS), n)]
+    return np.column_stack([
+        footprints, rng.uniform(60, 250, n).round(1), rng.uniform(0.5, 30, n).round(2),
+        rng.choice([0.0, 10.0, 25.0], n), rng.integers(1, 120, n),
+    ])
+
+
+def bench_single(repeat):
+    from .cache import ResultCache, cached_pallet
+    from .containers import CONTAINER_TYPES, professional_load_calc
+    from .core import solve_pallet
+    from .layers import _layer_solver, best_layout
+
+    args = DEFAULT_PALLET + DEFAULT_BOX
+    params = {"pallet": DEFAULT_PALLET, "box": DEFAULT_BOX}
+    out = [_record("pallet.solve_pallet", params, measure(lambda: solve_pallet(*args), repeat=repeat))]
+    results = solve_pallet(*args)
+    out.append(_record("pallet.best_layout.cold", params,
+                       measure(lambda: best_layout(*args, results), setup=_layer_solver.cache_clear, repeat=repeat)))
+    cache = ResultCache(":memory:")
+    cached_pallet(cache, *args)
+    out.append(_record("pallet.cached_pallet.hit", params, measure(lambda: cached_pallet(cache, *args), repeat=repeat)))
+
+    cont = CONTAINER_TYPES["2 EVP (40' Standard)"]
+    cargs = (cont["L"], cont["W"], cont["H"], 120.0, 80.0, 160.0, 12.5, 25.0, 40, cont["MaxPayload"])
+    out.append(_record("container.professional_load_calc", {"container": "40' Standard", "pallet": (120.0, 80.0, 160.0)},
+                       measure(lambda: professional_load_calc(*cargs), repeat=repeat)))
+    return out
+
+
+def bench_batch(sizes, repeat, workers=1):
+    from .batch import solve_best
+    from .fleet import container_specs, load_batch
+
+    pallets = np.array([DEFAULT_PALLET, (120.0, 100.0, 200.0, 1000.0)])
+    out = []
+    for n in sizes:
+        boxes = _random_boxes(n)
+        out.append(_record("batch.solve_best", {"skus": n, "pallets": len(pallets)},
+                           measure(lambda: solve_best(boxes, pallets), repeat=repeat), items=n))
+        if workers > 1:
+            from .parallel import parallel_solve_best
+            out.append(_record("batch.parallel_solve_best", {"skus": n, "pallets": len(pallets), "workers": workers},
+                               measure(lambda: parallel_solve_best(boxes, pallets, workers=workers), repeat=repeat), items=n))
+    # Conteneurs standards x configurations de palette (empreintes de la table)
+    containers = container_specs()
+    for n in sizes:
+        configs = _random_pallet_loads(n)
+        out.append(_record("fleet.load_batch", {"configs": n, "containers": len(containers)},
+                           measure(lambda: load_batch(containers, configs), repeat=repeat), items=n * len(containers)))
+    return out
+
+
+def bench_worst(repeat):
+    from .consolidation import load_mixed_container
+    from .containers import professional_load_calc
+    from .layers import _layer_solver, best_layer
+    from .loading import solve_floor
+
+    out = []
+    # Très petites box sur grande palette : budget de travail du moteur de couche
+    for pal, box in (((120.0, 80.0), (5.0, 5.0)), ((120.0, 100.0), (3.3, 2.1)), ((240.0, 120.0), (7.3, 4.9))):
+        out.append(_record("worst.best_layer.tiny", {"pallet": pal, "box": box},
+                           measure(lambda: best_layer(*pal, *box), setup=_layer_solver.cache_clear, repeat=repeat)))
+    # Conteneurs personnalisés hors table : solveur exact avec budget de temps
+    for cont, pal in (((1000.0, 245.0, 250.0), (115.0, 115.0)), ((1500.0, 300.0, 250.0), (57.0, 43.0))):
+        out.append(_record("worst.solve_floor.custom", {"floor": cont[:2], "pallet": pal},
+                           measure(lambda: solve_floor(*cont[:2], *pal, use_table=False), repeat=max(1, repeat // 2), min_time=0)))
+        out.append(_record("worst.professional_load_calc.custom", {"container": cont, "pallet": pal},
+                           measure(lambda: professional_load_calc(*cont, *pal, 150.0, 10.0, 25.0, 30, 30000.0),
+                                   repeat=max(1, repeat // 2), min_time=0)))
+    # Chargement hétérogène : nombre de palettes croissant
+    types = [{"name": f"T{i}", "L": L, "W": W, "H": H, "qty": 1, "box_weight": 100.0, "support_weight": 20.0}
+             for i, (L, W, H) in enumerate([(120, 80, 110), (120, 100, 140), (80, 60, 90), (60, 40, 60)])]
+    for qty in (25, 250, 2500):
+        batch = [dict(t, qty=qty) for t in types]
+        out.append(_record("worst.load_mixed_container", {"pallets": qty * len(types)},
+                           measure(lambda: load_mixed_container(1203.2 * qty / 25, 235.2, 239.3, batch, 1e9), repeat=repeat),
+                           items=qty * len(types)))
+    return out
+
+
+def run(quick=False, workers=1):
+    repeat = 3 if quick else 7
+    results = bench_single(repeat)
+    results += bench_batch(QUICK_BATCH_SIZES if quick else BATCH_SIZES, repeat, workers)
+    results += bench_worst(repeat)
+    return {"meta": metadata(), "results": results}
+
+
+# ==========================================
+# COMPARAISON DE DEUX PASSAGES
+# ==========================================
+def _key(rec):
+    return rec["name"], json.dumps(rec["params"], sort_keys=True)
+
+
+def compare(old, new, threshold=1.2):
+    # Renvoie [(nom, paramètres, médiane ancienne, nouvelle, ratio)] et la
+    # liste des régressions (ratio > threshold)
+    old_idx = {_key(r): r for r in old["results"]}
+    rows, regressions = [], []
+    for rec in new["results"]:
+        prev = old_idx.get(_key(rec))
+        if prev is None:
+            continue
+        ratio = rec["median_s"] / prev["median_s"] if prev["median_s"] > 0 else float("inf")
+        row = (rec["name"], _key(rec)[1], prev["median_s"], rec["median_s"], ratio)
+        rows.append(row)
+        if ratio > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+# ==========================================
+# CORPUS DE CORRECTION
+# ==========================================
+def build_corpus(size=40, seed=7, time_budget=5.0, max_tries=1000):
+    # Instances (X, Y, a, b) en mm où le solveur exact atteint la borne
+    # supérieure (optimum prouvé) et bat le motif homogène. On enregistre
+    # l'optimum et le nombre trouvé par le moteur de couche guillotine.
+    import random
+    from .layers import MAX_WORK, _layer_solver
+    from .loading import PalletLoadingSolver
+
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(max_tries):
+        if len(corpus) >= size:
+            break
+        X = rng.choice([1200, 1200, 1000, 800, 1140, rng.randint(600, 1500)])
+        Y = rng.choice([800, 1000, rng.randint(400, X)])
+        X, Y = max(X, Y), min(X, Y)
+        a = rng.randint(80, 500)
+        b = rng.randint(60, a)
+        if not 4 <= (X * Y) // (a * b) <= 80:
+            continue
+        res = PalletLoadingSolver(X, Y, a, b, time_budget).solve()
+        homogeneous = max((X // a) * (Y // b), (X // b) * (Y // a))
+        if res["optimal"] and res["count"] > homogeneous:
+            layer = _layer_solver.__wrapped__(X, Y, a, b, MAX_WORK)[0]
+            corpus.append((X, Y, a, b, res["count"], layer))
+    return corpus
+
+
+def write_corpus(path, corpus):
+    lines = [
+        "# Fichier généré par : python -m pallet_opt.bench corpus",
+        "# (X, Y, a, b, optimum prouvé, référence du moteur de couche) en mm :",
+        "# rectangle X x Y, box a x b (rotation autorisée).",
+        "CORPUS = [",
+    ]
+    lines += [f"    {row!r}," for row in corpus]
+    lines.append("]")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+
+def check(time_budget=10.0, samples=2000):
+    # Renvoie la liste des écarts (vide si tout est conforme)
+    from .batch import solve_batch
+    from .bench_corpus import CORPUS
+    from .core import solve_pallet
+    from .layers import MAX_WORK, _layer_solver
+    from .loading import PalletLoadingSolver
+
+    problems = []
+    for X, Y, a, b, optimum, layer_ref in CORPUS:
+        exact = PalletLoadingSolver(X, Y, a, b, time_budget).solve()["count"]
+        if exact != optimum:
+            problems.append(("exact", (X, Y, a, b), exact, optimum))
+        layer = _layer_solver.__wrapped__(X, Y, a, b, MAX_WORK)[0]
+        if not layer_ref <= layer <= optimum:
+            problems.append(("layer", (X, Y, a, b), layer, layer_ref))
+
+    # Calcul vectorisé == boucle scalaire historique
+    boxes = _random_boxes(samples, seed=1)
+    pallets = np.array([DEFAULT_PALLET, (120.0, 100.0, 180.0, 500.0), (80.0, 60.0, 150.0, 300.0)])
+    batch = solve_batch(boxes, pallets)
+    for i, box in enumerate(boxes.tolist()):
+        for j, pal in enumerate(pallets.tolist()):
+            totals = [r["Total"] for r in solve_pallet(*pal, *box)]
+            if totals != batch["total"][i, j].tolist():
+                problems.append(("batch", (tuple(pal), tuple(box)), batch["total"][i, j].tolist(), totals))
+
+    # Moteur conteneur vectorisé == professional_load_calc
+    from .containers import professional_load_calc
+    from .fleet import container_specs, load_batch, load_record
+
+    containers = container_specs(custom=[(0.0, 0.0, 0.0, 0.0)])
+    configs = _random_pallet_loads(samples // 4, seed=2)
+    loads = load_batch(containers, configs)
+    for i, cont in enumerate(containers.tolist()):
+        for j, pal in enumerate(configs.tolist()):
+            ref = professional_load_calc(*cont[:3], *pal, cont[3])
+            got = load_record(loads[i, j])
+            if any(ref.get(k, 0) != v for k, v in got.items()):
+                problems.append(("fleet", (tuple(cont), tuple(pal)), got, {k: ref.get(k, 0) for k in got}))
+
+    # Tables précalculées == moteur de couche (si elles sont construites)
+    from .tables import check as check_tables
+    try:
+        problems += [("table",) + tuple(row) for row in check_tables(samples=200)]
+    except FileNotFoundError:
+        pass
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pallet_opt.bench")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="mesures de performance (JSON)")
+    p_run.add_argument("--quick", action="store_true", help="tailles réduites, moins de répétitions")
+    p_run.add_argument("--workers", type=int, default=1, help="mesure aussi le calcul parallèle")
+    p_run.add_argument("--out", help="fichier JSON de sortie (défaut : sortie standard)")
+    sub.add_parser("check", help="corpus de correction")
+    p_cmp = sub.add_parser("compare", help="compare deux fichiers JSON de 'run'")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=1.2, help="ratio de médianes signalé comme régression")
+    sub.add_parser("corpus", help="régénère bench_corpus.py")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = json.dumps(run(quick=args.quick, workers=args.workers), indent=2)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as fh:
+                fh.write(report + "\n")
+        else:
+            print(report)
+        return 0
+    if args.command == "check":
+        problems = check()
+        for row in problems[:20]:
+            print("Écart :", row)
+        print("OK" if not problems else f"{len(problems)} écarts")
+        return 1 if problems else 0
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as fh:
+            old = json.load(fh)
+        with open(args.new, encoding="utf-8") as fh:
+            new = json.load(fh)
+        rows, regressions = compare(old, new, args.threshold)
+        for name, params, before, after, ratio in rows:
+            flag = "  <-- régression" if ratio > args.threshold else ""
+            print(f"{name:40s} {params:55s} {before * 1e3:10.3f} ms {after * 1e3:10.3f} ms  x{ratio:5.2f}{flag}")
+        return 1 if regressions else 0
+    write_corpus(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_corpus.py"), build_corpus())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
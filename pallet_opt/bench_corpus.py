@@ -0,0 +1,45 @@
+# Fichier généré par : python -m pallet_opt.bench corpus
+# (X, Y, a, b, optimum prouvé, référence du moteur de couche) en mm :
+# rectangle X x Y, box a x b (rotation autorisée).
+CORPUS = [
+    (1200, 800, 302, 167, 17, 17),
+    (1200, 800, 228, 167, 24, 24),
+    (1200, 584, 479, 184, 7, 7),
+    (1140, 707, 333, 235, 10, 10),
+    (800, 547, 117, 67, 53, 53),
+    (1000, 748, 259, 212, 12, 11),
+    (1140, 800, 127, 94, 75, 74),
+    (891, 597, 257, 65, 29, 29),
+    (800, 800, 165, 117, 32, 30),
+    (1140, 800, 499, 280, 6, 6),
+    (800, 800, 122, 71, 72, 69),
+    (1200, 800, 136, 103, 67, 65),
+    (1200, 800, 370, 137, 18, 17),
+    (1000, 800, 327, 219, 10, 10),
+    (800, 800, 344, 71, 24, 24),
+    (1140, 800, 433, 338, 5, 5),
+    (1140, 705, 126, 93, 66, 66),
+    (1000, 1000, 475, 174, 12, 11),
+    (1140, 1000, 405, 174, 15, 14),
+    (1200, 1000, 458, 176, 14, 13),
+    (1140, 1000, 454, 74, 32, 32),
+    (1000, 1000, 179, 148, 36, 33),
+    (1000, 857, 258, 153, 20, 19),
+    (1200, 800, 320, 160, 17, 17),
+    (1200, 894, 392, 60, 44, 44),
+    (1000, 997, 171, 115, 48, 47),
+    (1425, 699, 385, 302, 8, 7),
+    (1000, 559, 360, 127, 10, 10),
+    (1200, 699, 203, 143, 28, 27),
+    (1200, 800, 322, 121, 22, 22),
+    (1200, 800, 475, 110, 16, 16),
+    (800, 800, 469, 92, 12, 11),
+    (1000, 917, 342, 162, 15, 14),
+    (1000, 800, 142, 110, 50, 50),
+    (1000, 800, 253, 167, 16, 16),
+    (1000, 800, 218, 93, 37, 36),
+    (1000, 800, 287, 98, 26, 26),
+    (1000, 458, 173, 114, 22, 22),
+    (1000, 417, 125, 93, 34, 34),
+    (1140, 800, 215, 91, 45, 44),
+]
@@ -0,0 +1,258 @@
+# ==========================================
+# CACHE DE RÉSULTATS PARTAGÉ (SQLITE, LRU)
+# ==========================================
+# Un seul fichier SQLite partagé par toutes les sessions et tous les
+# processus. Les clés sont une forme canonique des entrées (dimensions
+# arrondies au mm, dimensions de box triées pour la palette car les 6
+# orientations rendent le calcul invariant par permutation). Les valeurs
+# sont stockées en JSON. Au-delà de max_entries, les entrées les moins
+# récemment utilisées sont évincées.
+#
+# Une lecture n'écrit rien : la date d'utilisation d'une entrée n'est
+# rafraîchie que si elle a plus de TOUCH_INTERVAL secondes, et ces mises à
+# jour comme les compteurs hits / misses sont gardées en mémoire puis
+# écrites en une transaction toutes les FLUSH_INTERVAL secondes (ou avec la
+# prochaine écriture). Les lectures concurrentes ne se disputent donc plus
+# le verrou d'écriture SQLite.
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "PALLET_OPT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pallet_opt", "results.sqlite"),
+)
+DEFAULT_MAX_ENTRIES = 50000
+
+# Version des algorithmes : à incrémenter quand un résultat change de forme
+CACHE_VERSION = 5
+# Âge (s) au-delà duquel un hit rafraîchit la date d'utilisation (LRU)
+TOUCH_INTERVAL = 60.0
+# Intervalle (s) d'écriture des dates et compteurs en attente
+FLUSH_INTERVAL = 5.0
+MAX_PENDING_TOUCHES = 1024
+
+
+def mm(value):
+    # Arrondi au millimètre (les dimensions sont saisies en cm)
+    return int(round(float(value) * 10))
+
+
+def grams(value):
+    return int(round(float(value) * 1000))
+
+
+def make_key(kind, *parts):
+    return json.dumps([kind, CACHE_VERSION, *parts], separators=(",", ":"))
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO stats VALUES (?, 0)", [("hits",), ("misses",), ("evictions",)]
+        )
+        # En attente d'écriture : clé -> date d'utilisation, compteurs
+        self._touched = {}
+        self._counts = {"hits": 0, "misses": 0}
+        self._flushed = time.monotonic()
+
+    def _bump(self, name, n=1):
+        self._conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    def _write_pending(self):
+        # Dans une transaction ouverte, sous self._lock
+        if self._touched:
+            self._conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                   [(t, key) for key, t in self._touched.items()])
+            self._touched = {}
+        for name, n in self._counts.items():
+            if n:
+                self._bump(name, n)
+                self._counts[name] = 0
+        self._flushed = time.monotonic()
+
+    def _flush(self):
+        with self._lock:
+            if not self._touched and not any(self._counts.values()):
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_pending()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, last_used FROM entries WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None:
+                self._counts["misses"] += 1
+            else:
+                self._counts["hits"] += 1
+                if now - row[1] > TOUCH_INTERVAL:
+                    self._touched[key] = now
+            due = (time.monotonic() - self._flushed >= FLUSH_INTERVAL or len(self._touched) >= MAX_PENDING_TOUCHES)
+        if due:
+            self._flush()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key, value):
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_pending()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, payload, time.time())
+                )
+                count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE key IN "
+                        "(SELECT key FROM entries ORDER BY last_used LIMIT ?)", (excess,)
+                    )
+                    self._bump("evictions", excess)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            # Aller-retour JSON pour que le résultat soit identique hit ou miss
+            value = json.loads(json.dumps(compute()))
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        self._flush()
+        with self._lock:
+            out = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            out["entries"] = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        out["max_entries"] = self.max_entries
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._counts = {"hits": 0, "misses": 0}
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE stats SET value = 0")
+
+    def close(self):
+        self._flush()
+        self._conn.close()
+
+
+# ==========================================
+# CLÉS CANONIQUES ET APPELS EN CACHE
+# ==========================================
+def canonical_pallet(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids):
+    # Dimensions de box triées (ordre décroissant) puis ramenées au mm
+    L, W, H = sorted((mm(L), mm(W), mm(H)), reverse=True)
+    pallet = (mm(pal_L), mm(pal_w), mm(pal_H), grams(pal_p_max))
+    return pallet + (L, W, H, grams(box_poids))
+
+
+def cached_pallet(cache, pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids, geometry=None):
+    # Renvoie (results, best) : géométrie calculée (et mise en cache) sur les
+    # entrées canoniques, résultats remis dans l'ordre des dimensions
+    # saisies. geometry : fonction (pal_L, pal_w, pal_H, L, W, H) ->
+    # layers.layout_geometry, fournie par la page pour réutiliser la
+    # géométrie quand seuls les poids changent.
+    canon = canonical_pallet(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids)
+    value = cache.get_or_compute(make_key("pallet", *canon), lambda: pallet_value(canon, geometry))
+    return input_order(value, canon, L, W, H)
+
+
+def _canonical_args(canon):
+    # Entrées canoniques ramenées en cm / kg
+    return [v / 10 for v in canon[:3]] + [canon[3] / 1000] + [v / 10 for v in canon[4:7]] + [canon[7] / 1000]
+
+
+def _face_key(bl, bw, bh):
+    return mm(max(bl, bw)), mm(min(bl, bw)), mm(bh)
+
+
+def pallet_value(canon, geometry=None):
+    # Valeur mise en cache : résultat sur les dimensions triées et, par face
+    # posée au sol, la couche mixte (nombre de box, placements s'ils ont été
+    # calculés) pour refaire la pesée dans un autre ordre
+    from .layers import layout_geometry, weighted_layout
+
+    args = _canonical_args(canon)
+    geo = (geometry or layout_geometry)(*args[:3], *args[4:7])
+    results, best = weighted_layout(geo, args[3], args[7])
+    placements = {_face_key(*o["face"], o["Hauteur"]): o["placements"] for o in geo["stack"]
+                  if o["Orientation"].endswith("(mixte)") and o["placements"] is not None}
+    faces = [[*_face_key(g["bl"], g["bw"], g["bh"]), g["pc"],
+              g["placements"] or placements.get(_face_key(g["bl"], g["bw"], g["bh"]))] for g in geo["mixed"]]
+    return {"results": results, "best": best, "faces": faces}
+
+
+def input_order(value, canon, L, W, H):
+    # Les 6 orientations (tableau de comparaison, orientation retenue, choix
+    # à total égal) suivent l'ordre de saisie, comme sans cache : la pesée
+    # est refaite sur la géométrie en cache (sans solveur de couche) quand
+    # cet ordre diffère de l'ordre trié
+    from .core import pallet_geometry
+    from .layers import assemble_geometry, layer_faces, weighted_layout
+
+    pal_L, pal_w, pal_H, pal_p_max, *_, box_poids = _canonical_args(canon)
+    box = (mm(L) / 10, mm(W) / 10, mm(H) / 10)
+    if tuple(mm(v) for v in (L, W, H)) == tuple(canon[4:7]):
+        return value["results"], value["best"]
+    faces = {tuple(f[:3]): f[3:] for f in value["faces"]}
+    mixed = []
+    for bl, bw, bh in layer_faces(*box):
+        pc, placements = faces[_face_key(bl, bw, bh)]
+        mixed.append({"bl": bl, "bw": bw, "bh": bh, "pc": pc, "nc_vol": int(pal_H / bh) if bh > 0 else 0,
+                      "placements": placements})
+    geo = assemble_geometry(pal_L, pal_w, pal_H, pallet_geometry(pal_L, pal_w, pal_H, *box), mixed)
+    return weighted_layout(geo, pal_p_max, box_poids)
+
+
+def canonical_container(cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load):
+    # Pas de tri ici : l'orientation de la palette (Longitudinale /
+    # Transversale) fait partie du résultat affiché.
+    return (mm(cont_L), mm(cont_W), mm(cont_H), mm(p_L), mm(p_W), mm(p_H),
+            grams(box_unit_weight), grams(pallet_support_weight), int(b_per_p), grams(max_load))
+
+
+def cached_container(cache, cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load,
+                     floor=None):
+    # floor : fonction (cont_L, cont_W, p_L, p_W) -> containers.floor_layout,
+    # même rôle que geometry pour cached_pallet
+    from .containers import floor_layout, professional_load_calc
+
+    canon = canonical_container(cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load)
+    args = [v / 10 for v in canon[:6]] + [canon[6] / 1000, canon[7] / 1000, canon[8], canon[9] / 1000]
+    return cache.get_or_compute(make_key("container", *canon),
+                                lambda: professional_load_calc(*args, floor=floor or floor_layout))
+
+
+if __name__ == "__main__":
+    # python -m pallet_opt.cache : compteurs pour dimensionner le cache
+    print(json.dumps(ResultCache().stats(), indent=2))
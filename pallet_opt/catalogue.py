@@ -0,0 +1,269 @@
+# ==========================================
+# MODE CATALOGUE (LECTURE ET CALCUL PAR BLOCS)
+# ==========================================
+# Un catalogue SKU (CSV ou Excel) est lu par blocs de chunk_size lignes,
+# chaque bloc est résolu puis écrit à la suite dans un fichier résultat sur
+# disque. Seul le bloc en cours est en mémoire.
+#
+# Les résultats sont ceux de la page palette (grille, couches mixtes,
+# empilement mixte, cf. cache.cached_pallet). La grille vectorisée
+# (batch.solve_best) sert de pré-filtre : une ligne dont la grille atteint
+# déjà le plafond de poids (ou ne place aucune box) a sa réponse ; les
+# autres passent par le calcul complet, une fois par entrée canonique.
+import csv
+import os
+import tempfile
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .batch import solve_best
+from .cache import canonical_pallet, input_order, make_key, pallet_value
+
+DEFAULT_CHUNK = 5000
+# Entrées canoniques gardées d'un bloc à l'autre (vidées au-delà)
+MAX_MEMO = 20000
+
+# En-têtes acceptés (normalisés : minuscules, sans accents ni espaces)
+COLUMN_ALIASES = {
+    "sku": ("sku", "ref", "reference", "code", "article", "id"),
+    "L": ("l", "longueur", "length", "long", "longueurcm"),
+    "W": ("w", "largeur", "width", "larg", "largeurcm"),
+    "H": ("h", "hauteur", "height", "haut", "hauteurcm"),
+    "box_poids": ("poids", "weight", "boxpoids", "kg", "poidskg", "masse"),
+}
+REQUIRED = ("L", "W", "H", "box_poids")
+
+RESULT_COLUMNS = ["sku", "Palette", "L", "W", "H", "box_poids", "Orientation", "Hauteur",
+                  "Par Couche", "Nb Couches", "Total", "Poids (kg)"]
+
+
+def _normalize(name):
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def map_columns(headers):
+    # Associe chaque colonne utile à son en-tête dans le fichier
+    mapping = {}
+    for header in headers:
+        key = _normalize(header)
+        for field, aliases in COLUMN_ALIASES.items():
+            if field not in mapping and key in aliases:
+                mapping[field] = header
+                break
+    missing = [f for f in REQUIRED if f not in mapping]
+    if missing:
+        raise ValueError(f"Colonnes introuvables : {', '.join(missing)} (en-têtes lus : {list(headers)})")
+    return mapping
+
+
+def _normalize_chunk(df, mapping, offset):
+    out = pd.DataFrame({f: pd.to_numeric(df[mapping[f]], errors="coerce") for f in REQUIRED})
+    if "sku" in mapping:
+        out.insert(0, "sku", df[mapping["sku"]].astype(str).values)
+    else:
+        out.insert(0, "sku", [str(offset + i + 1) for i in range(len(df))])
+    # Lignes incomplètes ignorées (dimensions manquantes ou non numériques)
+    return out.dropna(subset=list(REQUIRED))
+
+
+def _sniff_csv(head):
+    try:
+        dialect = csv.Sniffer().sniff(head, delimiters=",;\t|")
+        sep = dialect.delimiter
+    except csv.Error:
+        sep = ","
+    # Catalogues français : séparateur ";" et virgule décimale
+    return sep, ("," if sep == ";" else ".")
+
+
+def iter_csv(stream, chunk_size=DEFAULT_CHUNK):
+    head = stream.read(8192)
+    stream.seek(0)
+    if isinstance(head, bytes):
+        head = head.decode("utf-8-sig", errors="ignore")
+    sep, decimal = _sniff_csv(head)
+    reader = pd.read_csv(stream, sep=sep, decimal=decimal, chunksize=chunk_size,
+                         encoding="utf-8-sig", dtype=str)
+    mapping, offset = None, 0
+    for df in reader:
+        if mapping is None:
+            mapping = map_columns(df.columns)
+        if decimal == ",":
+            # Seules les colonnes numériques : sku et libellés restent intacts
+            numeric = [mapping[f] for f in REQUIRED]
+            df[numeric] = df[numeric].apply(lambda col: col.str.replace(",", ".", regex=False))
+        yield _normalize_chunk(df, mapping, offset)
+        offset += len(df)
+
+
+def iter_excel(stream, chunk_size=DEFAULT_CHUNK):
+    # openpyxl en mode read_only : les lignes sont lues à la demande
+    from openpyxl import load_workbook
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = [str(h) if h is not None else "" for h in next(rows, ())]
+        mapping = map_columns(headers)
+        buffer, offset = [], 0
+        for row in rows:
+            buffer.append(row[:len(headers)])
+            if len(buffer) >= chunk_size:
+                yield _normalize_chunk(pd.DataFrame(buffer, columns=headers), mapping, offset)
+                offset += len(buffer)
+                buffer = []
+        if buffer:
+            yield _normalize_chunk(pd.DataFrame(buffer, columns=headers), mapping, offset)
+    finally:
+        wb.close()
+
+
+def is_excel(filename):
+    return filename.lower().endswith((".xlsx", ".xlsm"))
+
+
+def excel_row_count(stream):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        return max((wb.active.max_row or 1) - 1, 0)
+    finally:
+        wb.close()
+        stream.seek(0)
+
+
+def iter_catalogue(stream, filename, chunk_size=DEFAULT_CHUNK):
+    if is_excel(filename):
+        return iter_excel(stream, chunk_size)
+    return iter_csv(stream, chunk_size)
+
+
+def _full_solve(pallet, box, memo, cache):
+    # Meilleur résultat de la page palette pour une ligne
+    canon = canonical_pallet(*pallet, *box)
+    value = memo.get(canon)
+    if value is None:
+        if cache is not None:
+            value = cache.get_or_compute(make_key("pallet", *canon), lambda: pallet_value(canon))
+        else:
+            value = pallet_value(canon)
+        if len(memo) >= MAX_MEMO:
+            memo.clear()
+        memo[canon] = value
+    return input_order(value, canon, *box[:3])[1]
+
+
+def solve_chunk(df, pallets, workers=1, memo=None, cache=None):
+    # pallets : {nom: (pal_L, pal_w, pal_H, pal_p_max)}
+    # Renvoie une ligne par (SKU, palette) avec la meilleure orientation
+    # (mêmes résultats que la page palette). memo : dict partagé entre les
+    # blocs ; cache : ResultCache partagé ou None.
+    memo = {} if memo is None else memo
+    names = list(pallets)
+    boxes = df[list(REQUIRED)].to_numpy(dtype=np.float64)
+    if workers > 1:
+        from .parallel import parallel_solve_best
+        best = parallel_solve_best(boxes, [pallets[n] for n in names], workers=workers)
+    else:
+        best = solve_best(boxes, [pallets[n] for n in names])
+    n_box, n_pal = best.shape
+    out = pd.DataFrame({
+        "sku": np.repeat(df["sku"].to_numpy(), n_pal),
+        "Palette": np.tile(np.array(names, dtype=object), n_box),
+        "L": np.repeat(boxes[:, 0], n_pal),
+        "W": np.repeat(boxes[:, 1], n_pal),
+        "H": np.repeat(boxes[:, 2], n_pal),
+        "box_poids": np.repeat(boxes[:, 3], n_pal),
+        "Orientation": [f"{bl}x{bw}" for bl, bw in zip(best["bl"].ravel(), best["bw"].ravel())],
+        "Hauteur": best["bh"].ravel(),
+        "Par Couche": best["per_layer"].ravel(),
+        "Nb Couches": best["layers"].ravel(),
+        "Total": best["total"].ravel(),
+        "Poids (kg)": best["weight"].ravel(),
+    }, columns=RESULT_COLUMNS)
+
+    # Pré-filtre : plafond de poids atteint ou aucune box, la grille est la
+    # réponse (à total égal la page garde la grille)
+    pal_p_max = np.array([pallets[n][3] for n in names], dtype=np.float64)[None, :]
+    w = boxes[:, 3][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cap = np.where(w > 0, np.trunc(pal_p_max / np.where(w > 0, w, 1)), np.inf)
+    total = best["total"]
+    pending = np.flatnonzero(((total > 0) & (total < cap)).ravel())
+    if len(pending):
+        rows = []
+        for k in pending.tolist():
+            i, j = divmod(k, n_pal)
+            res = _full_solve(pallets[names[j]], tuple(boxes[i]), memo, cache)
+            rows.append([res["Orientation"], res["Hauteur"], res["Par Couche"], res["Nb Couches"], res["Total"],
+                         res["Poids (kg)"]])
+        columns = ["Orientation", "Hauteur", "Par Couche", "Nb Couches", "Total", "Poids (kg)"]
+        out[columns] = out[columns].astype(object)
+        out.loc[pending, columns] = rows
+        out[columns[1:]] = out[columns[1:]].apply(pd.to_numeric)
+    return out
+
+
+class CatalogueRun:
+    # Exécution incrémentale : chaque appel à step() traite un bloc et
+    # l'ajoute au fichier CSV résultat. Seuls des agrégats restent en mémoire.
+    def __init__(self, stream, filename, pallets, chunk_size=DEFAULT_CHUNK, out_dir=None, workers=1, cache=None):
+        self.pallets = pallets
+        self.workers = workers
+        self.cache = cache
+        self._memo = {}
+        self.stream = stream
+        self.excel_rows = excel_row_count(stream) if is_excel(filename) else None
+        stream.seek(0, os.SEEK_END)
+        self.size = stream.tell()
+        stream.seek(0)
+        self.chunks = iter_catalogue(stream, filename, chunk_size)
+        fd, self.path = tempfile.mkstemp(prefix="pallet_batch_", suffix=".csv", dir=out_dir)
+        os.close(fd)
+        self.rows = 0
+        self.skus = 0
+        self.totals = {name: 0 for name in pallets}
+        self.zero = {name: 0 for name in pallets}
+        self.done = False
+
+    def step(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.done = True
+            return None
+        result = solve_chunk(chunk, self.pallets, self.workers, self._memo, self.cache)
+        result.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        self.rows += len(result)
+        self.skus += len(chunk)
+        for name, group in result.groupby("Palette", sort=False):
+            self.totals[name] += int(group["Total"].sum())
+            self.zero[name] += int((group["Total"] == 0).sum())
+        return result
+
+    def __iter__(self):
+        while True:
+            result = self.step()
+            if result is None:
+                return
+            yield result
+
+    def progress(self):
+        if self.done:
+            return 1.0
+        if self.excel_rows is not None:
+            return min(self.skus / self.excel_rows, 1.0) if self.excel_rows else 0.0
+        # CSV : position de lecture dans le fichier (approximation par octets)
+        return min(self.stream.tell() / self.size, 1.0) if self.size else 0.0
+
+    def summary(self):
+        return pd.DataFrame({
+            "Palette": list(self.pallets),
+            "SKU traités": self.skus,
+            "Box / palette (moyenne)": [self.totals[n] / self.skus if self.skus else 0 for n in self.pallets],
+            "SKU hors gabarit": [self.zero[n] for n in self.pallets],
+        })
+
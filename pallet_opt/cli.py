@@ -0,0 +1,369 @@
+# ==========================================
+# LIGNE DE COMMANDE ET API SANS STREAMLIT
+# ==========================================
+# Mêmes calculs que les pages palette et conteneur, sans Streamlit ni
+# pandas : seuls les modules de calcul (et SQLite pour le cache partagé)
+# sont importés, pour un démarrage de quelques dizaines de millisecondes.
+#
+#   python -m pallet_opt pallet --box 45x35x25 --weight 15 [--pallet EUR] [--height 200]
+#   python -m pallet_opt container --type 40HC --pallet 120x80x160 --boxes-per-pallet 40
+#   python -m pallet_opt pallet --input skus.csv --format csv      (une ligne par SKU)
+#   cat skus.jsonl | python -m pallet_opt pallet --input - --format json
+#   python -m pallet_opt pipeline --input commande.csv --format csv   (carton -> palette -> conteneurs)
+#
+# Mode lot : CSV avec en-têtes, ou JSON Lines, dont les colonnes portent le
+# nom des options ("box", "weight", "pallet", "max-weight"...). Chaque ligne
+# complète les options de la commande ; une ligne invalide est signalée sur
+# stderr sans interrompre le lot (code de sortie 1).
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+# Alias courts des conteneurs standards
+CONTAINER_ALIASES = {
+    "20": "1 EVP (20' Standard)", "20ST": "1 EVP (20' Standard)", "20DV": "1 EVP (20' Standard)",
+    "40": "2 EVP (40' Standard)", "40ST": "2 EVP (40' Standard)", "40DV": "2 EVP (40' Standard)",
+    "40HC": "2 EVP (40' High Cube)", "40HQ": "2 EVP (40' High Cube)",
+}
+
+PALLET_DEFAULTS = {"pallet": "120x80", "height": 200.0, "max_weight": 1000.0, "weight": 0.0}
+CONTAINER_DEFAULTS = {"container": "40", "pallet": "120x80x160", "boxes_per_pallet": 40, "box_weight": 12.5,
+                      "pallet_weight": 25.0}
+
+# Champs de professional_load_calc recopiés dans le résultat
+CONTAINER_RESULT_KEYS = ["palettes_sol", "niveaux", "total_palettes", "poids_total_brut",
+                         "poids_total_box", "poids_total_supports", "utilisation_vol", "orient"]
+
+
+def parse_dims(value, count):
+    # "45x35x25", "45*35*25", "45 35 25" ou séquence -> tuple de count flottants
+    if isinstance(value, str):
+        parts = value.lower().replace("*", "x").replace(",", ".").replace(" ", "x").split("x")
+        parts = [p for p in parts if p]
+    else:
+        parts = list(value)
+    if len(parts) != count:
+        raise ValueError(f"{count} dimensions attendues (ex. {'x'.join(['120', '80', '160'][:count])}) : {value!r}")
+    from .layers import MIN_DIM
+
+    dims = tuple(float(p) for p in parts)
+    if not all(d >= MIN_DIM for d in dims):
+        raise ValueError(f"dimensions d'au moins {MIN_DIM:g} cm attendues : {value!r}")
+    return dims
+
+
+def pallet_floor(value):
+    # "EUR", "ISO", "demi", "quart" (types standards) ou "LxW"
+    from .core import PALLET_TYPES
+
+    if isinstance(value, str) and not value[:1].isdigit():
+        key = value.strip().lower()
+        for name, spec in PALLET_TYPES.items():
+            if name.lower().startswith(key):
+                return spec["L"], spec["W"]
+        raise ValueError(f"type de palette inconnu : {value!r} ({', '.join(PALLET_TYPES)})")
+    return parse_dims(value, 2)
+
+
+def container_spec(value, dims=None, payload=None):
+    # (libellé, L, W, H, charge utile) : alias ("40HC"), nom complet, ou
+    # dimensions libres avec dims="LxWxH" et payload
+    from .containers import CONTAINER_TYPES
+
+    if dims:
+        L, W, H = parse_dims(dims, 3)
+        if payload is None:
+            raise ValueError("--payload est requis avec --dims")
+        return "Personnalisé", L, W, H, float(payload)
+    name = CONTAINER_ALIASES.get(str(value).strip().upper().replace("'", ""), value)
+    spec = CONTAINER_TYPES.get(name)
+    if spec is None or name == "Personnaliser...":
+        raise ValueError(f"conteneur inconnu : {value!r} ({', '.join(CONTAINER_ALIASES)})")
+    return name, spec["L"], spec["W"], spec["H"], float(payload) if payload is not None else spec["MaxPayload"]
+
+
+def _cache(cache):
+    # True : cache disque partagé avec les pages ; None / False : sans cache
+    if cache is True:
+        from .cache import ResultCache
+
+        return ResultCache()
+    return cache or None
+
+
+def pallet_record(box, weight=0.0, pallet="120x80", height=200.0, max_weight=1000.0, cache=None, placements=False):
+    # Meilleur chargement d'une palette (même calcul que app.py)
+    from .layers import check_box
+
+    L, W, H = parse_dims(box, 3)
+    pal_L, pal_w = pallet_floor(pallet)
+    check_box(pal_L, pal_w, L, W, H)
+    height, max_weight, weight = float(height), float(max_weight), float(weight)
+    cache = _cache(cache)
+    if cache is not None:
+        from .cache import cached_pallet
+
+        _, best = cached_pallet(cache, pal_L, pal_w, height, max_weight, L, W, H, weight)
+    else:
+        from .layers import layout_geometry, weighted_layout
+
+        _, best = weighted_layout(layout_geometry(pal_L, pal_w, height, L, W, H), max_weight, weight)
+    record = {"Palette": f"{pal_L:g}x{pal_w:g}", "Box": f"{L:g}x{W:g}x{H:g}", "Orientation": best["Orientation"],
+              "Hauteur": best["Hauteur"], "Hauteur Totale": best.get("Hauteur Totale", best["Hauteur"] * best["Nb Couches"]),
+              "Par Couche": best["Par Couche"], "Nb Couches": best["Nb Couches"], "Total": best["Total"],
+              "Poids (kg)": best["Poids (kg)"]}
+    if placements:
+        record["placements"] = best["placements"]
+    return record
+
+
+def container_record(container="40", pallet="120x80x160", boxes_per_pallet=40, box_weight=12.5, pallet_weight=25.0,
+                     dims=None, payload=None, cache=None, placements=False):
+    # Chargement d'un conteneur en palettes identiques (même calcul que pages/app3.py)
+    name, cont_L, cont_W, cont_H, max_load = container_spec(container, dims, payload)
+    p_L, p_W, p_H = parse_dims(pallet, 3)
+    args = (cont_L, cont_W, cont_H, p_L, p_W, p_H, float(box_weight), float(pallet_weight), int(float(boxes_per_pallet)), max_load)
+    cache = _cache(cache)
+    if cache is not None:
+        from .cache import cached_container
+
+        res = cached_container(cache, *args)
+    else:
+        from .containers import professional_load_calc
+
+        res = professional_load_calc(*args)
+    record = {"Conteneur": name, "Palette": f"{p_L:g}x{p_W:g}x{p_H:g}"}
+    record.update({key: res.get(key, 0) for key in CONTAINER_RESULT_KEYS})
+    if placements:
+        record["placements"] = res["placements"]
+    return record
+
+
+def pipeline_item(box, weight=0.0, pallet="120x80", height=200.0, max_weight=1000.0):
+    # Options de la commande pallet -> entrée de pipeline.run_pipeline
+    from .layers import check_box
+
+    L, W, H = parse_dims(box, 3)
+    pal_L, pal_w = pallet_floor(pallet)
+    check_box(pal_L, pal_w, L, W, H)
+    return {"L": L, "W": W, "H": H, "box_poids": float(weight), "pal_L": pal_L, "pal_w": pal_w,
+            "pal_H": float(height), "pal_p_max": float(max_weight)}
+
+
+def pipeline_records(items, extras, containers=None, cache=None, placements=False):
+    # Lot complet (résultats intermédiaires partagés) : une ligne par carton,
+    # deux colonnes (palettes, box) par conteneur
+    from .pipeline import run_pipeline
+
+    records = []
+    for extra, res in zip(extras, run_pipeline(items, containers, cache)):
+        unit, best = res["unit"], res["best"]
+        record = {**extra, "Palette": f"{unit['p_L']:g}x{unit['p_W']:g}", "Box": f"{res['L']:g}x{res['W']:g}x{res['H']:g}",
+                  "Orientation": best["Orientation"], "Total": best["Total"], "Hauteur palette": unit["p_H"],
+                  "Poids palette (kg)": best["Poids (kg)"] + unit["w_pal"]}
+        for name, row in res["containers"].items():
+            record[f"{name} palettes"] = row["total_palettes"]
+            record[f"{name} box"] = row["total_box"]
+        record["Meilleur conteneur"] = res["meilleur_conteneur"]
+        if placements:
+            record["placements"] = best["placements"]
+        records.append(record)
+    return records
+
+
+# ==========================================
+# ENTRÉES / SORTIES
+# ==========================================
+def read_rows(stream):
+    # CSV avec en-têtes ou JSON Lines (détecté sur la première ligne), lus
+    # au fil de l'eau : les résultats sortent pendant la lecture d'un tube.
+    # Une ligne JSON illisible est rendue comme une erreur (ValueError), que
+    # l'appelant signale sans interrompre le lot.
+    first = stream.readline()
+    lines = itertools.chain([first], stream)
+    if first.lstrip().startswith("{"):
+        for line in lines:
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield ValueError(f"JSON invalide ({exc})")
+                    continue
+                yield row if isinstance(row, dict) else ValueError("objet JSON attendu")
+    else:
+        yield from csv.DictReader(lines)
+
+
+# Colonnes d'entrée acceptées sous un autre nom que l'option
+_ALIASES = {"type": "container"}
+
+
+def _option_name(column):
+    name = str(column).strip().lower().replace("-", "_").replace(" ", "_")
+    return _ALIASES.get(name, name)
+
+
+class _Writer:
+    def __init__(self, fmt, out):
+        self.fmt, self.out = fmt, out
+        self._csv = None
+
+    def write(self, record):
+        if self.fmt == "json":
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif self.fmt == "csv":
+            if self._csv is None:
+                self._csv = csv.DictWriter(self.out, fieldnames=list(record), lineterminator="\n")
+                self._csv.writeheader()
+            self._csv.writerow(record)
+        else:
+            # Texte : champs "clé=valeur" séparés par des tabulations (cut -f)
+            self.out.write("\t".join(f"{k}={_fmt(v)}" for k, v in record.items() if k != "placements") + "\n")
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _add_common(p):
+    p.add_argument("--input", "-i", help="fichier CSV / JSON Lines d'entrées ('-' : entrée standard)")
+    p.add_argument("--format", "-f", choices=["text", "json", "csv"], default="text")
+    p.add_argument("--placements", action="store_true", help="ajoute les placements au sol (JSON)")
+    p.add_argument("--no-cache", action="store_true", help="n'utilise pas le cache disque partagé")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pallet-opt", description="Optimisation palette / conteneur sans interface.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pallet", help="meilleur chargement d'une palette")
+    p.add_argument("--box", "-b", help="dimensions de la box LxWxH (cm)")
+    p.add_argument("--weight", "-w", type=float, default=PALLET_DEFAULTS["weight"], help="poids d'une box (kg, 0 : ignoré)")
+    p.add_argument("--pallet", "-p", default=PALLET_DEFAULTS["pallet"], help="EUR, ISO, demi, quart ou LxW (cm)")
+    p.add_argument("--height", type=float, default=PALLET_DEFAULTS["height"], help="hauteur maximale chargée (cm)")
+    p.add_argument("--max-weight", type=float, default=PALLET_DEFAULTS["max_weight"], help="charge maximale (kg)")
+    _add_common(p)
+
+    c = sub.add_parser("container", help="palettes par conteneur")
+    c.add_argument("--type", "-t", dest="container", default=CONTAINER_DEFAULTS["container"], help="20, 40, 40HC ou nom complet")
+    c.add_argument("--dims", help="conteneur libre LxWxH (cm), avec --payload")
+    c.add_argument("--payload", type=float, help="charge utile (kg)")
+    c.add_argument("--pallet", "-p", default=CONTAINER_DEFAULTS["pallet"], help="palette chargée LxWxH (cm)")
+    c.add_argument("--boxes-per-pallet", "-n", type=int, default=CONTAINER_DEFAULTS["boxes_per_pallet"])
+    c.add_argument("--box-weight", type=float, default=CONTAINER_DEFAULTS["box_weight"], help="poids d'une box (kg)")
+    c.add_argument("--pallet-weight", type=float, default=CONTAINER_DEFAULTS["pallet_weight"], help="poids du support (kg)")
+    _add_common(c)
+
+    q = sub.add_parser("pipeline", help="carton -> meilleure palette -> chaque type de conteneur")
+    q.add_argument("--box", "-b", help="dimensions de la box LxWxH (cm)")
+    q.add_argument("--weight", "-w", type=float, default=PALLET_DEFAULTS["weight"], help="poids d'une box (kg, 0 : ignoré)")
+    q.add_argument("--pallet", "-p", default=PALLET_DEFAULTS["pallet"], help="EUR, ISO, demi, quart ou LxW (cm)")
+    q.add_argument("--height", type=float, default=PALLET_DEFAULTS["height"], help="hauteur maximale chargée (cm)")
+    q.add_argument("--max-weight", type=float, default=PALLET_DEFAULTS["max_weight"], help="charge maximale (kg)")
+    q.add_argument("--containers", "-t", nargs="+", help="20, 40, 40HC ou noms complets (défaut : tous)")
+    _add_common(q)
+    return parser
+
+
+def _options(args, names):
+    return {name: getattr(args, name) for name in names}
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    stdin, stdout, stderr = stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr
+    args = build_parser().parse_args(argv)
+    if args.command == "pipeline":
+        return _main_pipeline(args, stdin, stdout, stderr)
+    if args.command == "pallet":
+        func, names = pallet_record, ["box", "weight", "pallet", "height", "max_weight"]
+    else:
+        func, names = container_record, ["container", "dims", "payload", "pallet", "boxes_per_pallet", "box_weight", "pallet_weight"]
+    base = _options(args, names)
+    cache = None if args.no_cache else _cache(True)
+    writer = _Writer(args.format, stdout)
+
+    if args.input is None:
+        if args.command == "pallet" and not args.box:
+            stderr.write("pallet-opt: --box est requis (ou --input)\n")
+            return 2
+        errors = _run(func, base, [{}], writer, cache, args.placements, stderr)
+    elif args.input == "-":
+        errors = _run(func, base, read_rows(stdin), writer, cache, args.placements, stderr)
+    else:
+        with open(args.input, encoding="utf-8-sig", newline="") as fh:
+            errors = _run(func, base, read_rows(fh), writer, cache, args.placements, stderr)
+    stdout.flush()
+    return 1 if errors else 0
+
+
+def _main_pipeline(args, stdin, stdout, stderr):
+    # Toutes les lignes sont lues avant le calcul : le lot partage palettes,
+    # plans au sol et chargements conteneur
+    try:
+        containers = [container_spec(c)[0] for c in args.containers] if args.containers else None
+    except ValueError as exc:
+        stderr.write(f"pallet-opt: {exc}\n")
+        return 2
+    base = _options(args, ["box", "weight", "pallet", "height", "max_weight"])
+    if args.input is None:
+        if not args.box:
+            stderr.write("pallet-opt: --box est requis (ou --input)\n")
+            return 2
+        rows = [{}]
+    elif args.input == "-":
+        rows = list(read_rows(stdin))
+    else:
+        with open(args.input, encoding="utf-8-sig", newline="") as fh:
+            rows = list(read_rows(fh))
+    items, extras, errors = [], [], 0
+    for n, row in enumerate(rows, 1):
+        options, extra = dict(base), {}
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            for key, value in row.items():
+                name = _option_name(key)
+                if name not in options:
+                    extra[key] = value
+                elif value not in ("", None):
+                    options[name] = value
+            items.append(pipeline_item(**options))
+            extras.append(extra)
+        except (ValueError, TypeError, KeyError) as exc:
+            errors += 1
+            stderr.write(f"pallet-opt: ligne {n} : {exc}\n")
+    writer = _Writer(args.format, stdout)
+    for record in pipeline_records(items, extras, containers, None if args.no_cache else _cache(True), args.placements):
+        writer.write(record)
+    stdout.flush()
+    return 1 if errors else 0
+
+
+def _run(func, base, rows, writer, cache, placements, stderr):
+    errors = 0
+    for n, row in enumerate(rows, 1):
+        # Colonnes qui ne sont pas des options (sku, libellé...) : recopiées
+        # en tête du résultat
+        options, extra = dict(base), {}
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            for key, value in row.items():
+                name = _option_name(key)
+                if name not in options:
+                    extra[key] = value
+                elif value not in ("", None):
+                    options[name] = value
+            writer.write({**extra, **func(**options, cache=cache, placements=placements)})
+        except (ValueError, TypeError, KeyError) as exc:
+            errors += 1
+            stderr.write(f"pallet-opt: ligne {n} : {exc}\n")
+    return errors
+
+
+if __name__ == "__main__":
+    sys.exit(main())
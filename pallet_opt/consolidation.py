@@ -0,0 +1,208 @@
+# ==========================================
+# CHARGEMENT DE PALETTES HÉTÉROGÈNES (SKYLINE)
+# ==========================================
+# professional_load_calc suppose des palettes toutes identiques. Ici un même
+# conteneur reçoit des palettes d'empreintes et de hauteurs différentes
+# (EUR, ISO, demi-palettes...).
+#
+# 1. Gerbage : les palettes de même empreinte sont empilées en colonnes sous
+#    la hauteur utile (marge de 5 cm, comme le calcul historique). Les plus
+#    hautes sont placées d'abord et chaque palette va dans la colonne où il
+#    reste le moins de place suffisante (best fit décroissant). Les hauteurs
+#    restantes sont indexées dans une liste triée (bisect). Dans une
+#    colonne, les palettes les plus lourdes sont en bas. Une palette non
+#    gerbable occupe sa colonne seule.
+# 2. Sol : les colonnes sont posées par un algorithme skyline. Le front de
+#    chargement est une liste de segments le long de la largeur (abscisse
+#    déjà remplie). Chaque colonne, dans ses deux rotations, va à la
+#    position qui avance le moins le front, puis gaspille le moins de
+#    surface. Le nombre de segments est borné par la largeur du conteneur :
+#    le placement reste quasi linéaire en nombre de palettes.
+# 3. Poids : les palettes sont chargées colonne par colonne, de bas en haut,
+#    tant que la charge utile le permet. Le reste est "non chargé".
+# Toutes les dimensions sont traitées en mm entiers (layers.to_units).
+from bisect import bisect_left, insort
+
+from .layers import SCALE, to_units
+
+# Marge sous le toit du conteneur (cm), identique à professional_load_calc
+HEIGHT_MARGIN = 5.0
+
+
+def _build_columns(pallets, usable_h):
+    # pallets : [(index du type, a, b, h, poids, gerbable)] avec a >= b.
+    # Renvoie les colonnes [(a, b, [palettes de bas en haut])] et les
+    # palettes trop hautes pour le conteneur.
+    by_footprint = {}
+    too_high = []
+    for p in pallets:
+        if p[3] > usable_h:
+            too_high.append(p)
+        else:
+            by_footprint.setdefault((p[1], p[2]), []).append(p)
+    columns = []
+    for (a, b), group in by_footprint.items():
+        group.sort(key=lambda p: (-p[3], -p[4]))
+        stacks = []
+        free = []  # (hauteur restante, n° de colonne), trié
+        for p in group:
+            if not p[5]:
+                stacks.append([p])
+                continue
+            pos = bisect_left(free, (p[3], -1))
+            if pos < len(free):
+                left, idx = free.pop(pos)
+                stacks[idx].append(p)
+                left -= p[3]
+            else:
+                idx = len(stacks)
+                stacks.append([p])
+                left = usable_h - p[3]
+            # Colonne pleine : retirée de l'index
+            if left > 0:
+                insort(free, (left, idx))
+        for stack in stacks:
+            stack.sort(key=lambda p: -p[4])
+            columns.append((a, b, stack))
+    return columns, too_high
+
+
+class _Skyline:
+    def __init__(self, X, Y):
+        self.X, self.Y = X, Y
+        # Segments (y, largeur, x du front), triés par y et jointifs
+        self.segments = [(0, Y, 0)]
+
+    def _fit(self, i, l, w):
+        # Pose d'un rectangle l (le long du conteneur) x w (en largeur) à
+        # partir du segment i : renvoie (x, perte) ou None.
+        segs = self.segments
+        y = segs[i][0]
+        if y + w > self.Y:
+            return None
+        x, covered, j = 0, 0, i
+        while covered < w:
+            x = max(x, segs[j][2])
+            covered += segs[j][1]
+            j += 1
+        if x + l > self.X:
+            return None
+        waste, covered, j = 0, 0, i
+        while covered < w:
+            width = min(segs[j][1], w - covered)
+            waste += (x - segs[j][2]) * width
+            covered += width
+            j += 1
+        return x, waste
+
+    def find(self, a, b):
+        # Meilleure position pour une empreinte a x b (les deux rotations)
+        best = None
+        for l, w in ((a, b), (b, a)) if a != b else ((a, b),):
+            for i in range(len(self.segments)):
+                fit = self._fit(i, l, w)
+                if fit is None:
+                    continue
+                x, waste = fit
+                score = (x + l, waste, self.segments[i][0])
+                if best is None or score < best[0]:
+                    best = (score, x, self.segments[i][0], l, w)
+        return None if best is None else best[1:]
+
+    def place(self, x, y, l, w):
+        out = []
+        for sy, sw, sx in self.segments:
+            end = sy + sw
+            if end <= y or sy >= y + w:
+                out.append((sy, sw, sx))
+                continue
+            if sy < y:
+                out.append((sy, y - sy, sx))
+            if end > y + w:
+                out.append((y + w, end - y - w, sx))
+        out.append((y, w, x + l))
+        out.sort()
+        # Fusion des segments voisins de même front
+        merged = [out[0]]
+        for seg in out[1:]:
+            py, pw, px = merged[-1]
+            if seg[2] == px:
+                merged[-1] = (py, pw + seg[1], px)
+            else:
+                merged.append(seg)
+        self.segments = merged
+
+
+def load_mixed_container(cont_L, cont_W, cont_H, pallet_types, max_load):
+    # pallet_types : [{"name", "L", "W", "H", "qty", "box_weight" (poids des
+    # box d'une palette, kg), "support_weight" (palette vide, kg),
+    # "stackable" (optionnel, vrai par défaut)}]. Dimensions en cm.
+    # Renvoie les totaux au format de professional_load_calc, les
+    # emplacements au sol (x, y, l, w) et les palettes posées
+    # (x, y, z, l, w, h, type) en cm.
+    X, Y = to_units(cont_L), to_units(cont_W)
+    usable_h = to_units(cont_H - HEIGHT_MARGIN)
+    pallets = []
+    for idx, spec in enumerate(pallet_types):
+        a, b = to_units(spec["L"], up=True), to_units(spec["W"], up=True)
+        h = to_units(spec["H"], up=True)
+        if a <= 0 or b <= 0 or h <= 0:
+            continue
+        weight = float(spec.get("box_weight", 0.0)) + float(spec.get("support_weight", 0.0))
+        pallets += [(idx, max(a, b), min(a, b), h, weight, spec.get("stackable", True))] * int(spec.get("qty", 0))
+
+    loaded = [0] * len(pallet_types)
+    floor, placed = [], []
+    payload = vol = floor_area = 0.0
+    levels = 0
+    if X > 0 and Y > 0 and usable_h > 0:
+        columns, _ = _build_columns(pallets, usable_h)
+        # Plus grandes empreintes d'abord, colonnes de même empreinte groupées
+        columns.sort(key=lambda c: (-c[0], -c[1], -len(c[2])))
+        skyline = _Skyline(X, Y)
+        for a, b, stack in columns:
+            if payload + stack[0][4] > max_load:
+                continue
+            spot = skyline.find(a, b)
+            if spot is None:
+                continue
+            x, y, l, w = spot
+            skyline.place(x, y, l, w)
+            floor.append((x / SCALE, y / SCALE, l / SCALE, w / SCALE))
+            floor_area += l * w
+            z = n = 0
+            for idx, _, _, h, weight, _ in stack:
+                if payload + weight > max_load:
+                    break
+                n += 1
+                payload += weight
+                vol += l * w * h
+                loaded[idx] += 1
+                placed.append((x / SCALE, y / SCALE, z / SCALE, l / SCALE, w / SCALE, h / SCALE,
+                               pallet_types[idx]["name"]))
+                z += h
+            levels = max(levels, n)
+
+    total = sum(loaded)
+    box_weight = sum(n * float(spec.get("box_weight", 0.0)) for n, spec in zip(loaded, pallet_types))
+    vol_cont = X * Y * to_units(cont_H)
+    # Une zone par ligne de pallet_types (un même nom peut revenir sur
+    # plusieurs lignes) ; non_chargees est indexé par ligne
+    zones = [(spec["name"], f"{spec['L']:g}x{spec['W']:g}x{spec['H']:g}", n)
+             for spec, n in zip(pallet_types, loaded)]
+    return {
+        "palettes_sol": len(floor),
+        "niveaux": levels,
+        "total_palettes": total,
+        "poids_total_brut": payload,
+        "poids_total_box": box_weight,
+        "poids_total_supports": payload - box_weight,
+        "utilisation_vol": vol / vol_cont * 100 if vol_cont > 0 else 0,
+        "utilisation_sol": floor_area / (X * Y) * 100 if X > 0 and Y > 0 else 0,
+        "orient": "Mixte",
+        "placements": floor,
+        "palettes": placed,
+        "zones": zones,
+        "non_chargees": {idx: int(spec.get("qty", 0)) - n
+                         for idx, (spec, n) in enumerate(zip(pallet_types, loaded)) if int(spec.get("qty", 0)) > n},
+    }
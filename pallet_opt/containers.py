@@ -0,0 +1,88 @@
+# ==========================================
+# MOTEUR DE CALCUL CONTENEUR
+# ==========================================
+# Constantes et algorithme de la page conteneur (pages/app3.py), sans
+# dépendance à Streamlit.
+from .loading import solve_floor
+
+# Dimensions techniques réelles
+# "Cost" : coût indicatif par conteneur (EUR), modifiable dans les réglages
+CONTAINER_TYPES = {
+    "1 EVP (20' Standard)": {"L": 589.8, "W": 235.2, "H": 239.3, "MaxPayload": 28200, "Vol": 33.2, "Cost": 1500.0},
+    "2 EVP (40' Standard)": {"L": 1203.2, "W": 235.2, "H": 239.3, "MaxPayload": 26700, "Vol": 67.7, "Cost": 2500.0},
+    "2 EVP (40' High Cube)": {"L": 1203.2, "W": 235.2, "H": 269.8, "MaxPayload": 26500, "Vol": 76.4, "Cost": 2700.0},
+    "Personnaliser...": {"L": 0.0, "W": 0.0, "H": 0.0, "MaxPayload": 0.0, "Vol": 0.0, "Cost": 0.0}
+}
+
+
+def floor_layout(cont_L, cont_W, p_L, p_W):
+    # Partie géométrique de professional_load_calc : plan au sol, qui ne
+    # dépend que des longueurs / largeurs du conteneur et de la palette
+    # Calcul Orientation 1
+    nx1, ny1 = int(cont_L / p_L) if p_L > 0 else 0, int(cont_W / p_W) if p_W > 0 else 0
+    rem_L1 = cont_L - (nx1 * p_L)
+    extra_1 = int(cont_W / p_L) if rem_L1 >= p_W and p_L > 0 else 0
+    total_sol_1 = (nx1 * ny1) + extra_1
+
+    # Calcul Orientation 2
+    nx2, ny2 = int(cont_L / p_W) if p_W > 0 else 0, int(cont_W / p_L) if p_L > 0 else 0
+    rem_L2 = cont_L - (nx2 * p_W)
+    extra_2 = int(cont_W / p_W) if rem_L2 >= p_L and p_W > 0 else 0
+    total_sol_2 = (nx2 * ny2) + extra_2
+    
+    if total_sol_1 >= total_sol_2:
+        best_sol, f_nx, f_ny, f_extra, f_orient = total_sol_1, nx1, ny1, extra_1, "Longitudinale"
+        placements = [(i * p_L, j * p_W, p_L, p_W) for i in range(nx1) for j in range(ny1)]
+        placements += [(nx1 * p_L, k * p_L, p_W, p_L) for k in range(extra_1)]
+    else:
+        best_sol, f_nx, f_ny, f_extra, f_orient = total_sol_2, nx2, ny2, extra_2, "Transversale"
+        placements = [(i * p_W, j * p_L, p_W, p_L) for i in range(nx2) for j in range(ny2)]
+        placements += [(nx2 * p_W, k * p_W, p_L, p_W) for k in range(extra_2)]
+    zones = [("Zone Principale", f_orient, f_nx * f_ny), ("Zone Pinwheel", "Rotation 90°", f_extra)]
+
+    # Solveur exact (motifs cinq blocs) : retenu s'il place plus de palettes
+    # au sol que le motif pinwheel
+    if p_L > 0 and p_W > 0:
+        exact = solve_floor(cont_L, cont_W, p_L, p_W)
+        if exact["count"] > best_sol:
+            best_sol, f_orient, placements = exact["count"], "Mixte", exact["placements"]
+            n_long = sum(1 for _, _, l, w in placements if l >= w)
+            zones = [("Palettes longitudinales", "Longitudinale", n_long),
+                     ("Palettes transversales", "Transversale", best_sol - n_long)]
+    return {"palettes_sol": best_sol, "nx": f_nx, "ny": f_ny, "extra_p": f_extra, "orient": f_orient,
+            "placements": placements, "zones": zones}
+
+
+def apply_load(floor, cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load):
+    # Niveaux, plafond de charge et volume appliqués au plan floor_layout
+    if cont_L <= 0 or cont_W <= 0 or cont_H <= 0:
+        return {"palettes_sol": 0, "niveaux": 0, "total_palettes": 0, "poids_total_brut": 0, "utilisation_vol": 0, "nx": 1, "ny": 1, "extra_p": 0, "orient": "N/A", "placements": [], "zones": []}
+        
+    weight_of_all_boxes = b_per_p * box_unit_weight
+    p_total_gross_weight = weight_of_all_boxes + pallet_support_weight
+    stack_levels = max(1, int((cont_H - 5) / p_H))
+    best_sol = floor["palettes_sol"]
+    
+    theoretical_total = best_sol * stack_levels
+    final_palettes = min(theoretical_total, int(max_load / p_total_gross_weight)) if p_total_gross_weight > 0 else theoretical_total
+    
+    vol_pal = (p_L * p_W * p_H) * final_palettes
+    vol_cont = cont_L * cont_W * cont_H
+    utilization = (vol_pal / vol_cont) * 100 if vol_cont > 0 else 0
+    
+    return {
+        "palettes_sol": best_sol, "niveaux": stack_levels, "total_palettes": final_palettes,
+        "poids_total_brut": final_palettes * p_total_gross_weight,
+        "poids_total_box": final_palettes * weight_of_all_boxes,
+        "poids_total_supports": final_palettes * pallet_support_weight,
+        "utilisation_vol": utilization, "nx": floor["nx"], "ny": floor["ny"], "extra_p": floor["extra_p"],
+        "orient": floor["orient"], "placements": floor["placements"], "zones": floor["zones"]
+    }
+
+
+def professional_load_calc(cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load,
+                           floor=floor_layout):
+    # floor : fonction de plan au sol (floor_layout par défaut, ou une
+    # version mémoïsée par la page)
+    plan = floor(cont_L, cont_W, p_L, p_W) if cont_L > 0 and cont_W > 0 and cont_H > 0 else None
+    return apply_load(plan, cont_L, cont_W, cont_H, p_L, p_W, p_H, box_unit_weight, pallet_support_weight, b_per_p, max_load)
@@ -0,0 +1,65 @@
+# ==========================================
+# MOTEUR DE CALCUL PALETTE (SCALAIRE)
+# ==========================================
+# Version importable de l'algorithme de app.py : aucune dépendance à
+# Streamlit, pandas ou NumPy pour rester utilisable partout.
+
+# Les 6 orientations possibles d'une box, exprimées en indices de (L, W, H).
+# L'ordre est celui historiquement affiché dans le tableau de comparaison.
+ORIENTATIONS = [(0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)]
+
+# Supports standards (dimensions au sol en cm)
+PALLET_TYPES = {
+    "EUR (120x80)": {"L": 120.0, "W": 80.0},
+    "ISO (120x100)": {"L": 120.0, "W": 100.0},
+    "Demi-palette (80x60)": {"L": 80.0, "W": 60.0},
+    "Quart de palette (60x40)": {"L": 60.0, "W": 40.0},
+}
+
+
+def box_orientations(L, W, H):
+    dims = (L, W, H)
+    return [(dims[a], dims[b], dims[c]) for a, b, c in ORIENTATIONS]
+
+
+def pallet_geometry(pal_L, pal_w, pal_H, L, W, H):
+    # Partie géométrique de solve_pallet (indépendante des poids) : grille
+    # nx x ny et nombre de couches par orientation.
+    geometry = []
+    for bl, bw, bh in box_orientations(L, W, H):
+        nx, ny = (int(pal_L / bl) if bl > 0 else 0), (int(pal_w / bw) if bw > 0 else 0)
+        nc_vol = int(pal_H / bh) if bh > 0 else 0
+        geometry.append({"bl": bl, "bw": bw, "bh": bh, "nx": nx, "ny": ny, "pc": nx * ny, "nc_vol": nc_vol})
+    return geometry
+
+
+def apply_weight(geometry, pal_p_max, box_poids):
+    # Plafond de poids appliqué à la géométrie : résultat de solve_pallet
+    results = []
+    for g in geometry:
+        pc = g["pc"]
+        t_vol = pc * g["nc_vol"]
+        max_p = int(pal_p_max / box_poids) if box_poids > 0 else t_vol
+        total = min(t_vol, max_p)
+        nc_final = total // pc if pc > 0 else 0
+
+        results.append({
+            "Orientation": f"{g['bl']}x{g['bw']}",
+            "Hauteur": g["bh"],
+            "Total": total,
+            "Par Couche": pc,
+            "Nb Couches": nc_final,
+            "Poids (kg)": total * box_poids,
+            "nx": g["nx"],
+            "ny": g["ny"]
+        })
+    return results
+
+
+def solve_pallet(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids):
+    return apply_weight(pallet_geometry(pal_L, pal_w, pal_H, L, W, H), pal_p_max, box_poids)
+
+
+def best_result(results):
+    # max() garde la première orientation en cas d'égalité (comportement historique)
+    return max(results, key=lambda x: x['Total'])
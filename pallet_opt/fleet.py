@@ -0,0 +1,169 @@
+# ==========================================
+# MOTEUR DE CALCUL CONTENEUR (VECTORISÉ)
+# ==========================================
+# Évalue N conteneurs (types standards, camions personnalisés) x M
+# configurations de palette en une seule passe NumPy. Les règles sont
+# strictement celles de containers.professional_load_calc : plan au sol
+# pinwheel (deux orientations + bande tournée), solveur exact retenu s'il
+# place plus de palettes, niveaux de gerbage, plafond de charge utile,
+# volume utilisé. Mêmes opérations flottantes dans le même ordre : les
+# résultats sont identiques à la boucle scalaire.
+#
+# Le solveur exact (loading.solve_floor) n'est appelé qu'une fois par
+# empreinte distincte (conteneur, palette) en mm, et seulement si sa borne
+# supérieure dépasse le motif pinwheel ; le résultat est gardé pour les
+# appels suivants. Les hauteurs, poids et nombres de box ne coûtent plus
+# qu'une opération NumPy par case.
+import numpy as np
+
+from .batch import _as_matrix, _safe_trunc_div
+from .containers import CONTAINER_TYPES
+from .layers import to_units
+from .loading import solve_floor, upper_bound
+
+# Colonnes d'entrée attendues
+CONTAINER_COLUMNS = ("cont_L", "cont_W", "cont_H", "max_load")
+PALLET_COLUMNS = ("p_L", "p_W", "p_H", "box_unit_weight", "pallet_support_weight", "b_per_p")
+
+# Orientation du plan au sol (-1 : conteneur invalide, "N/A")
+ORIENTS = ("Longitudinale", "Transversale", "Mixte")
+
+LOAD_DTYPE = np.dtype([
+    ("orient", "i1"),
+    ("palettes_sol", "i8"), ("niveaux", "i8"), ("total_palettes", "i8"),
+    ("poids_total_brut", "f8"), ("poids_total_box", "f8"), ("poids_total_supports", "f8"),
+    ("utilisation_vol", "f8"),
+])
+
+# Jeu entre le haut de la pile de palettes et le plafond (cf. apply_load)
+CEILING_CLEARANCE = 5
+
+# Résultats de solve_floor par empreinte en mm, gardés entre deux appels
+# (vidés au-delà de MAX_SOLVED)
+MAX_SOLVED = 4096
+_solved = {}
+
+
+def container_specs(names=None, custom=()):
+    # Matrice (n, 4) des conteneurs : types standards choisis (tous par
+    # défaut) puis camions personnalisés (L, W, H, charge utile)
+    if names is None:
+        names = [n for n in CONTAINER_TYPES if n != "Personnaliser..."]
+    rows = [(CONTAINER_TYPES[n]["L"], CONTAINER_TYPES[n]["W"], CONTAINER_TYPES[n]["H"], CONTAINER_TYPES[n]["MaxPayload"])
+            for n in names]
+    rows += [tuple(c) for c in custom]
+    return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def _unique_pairs(pairs):
+    # Couples (L, W) distincts et index inverse ; un complexe par couple
+    # (valeurs exactes) se trie bien plus vite que np.unique(axis=0)
+    keys, inverse = np.unique(pairs[:, 0] + 1j * pairs[:, 1], return_inverse=True)
+    return np.column_stack([keys.real, keys.imag]), inverse.reshape(-1)
+
+
+def _exact_counts(cont_floor, pal_floor, pinwheel):
+    # Nombre de palettes du solveur exact par couple (conteneur, palette)
+    # distinct, 0 quand il ne peut pas battre le motif pinwheel
+    counts = np.zeros(pinwheel.shape, dtype=np.int64)
+    for i, (cont_L, cont_W) in enumerate(cont_floor.tolist()):
+        X, Y = to_units(cont_L), to_units(cont_W)
+        if cont_L <= 0 or cont_W <= 0:
+            continue
+        for j, (p_L, p_W) in enumerate(pal_floor.tolist()):
+            if p_L <= 0 or p_W <= 0:
+                continue
+            a, b = to_units(p_L, up=True), to_units(p_W, up=True)
+            a, b = max(a, b), min(a, b)
+            key = (X, Y, a, b)
+            if key not in _solved:
+                if X <= 0 or Y <= 0 or b <= 0 or upper_bound(X, Y, a, b) <= pinwheel[i, j]:
+                    continue
+                if len(_solved) >= MAX_SOLVED:
+                    _solved.clear()
+                _solved[key] = solve_floor(cont_L, cont_W, p_L, p_W)["count"]
+            counts[i, j] = _solved[key]
+    return counts
+
+
+def floor_batch(containers, pallets):
+    # containers (N, 2) : (cont_L, cont_W) ; pallets (M, 2) : (p_L, p_W).
+    # Renvoie (palettes au sol, orientation) de containers.floor_layout, (N, M).
+    # Le plan ne dépend que des empreintes : calculé sur les couples
+    # distincts, puis recopié dans chaque case.
+    cu, c_inv = _unique_pairs(_as_matrix(containers, 2, "containers"))
+    pu, p_inv = _unique_pairs(_as_matrix(pallets, 2, "pallets"))
+    cont_L, cont_W = cu[:, 0][:, None], cu[:, 1][:, None]
+    p_L, p_W = pu[:, 0][None, :], pu[:, 1][None, :]
+
+    # Orientation 1
+    nx1, ny1 = _safe_trunc_div(cont_L, p_L), _safe_trunc_div(cont_W, p_W)
+    rem_L1 = cont_L - nx1 * p_L
+    extra_1 = np.where((rem_L1 >= p_W) & (p_L > 0), _safe_trunc_div(cont_W, p_L), 0)
+    total_1 = nx1 * ny1 + extra_1
+    # Orientation 2
+    nx2, ny2 = _safe_trunc_div(cont_L, p_W), _safe_trunc_div(cont_W, p_L)
+    rem_L2 = cont_L - nx2 * p_W
+    extra_2 = np.where((rem_L2 >= p_L) & (p_W > 0), _safe_trunc_div(cont_W, p_W), 0)
+    total_2 = nx2 * ny2 + extra_2
+
+    first = total_1 >= total_2
+    best = np.where(first, total_1, total_2)
+    exact = _exact_counts(cu, pu, best)
+    better = exact > best
+    floor = np.where(better, exact, best)
+    orient = np.where(better, 2, np.where(first, 0, 1)).astype(np.int8)
+    rows, cols = c_inv[:, None], p_inv[None, :]
+    return floor[rows, cols], orient[rows, cols]
+
+
+def load_batch(containers, pallets):
+    # containers (N, 4) : CONTAINER_COLUMNS ; pallets (M, 6) : PALLET_COLUMNS.
+    # Renvoie un tableau structuré (N, M) de LOAD_DTYPE.
+    containers = _as_matrix(containers, 4, "containers")
+    pallets = _as_matrix(pallets, 6, "pallets")
+    cont_L, cont_W, cont_H, max_load = (containers[:, k][:, None] for k in range(4))
+    p_L, p_W, p_H, w_box, w_pal, b_per_p = (pallets[:, k][None, :] for k in range(6))
+
+    floor, orient = floor_batch(containers[:, :2], pallets[:, :2])
+
+    weight_of_all_boxes = b_per_p * w_box
+    gross = weight_of_all_boxes + w_pal
+    # Palette de hauteur nulle : un seul niveau (le calcul scalaire divise par zéro)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        levels = np.trunc((cont_H - CEILING_CLEARANCE) / np.where(p_H != 0, p_H, np.inf))
+    levels = np.maximum(1, levels).astype(np.int64)
+    theoretical = floor * levels
+    by_weight = _safe_trunc_div(max_load, gross)
+    final = np.where(gross > 0, np.minimum(theoretical, by_weight), theoretical)
+
+    vol_pal = (p_L * p_W * p_H) * final
+    vol_cont = cont_L * cont_W * cont_H
+
+    out = np.empty((containers.shape[0], pallets.shape[0]), dtype=LOAD_DTYPE)
+    out["orient"] = orient
+    out["palettes_sol"] = floor
+    out["niveaux"] = levels
+    out["total_palettes"] = final
+    out["poids_total_brut"] = final * gross
+    out["poids_total_box"] = final * weight_of_all_boxes
+    out["poids_total_supports"] = final * w_pal
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["utilisation_vol"] = (vol_pal / vol_cont) * 100
+    # Conteneur sans dimension : résultat vide, comme apply_load
+    invalid = (containers[:, :3] <= 0).any(axis=1)
+    out[invalid] = np.zeros(1, dtype=LOAD_DTYPE)
+    out["orient"][invalid] = -1
+    return out
+
+
+def load_record(row):
+    # Convertit une case du tableau au format dict de professional_load_calc
+    # (sans placements ni zones)
+    orient = int(row["orient"])
+    return {
+        "palettes_sol": int(row["palettes_sol"]), "niveaux": int(row["niveaux"]),
+        "total_palettes": int(row["total_palettes"]), "poids_total_brut": float(row["poids_total_brut"]),
+        "poids_total_box": float(row["poids_total_box"]), "poids_total_supports": float(row["poids_total_supports"]),
+        "utilisation_vol": float(row["utilisation_vol"]), "orient": ORIENTS[orient] if orient >= 0 else "N/A",
+    }
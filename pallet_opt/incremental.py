@@ -0,0 +1,59 @@
+# ==========================================
+# RECALCUL INCRÉMENTAL PAR ÉTAPES
+# ==========================================
+# Un rerun Streamlit relance tout le script alors qu'en général un seul
+# champ a changé. Chaque étape du calcul (géométrie, poids, visuel,
+# tableau...) est déclarée avec les entrées dont elle dépend et les étapes
+# en amont qu'elle consomme ; Incremental garde, par session, la dernière
+# valeur de chaque étape et ne la recalcule que si l'une de ses entrées a
+# changé ou si une étape en amont a été recalculée depuis.
+#
+#   inc.begin(prof)
+#   geo = inc.stage("geometrie", (pal_L, pal_w, pal_H, L, W, H), lambda: ...)
+#   res = inc.stage("poids", (pal_p_max, box_poids), lambda: ..., after=("geometrie",))
+#
+# Les entrées doivent être comparables par == (nombres, chaînes, tuples).
+# Les étapes sont évaluées à la demande : une étape court-circuitée (par
+# exemple parce que le cache disque a répondu) garde sa version précédente.
+
+
+class Incremental:
+    def __init__(self):
+        self._entries = {}   # étape -> (clé, valeur)
+        self._versions = {}  # étape -> nombre de recalculs
+        self.recomputed = []
+        self.reused = []
+        self._profiler = None
+
+    def begin(self, profiler=None):
+        # À appeler en début de rerun : remet à zéro le journal des étapes
+        # et chronomètre les recalculs avec le Profiler de la page
+        self.recomputed, self.reused = [], []
+        self._profiler = profiler
+
+    def stage(self, name, inputs, compute, after=()):
+        key = (tuple(inputs), tuple(self._versions.get(dep, 0) for dep in after))
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.reused.append(name)
+            return entry[1]
+        if self._profiler is not None:
+            with self._profiler.stage(name):
+                value = compute()
+        else:
+            value = compute()
+        self._entries[name] = (key, value)
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self.recomputed.append(name)
+        return value
+
+    def invalidate(self, *names):
+        # Sans argument : toutes les étapes
+        for name in names or list(self._entries):
+            self._entries.pop(name, None)
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def rows(self):
+        # Lignes du panneau de débogage, dans l'ordre d'évaluation
+        return ([{"Étape": name, "État": "recalculée"} for name in self.recomputed]
+                + [{"Étape": name, "État": "réutilisée"} for name in self.reused])
@@ -0,0 +1,409 @@
+# ==========================================
+# MOTEUR DE COUCHE MIXTE (GUILLOTINE)
+# ==========================================
+# Une couche n'est plus forcément une grille nx x ny dans une seule
+# orientation : on cherche le meilleur motif guillotine (blocs de box
+# tournées et non tournées, deux blocs, blocs imbriqués...) par
+# programmation dynamique mémoïsée sur la grille entière en millimètres.
+# Seuls les "points normaux" (combinaisons i*a + j*b) sont explorés, ce qui
+# garde le nombre de sous-rectangles très faible.
+from functools import lru_cache
+
+from .core import apply_weight, box_orientations, pallet_geometry
+
+# Résolution de travail : 1 unité = 1 mm
+SCALE = 10
+
+# Nombre maximal de sous-problèmes évalués par couche (temps interactif)
+MAX_WORK = 1000
+
+# Plus petite dimension acceptée (cm) et nombre maximal de box par couche :
+# au-delà, les placements d'une seule couche se comptent en millions
+MIN_DIM = 0.1
+MAX_PER_LAYER = 10000
+
+
+def to_units(value, up=False):
+    # Les box sont arrondies au mm supérieur et les palettes au mm inférieur :
+    # un motif trouvé en mm tient toujours dans les dimensions réelles.
+    v = value * SCALE
+    if up:
+        return int(-(-v // 1)) if v > 0 else 0
+    return int(v // 1) if v > 0 else 0
+
+
+def normal_points(length, a, b):
+    # Toutes les longueurs i*a + j*b <= length (points de coupe utiles)
+    reach = bytearray(length + 1)
+    reach[0] = 1
+    points = []
+    for v in range(length + 1):
+        if reach[v]:
+            points.append(v)
+            if v + a <= length:
+                reach[v + a] = 1
+            if v + b <= length:
+                reach[v + b] = 1
+    return points
+
+
+def _reduce(value, points):
+    # Plus grand point normal <= value
+    lo, hi = 0, len(points) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if points[mid] <= value:
+            lo = mid
+        else:
+            hi = mid - 1
+    return points[lo]
+
+
+@lru_cache(maxsize=256)
+def _layer_solver(X, Y, a, b, max_work):
+    # Construit (et mémoïse) le solveur d'un couple palette / empreinte.
+    # Chaque sous-rectangle (x, y) n'est résolu qu'une seule fois ; au-delà de
+    # max_work sous-problèmes évalués, les nouveaux restent homogènes pour
+    # borner le temps de calcul sur les très petites box.
+    px = normal_points(X, a, b)
+    py = normal_points(Y, a, b)
+    area = a * b
+    memo = {}
+
+    def homogeneous(x, y):
+        n1 = (x // a) * (y // b)
+        n2 = (x // b) * (y // a)
+        return (n1, ("H", 0)) if n1 >= n2 else (n2, ("H", 1))
+
+    cut_memo = {}
+    work = [0]
+
+    def cuts(length, points):
+        # Couples (coupe, reste) non dominés : pour un même reste réduit, seule
+        # la plus grande coupe est utile. Symétrie : coupe <= length / 2.
+        key = (length, points is px)
+        hit = cut_memo.get(key)
+        if hit is not None:
+            return hit
+        pairs = []
+        prev_rest = None
+        for cut in points:
+            if cut == 0:
+                continue
+            if cut * 2 > length:
+                break
+            rest = _reduce(length - cut, points)
+            if pairs and rest == prev_rest:
+                pairs[-1] = (cut, rest)
+            else:
+                pairs.append((cut, rest))
+            prev_rest = rest
+        cut_memo[key] = pairs
+        return pairs
+
+    def solve(x, y):
+        key = (x, y)
+        hit = memo.get(key)
+        if hit is not None:
+            return hit[0]
+        best, move = homogeneous(x, y)
+        bound = (x * y) // area
+        work[0] += 1
+        if work[0] >= max_work:
+            # Budget épuisé : le sous-rectangle reste en motif homogène
+            bound = best
+        if best < bound:
+            # Coupes verticales
+            for cut, rest in cuts(x, px):
+                if (cut * y) // area + (rest * y) // area <= best:
+                    continue
+                n = solve(cut, y) + solve(rest, y)
+                if n > best:
+                    best, move = n, ("V", cut, rest)
+                    if best >= bound:
+                        break
+        if best < bound:
+            # Coupes horizontales
+            for cut, rest in cuts(y, py):
+                if (x * cut) // area + (x * rest) // area <= best:
+                    continue
+                n = solve(x, cut) + solve(x, rest)
+                if n > best:
+                    best, move = n, ("Z", cut, rest)
+                    if best >= bound:
+                        break
+        memo[key] = (best, move)
+        return best
+
+    def build(x, y, ox, oy, out):
+        solve(x, y)
+        move = memo[(x, y)][1]
+        if move[0] == "H":
+            bl, bw = (a, b) if move[1] == 0 else (b, a)
+            for i in range(x // bl):
+                for j in range(y // bw):
+                    out.append((ox + i * bl, oy + j * bw, bl, bw))
+        elif move[0] == "V":
+            build(move[1], y, ox, oy, out)
+            build(move[2], y, ox + move[1], oy, out)
+        else:
+            build(x, move[1], ox, oy, out)
+            build(x, move[2], ox, oy + move[1], out)
+
+    X0, Y0 = _reduce(X, px), _reduce(Y, py)
+    count = solve(X0, Y0)
+    placements = []
+    build(X0, Y0, 0, 0, placements)
+    return count, tuple(placements)
+
+
+def best_layer(pal_L, pal_w, bl, bw, max_work=MAX_WORK):
+    # Meilleure couche pour une empreinte bl x bw (rotation à 90° autorisée).
+    # Renvoie le nombre de box et les placements (x, y, l, w) en cm.
+    X, Y = to_units(pal_L), to_units(pal_w)
+    a, b = to_units(bl, up=True), to_units(bw, up=True)
+    if X <= 0 or Y <= 0 or a <= 0 or b <= 0:
+        return 0, []
+    if a < b:
+        a, b = b, a
+    count, placements = _layer_solver(X, Y, a, b, max_work)
+    return count, [(x / SCALE, y / SCALE, l / SCALE, w / SCALE) for x, y, l, w in placements]
+
+
+def check_box(pal_L, pal_w, L, W, H):
+    # Refuse (ValueError) les box trop petites pour la palette : sous 1 mm,
+    # ou plus de MAX_PER_LAYER box sur la plus petite face
+    if min(L, W, H) < MIN_DIM:
+        raise ValueError(f"dimensions de box d'au moins {MIN_DIM * SCALE:g} mm attendues : {L:g}x{W:g}x{H:g}")
+    a, b = sorted((L, W, H))[:2]
+    if pal_L * pal_w / (a * b) > MAX_PER_LAYER:
+        raise ValueError(f"box {L:g}x{W:g}x{H:g} trop petite pour la palette {pal_L:g}x{pal_w:g} "
+                         f"(plus de {MAX_PER_LAYER} par couche)")
+
+
+def _table_count(pal_L, pal_w, bl, bw):
+    try:
+        from .tables import lookup
+    except ImportError:
+        return None
+    return lookup(pal_L, pal_w, bl, bw)
+
+
+def layer_faces(L, W, H):
+    # Une face par hauteur possible : la rotation dans le plan est gérée par
+    # le moteur de couche
+    faces, seen = [], set()
+    for bl, bw, bh in box_orientations(L, W, H):
+        key = (max(bl, bw), min(bl, bw), bh)
+        if key not in seen:
+            seen.add(key)
+            faces.append((bl, bw, bh))
+    return faces
+
+
+def mixed_geometry(pal_L, pal_w, pal_H, L, W, H):
+    # Partie géométrique de solve_layers (indépendante des poids) : une
+    # entrée par face posée au sol
+    geometry = []
+    for bl, bw, bh in layer_faces(L, W, H):
+        # Palettes standards : lecture dans la table précalculée, les
+        # placements ne sont calculés que si cette couche est retenue
+        pc, placements = _table_count(pal_L, pal_w, bl, bw), None
+        if pc is None:
+            pc, placements = best_layer(pal_L, pal_w, bl, bw)
+        nc_vol = int(pal_H / bh) if bh > 0 else 0
+        geometry.append({"bl": bl, "bw": bw, "bh": bh, "pc": pc, "nc_vol": nc_vol, "placements": placements})
+    return geometry
+
+
+def _weigh_layers(geometry, pal_p_max, box_poids):
+    results = []
+    for g in geometry:
+        pc = g["pc"]
+        t_vol = pc * g["nc_vol"]
+        max_p = int(pal_p_max / box_poids) if box_poids > 0 else t_vol
+        total = min(t_vol, max_p)
+        nc_final = total // pc if pc > 0 else 0
+        results.append({
+            "Orientation": f"{g['bl']}x{g['bw']} (mixte)",
+            "Hauteur": g["bh"],
+            "Total": total,
+            "Par Couche": pc,
+            "Nb Couches": nc_final,
+            "Poids (kg)": total * box_poids,
+            "placements": g["placements"]
+        })
+    return results
+
+
+def solve_layers(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids):
+    # Équivalent de core.solve_pallet avec des couches mixtes : une ligne par
+    # face posée au sol (3 hauteurs possibles), même format de dict que
+    # l'algorithme historique pour alimenter les KPI et le visuel.
+    return _weigh_layers(mixed_geometry(pal_L, pal_w, pal_H, L, W, H), pal_p_max, box_poids)
+
+
+# ==========================================
+# GÉOMÉTRIE / POIDS (RECALCUL INCRÉMENTAL)
+# ==========================================
+# Tout ce qui ne dépend que des dimensions (grille, couches mixtes,
+# programme dynamique de l'empilement) est regroupé dans layout_geometry ;
+# weighted_layout n'applique ensuite que le plafond de poids. Modifier le
+# poids d'une box ou la charge maximale ne relance donc aucun solveur.
+def layout_geometry(pal_L, pal_w, pal_H, L, W, H):
+    return assemble_geometry(pal_L, pal_w, pal_H, pallet_geometry(pal_L, pal_w, pal_H, L, W, H),
+                             mixed_geometry(pal_L, pal_w, pal_H, L, W, H))
+
+
+def assemble_geometry(pal_L, pal_w, pal_H, grid, mixed):
+    # grid / mixed : pallet_geometry / mixed_geometry (éventuellement
+    # reconstruites depuis le cache de résultats)
+    options = _stack_options(grid, mixed)
+    plan = _stack_plan(pal_H, [(o["Hauteur"], o["Par Couche"]) for o in options]) if len(options) >= 2 else None
+    return {"pal_L": pal_L, "pal_w": pal_w, "grid": grid, "mixed": mixed, "stack": options, "stack_plan": plan}
+
+
+def weighted_layout(geometry, pal_p_max, box_poids, results=None):
+    # (results, best) identiques à core.solve_pallet + best_layout
+    if results is None:
+        results = apply_weight(geometry["grid"], pal_p_max, box_poids)
+    idx = max(range(len(results)), key=lambda i: results[i]['Total'])
+    best = dict(results[idx])
+    best["placements"] = _grid_placements(geometry["grid"][idx])
+    for mixed, g in zip(_weigh_layers(geometry["mixed"], pal_p_max, box_poids), geometry["mixed"]):
+        if mixed["Total"] > best["Total"]:
+            best = mixed
+            if best["placements"] is None:
+                # Gardés dans la géométrie (réutilisés par le cache de résultats)
+                g["placements"] = best["placements"] = best_layer(geometry["pal_L"], geometry["pal_w"], g["bl"], g["bw"])[1]
+    stacked = _weigh_stack(geometry, pal_p_max, box_poids)
+    if stacked is not None and stacked["Total"] > best["Total"]:
+        best = stacked
+    return results, best
+
+
+def best_layout(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids, results):
+    # Meilleur résultat entre la grille historique (results, issu de
+    # core.solve_pallet), les couches mixtes et l'empilement de hauteurs
+    # mixtes. À total égal la grille est conservée. Le dict renvoyé porte
+    # toujours la clé "placements".
+    geometry = layout_geometry(pal_L, pal_w, pal_H, L, W, H)
+    return weighted_layout(geometry, pal_p_max, box_poids, results)[1]
+
+
+def _grid_placements(g):
+    return [(i * g["bl"], j * g["bw"], g["bl"], g["bw"]) for i in range(g["nx"]) for j in range(g["ny"])]
+
+
+# ==========================================
+# EMPILEMENT MIXTE (HAUTEURS DE COUCHES DIFFÉRENTES)
+# ==========================================
+# Empiler nc_vol couches identiques laisse souvent une hauteur perdue
+# (200 cm en couches de 45 cm : 20 cm). On combine ici des couches de
+# faces différentes (hauteur et nombre de box différents) par un sac à dos
+# non borné sur la hauteur, en millimètres. Le poids étant proportionnel au
+# nombre de box, le plafond pal_p_max borne simplement le total ; parmi
+# les empilements qui l'atteignent, le plus bas est retenu.
+def _stack_plan(pal_H, options):
+    # Sac à dos sur la hauteur, indépendant du poids : (dp, choice) ou None
+    cap = to_units(pal_H)
+    items = [(to_units(h, up=True), int(n)) for h, n in options]
+    items = [(i, h, n) for i, (h, n) in enumerate(items) if 0 < h <= cap and n > 0]
+    if cap <= 0 or not items:
+        return None
+    dp = [0] * (cap + 1)
+    choice = [None] * (cap + 1)
+    for h in range(1, cap + 1):
+        best, pick = dp[h - 1], None
+        for i, hi, n in items:
+            if hi <= h and dp[h - hi] + n > best:
+                best, pick = dp[h - hi] + n, (i, hi)
+        dp[h], choice[h] = best, pick
+    return dp, choice
+
+
+def _stack_pick(plan, max_boxes):
+    if plan is None:
+        return 0, []
+    dp, choice = plan
+    total = min(dp[-1], max_boxes)
+    h = next(h for h in range(len(dp)) if min(dp[h], max_boxes) >= total)
+    chosen = []
+    while h > 0:
+        if choice[h] is None:
+            h -= 1
+        else:
+            i, hi = choice[h]
+            chosen.append(i)
+            h -= hi
+    return total, chosen
+
+
+def stack_layers(pal_H, max_boxes, options):
+    # options : [(hauteur en cm, box par couche)]. Renvoie (total, indices
+    # des couches retenues) ; total est plafonné à max_boxes.
+    return _stack_pick(_stack_plan(pal_H, options), max_boxes)
+
+
+def _stack_options(grid, mixed):
+    # Couches candidates : grille historique (6 orientations) et couches
+    # mixtes (une par face). Pour chaque hauteur on garde la plus dense. Les
+    # placements ne sont construits que pour les couches empilées
+    # (_weigh_stack).
+    layers = {}
+    for g in grid:
+        if g["pc"] > layers.get(g["bh"], {"Par Couche": 0})["Par Couche"]:
+            layers[g["bh"]] = {"Orientation": f"{g['bl']}x{g['bw']}", "Hauteur": g["bh"], "Par Couche": g["pc"],
+                               "face": (g["bl"], g["bw"]), "placements": None, "grid": g}
+    for g in mixed:
+        if g["pc"] > layers.get(g["bh"], {"Par Couche": 0})["Par Couche"]:
+            layers[g["bh"]] = {"Orientation": f"{g['bl']}x{g['bw']} (mixte)", "Hauteur": g["bh"], "Par Couche": g["pc"],
+                               "face": (g["bl"], g["bw"]), "placements": g["placements"]}
+    return list(layers.values())
+
+
+def solve_stack(pal_L, pal_w, pal_H, pal_p_max, L, W, H, box_poids):
+    # Ligne au format de solve_pallet ("Hauteur" = hauteur moyenne, "Hauteur
+    # Totale" et "couches" de bas en haut avec leurs placements), ou None si
+    # l'empilement n'est pas mixte.
+    return _weigh_stack(layout_geometry(pal_L, pal_w, pal_H, L, W, H), pal_p_max, box_poids)
+
+
+def _weigh_stack(geometry, pal_p_max, box_poids):
+    options, plan = geometry["stack"], geometry["stack_plan"]
+    if len(options) < 2:
+        return None
+    max_p = int(pal_p_max / box_poids) if box_poids > 0 else float("inf")
+    total, chosen = _stack_pick(plan, max_p)
+    if len({options[i]["Hauteur"] for i in chosen}) < 2:
+        return None
+    # Couches les plus denses en bas ; celles au-delà du plafond de poids
+    # ne sont pas posées
+    chosen.sort(key=lambda i: (-options[i]["Par Couche"], -options[i]["Hauteur"]))
+    stack, placed = [], 0
+    for i in chosen:
+        if placed >= total:
+            break
+        placed += options[i]["Par Couche"]
+        stack.append(options[i])
+    for layer in stack:
+        # Placements calculés une seule fois, conservés dans la géométrie
+        if layer["placements"] is None:
+            if "grid" in layer:
+                layer["placements"] = _grid_placements(layer["grid"])
+            else:
+                layer["placements"] = best_layer(geometry["pal_L"], geometry["pal_w"], *layer["face"])[1]
+    bottom = stack[0]
+    height = sum(layer["Hauteur"] for layer in stack)
+    return {
+        "Orientation": " + ".join(dict.fromkeys(layer["Orientation"] for layer in stack)),
+        "Hauteur": height / len(stack),
+        "Hauteur Totale": height,
+        "Total": total,
+        "Par Couche": bottom["Par Couche"],
+        "Nb Couches": len(stack),
+        "Poids (kg)": total * box_poids,
+        "placements": bottom["placements"],
+        "couches": [{"Orientation": layer["Orientation"], "Hauteur": layer["Hauteur"],
+                     "Par Couche": layer["Par Couche"], "placements": layer["placements"]} for layer in stack],
+    }
@@ -0,0 +1,314 @@
+# ==========================================
+# SOLVEUR EXACT DE CHARGEMENT 2D (PALETTES AU SOL)
+# ==========================================
+# Nombre maximal de rectangles identiques a x b (rotation à 90° autorisée)
+# dans un rectangle X x Y : sol d'un conteneur rempli de palettes, ou couche
+# de box sur une palette.
+#
+# Algorithme récursif "cinq blocs" (motifs non guillotine du premier ordre) :
+# chaque sous-rectangle est découpé soit par une coupe guillotine, soit en
+# moulinet (4 blocs autour d'un bloc central), et chaque bloc est résolu
+# récursivement avec mémoïsation. Les points de coupe sont limités aux
+# points normaux. Deux bornes supérieures servent à élaguer :
+#   - la borne d'aire sur dimensions réduites,
+#   - la borne de Barnes (perte minimale d'un pavage par barres 1 x a et
+#     1 x b, dont tout pavage par box a x b est un cas particulier).
+# Un budget de temps arrête l'exploration : le meilleur motif trouvé est
+# alors renvoyé, sans garantie d'optimalité.
+#
+# Mode "au fil de l'eau" (anytime.py) : on_improve(count, placements) est
+# appelé à chaque amélioration du motif de la palette entière (premier
+# appel : motif homogène), et l'événement cancel interrompt la recherche
+# comme un dépassement du budget.
+import math
+import time
+
+from .layers import SCALE, to_units, normal_points, _reduce
+
+DEFAULT_TIME_BUDGET = 2.0
+
+
+def _bar_waste(x, y, k):
+    # Perte minimale (en aire) d'un pavage de x * y par barres 1 x k
+    r, s = x % k, y % k
+    return r * s if r + s <= k else (k - r) * (k - s)
+
+
+def upper_bound(x, y, a, b):
+    area = a * b
+    waste = max(_bar_waste(x, y, a), _bar_waste(x, y, b))
+    return min((x * y) // area, (x * y - waste) // area)
+
+
+class _Timeout(Exception):
+    pass
+
+
+class PalletLoadingSolver:
+    def __init__(self, X, Y, a, b, time_budget=DEFAULT_TIME_BUDGET, cancel=None, on_improve=None):
+        if a < b:
+            a, b = b, a
+        self.a, self.b = a, b
+        self.px = normal_points(X, a, b)
+        self.py = normal_points(Y, a, b)
+        self.X, self.Y = _reduce(X, self.px), _reduce(Y, self.py)
+        self.time_budget = math.inf if time_budget is None else time_budget
+        self.cancel = cancel
+        self.on_improve = on_improve
+        self.memo = {}
+        self.bounds = {}
+        self.timed_out = False
+        self.cancelled = False
+        self._deadline = None
+        self._ticks = 0
+
+    # --- bornes et motifs simples ---
+    def bound(self, x, y):
+        key = (x, y)
+        ub = self.bounds.get(key)
+        if ub is None:
+            ub = upper_bound(x, y, self.a, self.b)
+            self.bounds[key] = ub
+        return ub
+
+    def homogeneous(self, x, y):
+        a, b = self.a, self.b
+        n1 = (x // a) * (y // b)
+        n2 = (x // b) * (y // a)
+        return (n1, ("H", 0)) if n1 >= n2 else (n2, ("H", 1))
+
+    def _tick(self):
+        self._ticks += 1
+        if self._ticks & 1023 == 0:
+            if self.cancel is not None and self.cancel.is_set():
+                self.cancelled = True
+                raise _Timeout
+            if time.perf_counter() > self._deadline:
+                raise _Timeout
+
+    def r(self, v, points):
+        return _reduce(v, points) if v > 0 else 0
+
+    # --- récursion principale ---
+    def value(self, x, y):
+        if x < self.b or y < self.b:
+            return 0
+        hit = self.memo.get((x, y))
+        if hit is not None:
+            return hit[0]
+        return self._solve(x, y)
+
+    def _improved(self, x, y, best, move):
+        # Nouveau meilleur motif pour la palette entière : les sous-blocs
+        # qu'il utilise sont déjà résolus, on peut le reconstruire tout de suite
+        if self.on_improve is None or (x, y) != (self.X, self.Y):
+            return
+        previous = self.memo.get((x, y))
+        self.memo[(x, y)] = (best, move)
+        placements = []
+        self.build(x, y, 0, 0, placements)
+        if previous is None:
+            del self.memo[(x, y)]
+        else:
+            self.memo[(x, y)] = previous
+        self.on_improve(len(placements), placements)
+
+    def _solve(self, x, y):
+        best, move = self.homogeneous(x, y)
+        ub = self.bound(x, y)
+        px, py = self.px, self.py
+        self._improved(x, y, best, move)
+        try:
+            if best < ub:
+                # Coupes guillotine verticales puis horizontales
+                for cut in px:
+                    if cut == 0:
+                        continue
+                    if cut * 2 > x:
+                        break
+                    rest = self.r(x - cut, px)
+                    if self.bound(cut, y) + self.bound(rest, y) <= best:
+                        continue
+                    self._tick()
+                    n = self.value(cut, y) + self.value(rest, y)
+                    if n > best:
+                        best, move = n, ("V", cut, rest)
+                        self._improved(x, y, best, move)
+                        if best >= ub:
+                            break
+            if best < ub:
+                for cut in py:
+                    if cut == 0:
+                        continue
+                    if cut * 2 > y:
+                        break
+                    rest = self.r(y - cut, py)
+                    if self.bound(x, cut) + self.bound(x, rest) <= best:
+                        continue
+                    self._tick()
+                    n = self.value(x, cut) + self.value(x, rest)
+                    if n > best:
+                        best, move = n, ("Z", cut, rest)
+                        self._improved(x, y, best, move)
+                        if best >= ub:
+                            break
+            if best < ub:
+                best, move = self._five_block(x, y, best, move, ub)
+        except _Timeout:
+            # Résultat partiel : mémorisé pour ne pas repartir à zéro, mais
+            # le solveur est marqué comme non prouvé.
+            self.timed_out = True
+            self.memo[(x, y)] = (best, move)
+            raise
+        self.memo[(x, y)] = (best, move)
+        return best
+
+    def _five_block(self, x, y, best, move, ub):
+        # Moulinet : A (x1, y2) en bas à gauche, B (x - x1, y1) en bas à
+        # droite, C (x - x2, y - y1) en haut à droite, D (x2, y - y2) en haut
+        # à gauche, E (x2 - x1, y2 - y1) au centre. La rotation de 180° du
+        # motif permet d'imposer x1 + x2 <= x.
+        px, py = self.px, self.py
+        xs = [p for p in px if 0 < p < x]
+        ys = [p for p in py if 0 < p < y]
+        bound = self.bound
+        for i, x1 in enumerate(xs):
+            for x2 in xs[i + 1:]:
+                if x1 + x2 > x:
+                    break
+                rx1 = self.r(x - x1, px)
+                rx2 = self.r(x - x2, px)
+                rx21 = self.r(x2 - x1, px)
+                for j, y1 in enumerate(ys):
+                    ry1 = self.r(y - y1, py)
+                    for y2 in ys[j + 1:]:
+                        # Compté même si la borne élague : l'énumération
+                        # seule peut dépasser le budget de temps
+                        self._tick()
+                        ry2 = self.r(y - y2, py)
+                        ry21 = self.r(y2 - y1, py)
+                        if (bound(x1, y2) + bound(rx1, y1) + bound(rx2, ry1)
+                                + bound(x2, ry2) + bound(rx21, ry21)) <= best:
+                            continue
+                        n = (self.value(x1, y2) + self.value(rx1, y1) + self.value(rx2, ry1)
+                             + self.value(x2, ry2) + self.value(rx21, ry21))
+                        if n > best:
+                            best, move = n, ("P", x1, x2, y1, y2)
+                            self._improved(x, y, best, move)
+                            if best >= ub:
+                                return best, move
+        return best, move
+
+    # --- reconstruction ---
+    def build(self, x, y, ox, oy, out):
+        if x < self.b or y < self.b:
+            return
+        if (x, y) not in self.memo:
+            # Sous-bloc jamais exploré (budget épuisé) : motif homogène
+            self.memo[(x, y)] = self.homogeneous(x, y)
+        move = self.memo[(x, y)][1]
+        a, b = self.a, self.b
+        px, py = self.px, self.py
+        if move[0] == "H":
+            bl, bw = (a, b) if move[1] == 0 else (b, a)
+            for i in range(x // bl):
+                for j in range(y // bw):
+                    out.append((ox + i * bl, oy + j * bw, bl, bw))
+        elif move[0] == "V":
+            self.build(move[1], y, ox, oy, out)
+            self.build(move[2], y, ox + move[1], oy, out)
+        elif move[0] == "Z":
+            self.build(x, move[1], ox, oy, out)
+            self.build(x, move[2], ox, oy + move[1], out)
+        else:
+            _, x1, x2, y1, y2 = move
+            self.build(x1, y2, ox, oy, out)
+            self.build(self.r(x - x1, px), y1, ox + x1, oy, out)
+            self.build(self.r(x - x2, px), self.r(y - y1, py), ox + x2, oy + y1, out)
+            self.build(x2, self.r(y - y2, py), ox, oy + y2, out)
+            self.build(self.r(x2 - x1, px), self.r(y2 - y1, py), ox + x1, oy + y1, out)
+
+    def solve(self):
+        self._deadline = time.perf_counter() + self.time_budget
+        try:
+            self.value(self.X, self.Y)
+        except _Timeout:
+            pass
+        placements = []
+        self.build(self.X, self.Y, 0, 0, placements)
+        count = len(placements)
+        return {
+            "count": count,
+            "placements": placements,
+            "upper_bound": self.bound(self.X, self.Y),
+            "optimal": count >= self.bound(self.X, self.Y),
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+        }
+
+
+def solve_floor(cont_L, cont_W, p_L, p_W, time_budget=DEFAULT_TIME_BUDGET, use_table=True):
+    # Nombre maximal de palettes p_L x p_W au sol d'un conteneur cont_L x
+    # cont_W (cm). Les cas standards sont lus dans la table précalculée.
+    # Placements (x, y, l, w) renvoyés en cm.
+    X, Y = to_units(cont_L), to_units(cont_W)
+    a, b = to_units(p_L, up=True), to_units(p_W, up=True)
+    if X <= 0 or Y <= 0 or a <= 0 or b <= 0:
+        return {"count": 0, "placements": [], "upper_bound": 0, "optimal": True, "timed_out": False}
+    if a < b:
+        a, b = b, a
+    hit = None
+    if use_table:
+        from .loading_table import FLOOR_TABLE
+        hit = FLOOR_TABLE.get((X, Y, a, b))
+    if hit is not None:
+        count, placements, ub = hit
+        res = {"count": count, "placements": list(placements), "upper_bound": ub,
+               "optimal": count >= ub, "timed_out": False}
+    else:
+        res = PalletLoadingSolver(X, Y, a, b, time_budget).solve()
+    res["placements"] = [(x / SCALE, y / SCALE, l / SCALE, w / SCALE) for x, y, l, w in res["placements"]]
+    return res
+
+
+# ==========================================
+# TABLE PRÉCALCULÉE (CONTENEURS STANDARDS x PALETTES COURANTES)
+# ==========================================
+# Empreintes courantes (cm) : EUR, ISO, 120x120, Asie, 110x110, US 48"x40",
+# demi et quart de palette.
+COMMON_FOOTPRINTS = [(120.0, 80.0), (120.0, 100.0), (120.0, 120.0), (114.0, 114.0),
+                     (110.0, 110.0), (121.9, 101.6), (80.0, 60.0), (60.0, 40.0)]
+
+
+def build_table(time_budget=120.0):
+    from .containers import CONTAINER_TYPES
+
+    floors = sorted({(to_units(c["L"]), to_units(c["W"])) for c in CONTAINER_TYPES.values() if c["L"] > 0})
+    table = {}
+    for X, Y in floors:
+        for p_L, p_W in COMMON_FOOTPRINTS:
+            a, b = to_units(p_L, up=True), to_units(p_W, up=True)
+            a, b = max(a, b), min(a, b)
+            res = PalletLoadingSolver(X, Y, a, b, time_budget).solve()
+            table[(X, Y, a, b)] = (res["count"], tuple(res["placements"]), res["upper_bound"])
+    return table
+
+
+def write_table(path):
+    table = build_table()
+    lines = [
+        "# Fichier généré par : python -m pallet_opt.loading",
+        "# Clé : (X, Y, a, b) en mm (sol du conteneur, empreinte palette a >= b)",
+        "# Valeur : (nombre de palettes, placements (x, y, l, w) en mm, borne supérieure)",
+        "FLOOR_TABLE = {",
+    ]
+    for key in sorted(table):
+        lines.append(f"    {key!r}: {table[key]!r},")
+    lines.append("}")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    import os
+    write_table(os.path.join(os.path.dirname(os.path.abspath(__file__)), "loading_table.py"))
@@ -0,0 +1,21 @@
+# Fichier généré par : python -m pallet_opt.loading
+# Clé : (X, Y, a, b) en mm (sol du conteneur, empreinte palette a >= b)
+# Valeur : (nombre de palettes, placements (x, y, l, w) en mm, borne supérieure)
+FLOOR_TABLE = {
+    (5898, 2352, 600, 400): (53, ((0, 0, 400, 600), (400, 0, 600, 400), (600, 400, 400, 600), (0, 600, 600, 400), (0, 1000, 400, 600), (0, 1600, 400, 600), (400, 1000, 600, 400), (400, 1400, 600, 400), (400, 1800, 600, 400), (1000, 0, 600, 400), (1600, 0, 600, 400), (1000, 400, 400, 600), (1000, 1000, 400, 600), (1000, 1600, 400, 600), (1400, 400, 400, 600), (1400, 1000, 400, 600), (1400, 1600, 400, 600), (1800, 400, 400, 600), (1800, 1000, 400, 600), (1800, 1600, 400, 600), (2200, 0, 600, 400), (2800, 0, 600, 400), (2200, 400, 400, 600), (2200, 1000, 400, 600), (2200, 1600, 400, 600), (2600, 400, 400, 600), (2600, 1000, 400, 600), (2600, 1600, 400, 600), (3000, 400, 400, 600), (3000, 1000, 400, 600), (3000, 1600, 400, 600), (3400, 0, 600, 400), (4000, 0, 600, 400), (3400, 400, 400, 600), (3400, 1000, 400, 600), (3400, 1600, 400, 600), (3800, 400, 400, 600), (3800, 1000, 400, 600), (3800, 1600, 400, 600), (4200, 400, 400, 600), (4200, 1000, 400, 600), (4200, 1600, 400, 600), (4600, 0, 600, 400), (5200, 0, 600, 400), (4600, 400, 400, 600), (4600, 1000, 400, 600), (4600, 1600, 400, 600), (5000, 400, 400, 600), (5000, 1000, 400, 600), (5000, 1600, 400, 600), (5400, 400, 400, 600), (5400, 1000, 400, 600), (5400, 1600, 400, 600)), 53),
+    (5898, 2352, 800, 600): (26, ((0, 0, 600, 800), (600, 0, 600, 800), (0, 800, 600, 800), (600, 800, 800, 600), (800, 1400, 600, 800), (0, 1600, 800, 600), (1400, 0, 600, 800), (1400, 800, 600, 800), (2000, 0, 600, 800), (2600, 0, 800, 600), (2800, 600, 600, 800), (2000, 800, 800, 600), (2200, 1400, 600, 800), (2800, 1400, 600, 800), (1400, 1600, 800, 600), (3400, 0, 800, 600), (4200, 0, 800, 600), (5000, 0, 800, 600), (3400, 600, 600, 800), (3400, 1400, 600, 800), (4000, 600, 600, 800), (4000, 1400, 600, 800), (4600, 600, 600, 800), (4600, 1400, 600, 800), (5200, 600, 600, 800), (5200, 1400, 600, 800)), 26),
+    (5898, 2352, 1100, 1100): (10, ((0, 0, 1100, 1100), (0, 1100, 1100, 1100), (1100, 0, 1100, 1100), (1100, 1100, 1100, 1100), (2200, 0, 1100, 1100), (2200, 1100, 1100, 1100), (3300, 0, 1100, 1100), (3300, 1100, 1100, 1100), (4400, 0, 1100, 1100), (4400, 1100, 1100, 1100)), 10),
+    (5898, 2352, 1140, 1140): (10, ((0, 0, 1140, 1140), (0, 1140, 1140, 1140), (1140, 0, 1140, 1140), (1140, 1140, 1140, 1140), (2280, 0, 1140, 1140), (2280, 1140, 1140, 1140), (3420, 0, 1140, 1140), (3420, 1140, 1140, 1140), (4560, 0, 1140, 1140), (4560, 1140, 1140, 1140)), 10),
+    (5898, 2352, 1200, 800): (11, ((0, 0, 800, 1200), (800, 0, 1200, 800), (2000, 0, 1200, 800), (800, 800, 800, 1200), (1600, 800, 800, 1200), (2400, 800, 800, 1200), (3200, 0, 1200, 800), (4400, 0, 1200, 800), (3200, 800, 800, 1200), (4000, 800, 800, 1200), (4800, 800, 800, 1200)), 11),
+    (5898, 2352, 1200, 1000): (10, ((0, 0, 1200, 1000), (0, 1000, 1200, 1000), (1200, 0, 1200, 1000), (1200, 1000, 1200, 1000), (2400, 0, 1200, 1000), (2400, 1000, 1200, 1000), (3600, 0, 1000, 1200), (4600, 0, 1200, 1000), (4800, 1000, 1000, 1200), (3600, 1200, 1200, 1000)), 10),
+    (5898, 2352, 1200, 1200): (4, ((0, 0, 1200, 1200), (1200, 0, 1200, 1200), (2400, 0, 1200, 1200), (3600, 0, 1200, 1200)), 4),
+    (5898, 2352, 1219, 1016): (10, ((0, 0, 1219, 1016), (0, 1016, 1219, 1016), (1219, 0, 1219, 1016), (1219, 1016, 1219, 1016), (2438, 0, 1219, 1016), (2438, 1016, 1219, 1016), (3657, 0, 1016, 1219), (4673, 0, 1219, 1016), (4876, 1016, 1016, 1219), (3657, 1219, 1219, 1016)), 10),
+    (12032, 2352, 600, 400): (110, ((0, 0, 600, 400), (600, 0, 600, 400), (0, 400, 400, 600), (0, 1000, 400, 600), (0, 1600, 400, 600), (400, 400, 400, 600), (400, 1000, 400, 600), (400, 1600, 400, 600), (800, 400, 400, 600), (800, 1000, 400, 600), (800, 1600, 400, 600), (1200, 0, 600, 400), (1800, 0, 600, 400), (1200, 400, 400, 600), (1200, 1000, 400, 600), (1200, 1600, 400, 600), (1600, 400, 400, 600), (1600, 1000, 400, 600), (1600, 1600, 400, 600), (2000, 400, 400, 600), (2000, 1000, 400, 600), (2000, 1600, 400, 600), (2400, 0, 600, 400), (3000, 0, 600, 400), (2400, 400, 400, 600), (2400, 1000, 400, 600), (2400, 1600, 400, 600), (2800, 400, 400, 600), (2800, 1000, 400, 600), (2800, 1600, 400, 600), (3200, 400, 400, 600), (3200, 1000, 400, 600), (3200, 1600, 400, 600), (3600, 0, 600, 400), (4200, 0, 600, 400), (3600, 400, 400, 600), (3600, 1000, 400, 600), (3600, 1600, 400, 600), (4000, 400, 400, 600), (4000, 1000, 400, 600), (4000, 1600, 400, 600), (4400, 400, 400, 600), (4400, 1000, 400, 600), (4400, 1600, 400, 600), (4800, 0, 600, 400), (5400, 0, 600, 400), (4800, 400, 400, 600), (4800, 1000, 400, 600), (4800, 1600, 400, 600), (5200, 400, 400, 600), (5200, 1000, 400, 600), (5200, 1600, 400, 600), (5600, 400, 400, 600), (5600, 1000, 400, 600), (5600, 1600, 400, 600), (6000, 0, 600, 400), (6600, 0, 600, 400), (6000, 400, 400, 600), (6000, 1000, 400, 600), (6000, 1600, 400, 600), (6400, 400, 400, 600), (6400, 1000, 400, 600), (6400, 1600, 400, 600), (6800, 400, 400, 600), (6800, 1000, 400, 600), (6800, 1600, 400, 600), (7200, 0, 600, 400), (7800, 0, 600, 400), (7200, 400, 400, 600), (7200, 1000, 400, 600), (7200, 1600, 400, 600), (7600, 400, 400, 600), (7600, 1000, 400, 600), (7600, 1600, 400, 600), (8000, 400, 400, 600), (8000, 1000, 400, 600), (8000, 1600, 400, 600), (8400, 0, 600, 400), (9000, 0, 600, 400), (8400, 400, 400, 600), (8400, 1000, 400, 600), (8400, 1600, 400, 600), (8800, 400, 400, 600), (8800, 1000, 400, 600), (8800, 1600, 400, 600), (9200, 400, 400, 600), (9200, 1000, 400, 600), (9200, 1600, 400, 600), (9600, 0, 600, 400), (10200, 0, 600, 400), (9600, 400, 400, 600), (9600, 1000, 400, 600), (9600, 1600, 400, 600), (10000, 400, 400, 600), (10000, 1000, 400, 600), (10000, 1600, 400, 600), (10400, 400, 400, 600), (10400, 1000, 400, 600), (10400, 1600, 400, 600), (10800, 0, 600, 400), (11400, 0, 600, 400), (10800, 400, 400, 600), (10800, 1000, 400, 600), (10800, 1600, 400, 600), (11200, 400, 400, 600), (11200, 1000, 400, 600), (11200, 1600, 400, 600), (11600, 400, 400, 600), (11600, 1000, 400, 600), (11600, 1600, 400, 600)), 110),
+    (12032, 2352, 800, 600): (55, ((0, 0, 800, 600), (800, 0, 800, 600), (1600, 0, 800, 600), (0, 600, 600, 800), (0, 1400, 600, 800), (600, 600, 600, 800), (600, 1400, 600, 800), (1200, 600, 600, 800), (1200, 1400, 600, 800), (1800, 600, 600, 800), (1800, 1400, 600, 800), (2400, 0, 800, 600), (3200, 0, 800, 600), (4000, 0, 800, 600), (2400, 600, 600, 800), (2400, 1400, 600, 800), (3000, 600, 600, 800), (3000, 1400, 600, 800), (3600, 600, 600, 800), (3600, 1400, 600, 800), (4200, 600, 600, 800), (4200, 1400, 600, 800), (4800, 0, 800, 600), (5600, 0, 800, 600), (6400, 0, 800, 600), (4800, 600, 600, 800), (4800, 1400, 600, 800), (5400, 600, 600, 800), (5400, 1400, 600, 800), (6000, 600, 600, 800), (6000, 1400, 600, 800), (6600, 600, 600, 800), (6600, 1400, 600, 800), (7200, 0, 800, 600), (8000, 0, 800, 600), (8800, 0, 800, 600), (7200, 600, 600, 800), (7200, 1400, 600, 800), (7800, 600, 600, 800), (7800, 1400, 600, 800), (8400, 600, 600, 800), (8400, 1400, 600, 800), (9000, 600, 600, 800), (9000, 1400, 600, 800), (9600, 0, 800, 600), (10400, 0, 800, 600), (11200, 0, 800, 600), (9600, 600, 600, 800), (9600, 1400, 600, 800), (10200, 600, 600, 800), (10200, 1400, 600, 800), (10800, 600, 600, 800), (10800, 1400, 600, 800), (11400, 600, 600, 800), (11400, 1400, 600, 800)), 55),
+    (12032, 2352, 1100, 1100): (20, ((0, 0, 1100, 1100), (0, 1100, 1100, 1100), (1100, 0, 1100, 1100), (1100, 1100, 1100, 1100), (2200, 0, 1100, 1100), (2200, 1100, 1100, 1100), (3300, 0, 1100, 1100), (3300, 1100, 1100, 1100), (4400, 0, 1100, 1100), (4400, 1100, 1100, 1100), (5500, 0, 1100, 1100), (5500, 1100, 1100, 1100), (6600, 0, 1100, 1100), (6600, 1100, 1100, 1100), (7700, 0, 1100, 1100), (7700, 1100, 1100, 1100), (8800, 0, 1100, 1100), (8800, 1100, 1100, 1100), (9900, 0, 1100, 1100), (9900, 1100, 1100, 1100)), 20),
+    (12032, 2352, 1140, 1140): (20, ((0, 0, 1140, 1140), (0, 1140, 1140, 1140), (1140, 0, 1140, 1140), (1140, 1140, 1140, 1140), (2280, 0, 1140, 1140), (2280, 1140, 1140, 1140), (3420, 0, 1140, 1140), (3420, 1140, 1140, 1140), (4560, 0, 1140, 1140), (4560, 1140, 1140, 1140), (5700, 0, 1140, 1140), (5700, 1140, 1140, 1140), (6840, 0, 1140, 1140), (6840, 1140, 1140, 1140), (7980, 0, 1140, 1140), (7980, 1140, 1140, 1140), (9120, 0, 1140, 1140), (9120, 1140, 1140, 1140), (10260, 0, 1140, 1140), (10260, 1140, 1140, 1140)), 20),
+    (12032, 2352, 1200, 800): (25, ((0, 0, 1200, 800), (1200, 0, 1200, 800), (0, 800, 800, 1200), (800, 800, 800, 1200), (1600, 800, 800, 1200), (2400, 0, 1200, 800), (3600, 0, 1200, 800), (2400, 800, 800, 1200), (3200, 800, 800, 1200), (4000, 800, 800, 1200), (4800, 0, 1200, 800), (6000, 0, 1200, 800), (4800, 800, 800, 1200), (5600, 800, 800, 1200), (6400, 800, 800, 1200), (7200, 0, 1200, 800), (8400, 0, 1200, 800), (7200, 800, 800, 1200), (8000, 800, 800, 1200), (8800, 800, 800, 1200), (9600, 0, 1200, 800), (10800, 0, 1200, 800), (9600, 800, 800, 1200), (10400, 800, 800, 1200), (11200, 800, 800, 1200)), 25),
+    (12032, 2352, 1200, 1000): (22, ((0, 0, 1200, 1000), (1200, 0, 1200, 1000), (2400, 0, 1200, 1000), (3600, 0, 1200, 1000), (4800, 0, 1200, 1000), (0, 1000, 1000, 1200), (1000, 1000, 1000, 1200), (2000, 1000, 1000, 1200), (3000, 1000, 1000, 1200), (4000, 1000, 1000, 1200), (5000, 1000, 1000, 1200), (6000, 0, 1200, 1000), (7200, 0, 1200, 1000), (8400, 0, 1200, 1000), (9600, 0, 1200, 1000), (10800, 0, 1200, 1000), (6000, 1000, 1000, 1200), (7000, 1000, 1000, 1200), (8000, 1000, 1000, 1200), (9000, 1000, 1000, 1200), (10000, 1000, 1000, 1200), (11000, 1000, 1000, 1200)), 22),
+    (12032, 2352, 1200, 1200): (10, ((0, 0, 1200, 1200), (1200, 0, 1200, 1200), (2400, 0, 1200, 1200), (3600, 0, 1200, 1200), (4800, 0, 1200, 1200), (6000, 0, 1200, 1200), (7200, 0, 1200, 1200), (8400, 0, 1200, 1200), (9600, 0, 1200, 1200), (10800, 0, 1200, 1200)), 10),
+    (12032, 2352, 1219, 1016): (21, ((0, 0, 1219, 1016), (0, 1016, 1219, 1016), (1219, 0, 1219, 1016), (1219, 1016, 1219, 1016), (2438, 0, 1219, 1016), (2438, 1016, 1219, 1016), (3657, 0, 1016, 1219), (4673, 0, 1219, 1016), (4876, 1016, 1016, 1219), (3657, 1219, 1219, 1016), (5892, 0, 1219, 1016), (7111, 0, 1219, 1016), (8330, 0, 1219, 1016), (9549, 0, 1219, 1016), (10768, 0, 1219, 1016), (5892, 1016, 1016, 1219), (6908, 1016, 1016, 1219), (7924, 1016, 1016, 1219), (8940, 1016, 1016, 1219), (9956, 1016, 1016, 1219), (10972, 1016, 1016, 1219)), 21),
+}
@@ -0,0 +1,176 @@
+# ==========================================
+# TEST DE CHARGE DU SERVICE HTTP
+# ==========================================
+# Client asyncio (stdlib) : N connexions keep-alive envoient en boucle des
+# requêtes /pallet, /container ou /batch tirées dans un ensemble de
+# "distinct" entrées différentes (petit ensemble : surtout des hits du
+# cache ; grand ensemble : surtout des calculs). Affiche débit et
+# latences p50 / p95 / p99.
+#
+#   python -m pallet_opt.loadtest --serve --requests 2000 --concurrency 32
+#   python -m pallet_opt.loadtest --url http://127.0.0.1:8600 --batch 100 --kind mixed
+#
+# --serve lance python -m pallet_opt.server sur un port libre avec un cache
+# temporaire, le temps de la mesure.
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+
+def make_items(kind, distinct, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for i in range(distinct):
+        k = kind if kind != "mixed" else ("pallet" if i % 4 else "container")
+        if k == "pallet":
+            box = "x".join(str(rng.randint(10, 80)) for _ in range(3))
+            items.append({"kind": "pallet", "box": box, "weight": round(rng.uniform(0.5, 30), 1),
+                          "pallet": rng.choice(["EUR", "ISO"]), "height": rng.choice([150, 180, 200])})
+        else:
+            items.append({"kind": "container", "type": rng.choice(["20", "40", "40HC"]),
+                          "pallet": f"{rng.choice([120, 100, 80])}x{rng.choice([80, 100, 60])}x{rng.randint(90, 220)}",
+                          "boxes_per_pallet": rng.randint(10, 80), "box_weight": round(rng.uniform(1, 30), 1)})
+    return items
+
+
+async def _request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(url, jobs, latencies, errors):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        while jobs:
+            path, payload = jobs.pop()
+            start = time.perf_counter()
+            try:
+                status = await _request(reader, writer, parts.hostname, path, payload)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                errors.append("connexion")
+                writer.close()
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url, requests=1000, concurrency=16, batch=0, kind="pallet", distinct=200, seed=0):
+    items = make_items(kind, distinct, seed)
+    rng = random.Random(seed + 1)
+    jobs = []
+    for _ in range(requests):
+        if batch:
+            jobs.append(("/batch", {"items": [rng.choice(items) for _ in range(batch)]}))
+        else:
+            item = dict(rng.choice(items))
+            jobs.append((f"/{item.pop('kind')}", item))
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(url, jobs, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {"requests": requests, "items": requests * (batch or 1), "concurrency": concurrency, "errors": len(errors),
+            "seconds": elapsed, "req_per_s": requests / elapsed, "items_per_s": requests * (batch or 1) / elapsed,
+            "p50_ms": quantiles[49] * 1e3, "p95_ms": quantiles[94] * 1e3, "p99_ms": quantiles[98] * 1e3,
+            "max_ms": max(latencies, default=0) * 1e3}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers=None, cache_path=None):
+    # Serveur dans un sous-processus ; rend (processus, url) une fois /health prêt
+    port = _free_port()
+    cmd = [sys.executable, "-m", "pallet_opt.server", "--port", str(port)]
+    if workers:
+        cmd += ["--workers", str(workers)]
+    if cache_path is not None:
+        cmd += ["--cache", cache_path]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(cmd, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+                if sock.recv(64).startswith(b"HTTP/1.1 200"):
+                    return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("le serveur n'a pas démarré")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pallet_opt.loadtest")
+    parser.add_argument("--url", default="http://127.0.0.1:8600")
+    parser.add_argument("--serve", action="store_true", help="lance un serveur local le temps du test")
+    parser.add_argument("--workers", type=int, default=None, help="workers du serveur lancé par --serve")
+    parser.add_argument("--requests", "-n", type=int, default=1000)
+    parser.add_argument("--concurrency", "-c", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=0, help="éléments par requête /batch (0 : requêtes unitaires)")
+    parser.add_argument("--kind", choices=["pallet", "container", "mixed"], default="pallet")
+    parser.add_argument("--distinct", type=int, default=200, help="entrées différentes (taux de hits du cache)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    proc, tmp = None, None
+    url = args.url
+    if args.serve:
+        tmp = tempfile.TemporaryDirectory()
+        proc, url = start_server(args.workers, os.path.join(tmp.name, "cache.sqlite"))
+    try:
+        report = asyncio.run(run(url, args.requests, args.concurrency, args.batch, args.kind, args.distinct, args.seed))
+    finally:
+        if proc is not None:
+            # SIGINT : le serveur arrête proprement son pool de workers
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            tmp.cleanup()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['requests']} requêtes ({report['items']} éléments), {report['concurrency']} connexions : "
+              f"{report['req_per_s']:.0f} req/s, {report['items_per_s']:.0f} éléments/s, {report['errors']} erreurs")
+        print(f"latence p50 {report['p50_ms']:.1f} ms  p95 {report['p95_ms']:.1f} ms  "
+              f"p99 {report['p99_ms']:.1f} ms  max {report['max_ms']:.1f} ms")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
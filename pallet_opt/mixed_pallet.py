@@ -0,0 +1,260 @@
+# ==========================================
+# PALETTE MULTI-RÉFÉRENCES (POINTS EXTRÊMES 3D)
+# ==========================================
+# Les commandes préparées mélangent 10 à 200 cartons différents sur une
+# même palette. Heuristique des points extrêmes (Crainic, Perboli, Tadei),
+# pilotée par les points :
+#
+# 1. Ordre de préférence des références : tranche de poids décroissante
+#    (lourds en bas), puis surface au sol et hauteur décroissantes.
+# 2. Pose : le point extrême le plus bas (z, x, y croissants) reçoit la
+#    première référence qui y tient, dans l'un de ses deux sens (le haut du
+#    carton reste en haut) : sans chevauchement, sous la hauteur maximale,
+#    avec au moins min_support de sa base portée, uniquement par des
+#    cartons d'une tranche de poids au moins égale, et sans dépasser
+#    pal_p_max. Un point où rien ne tient est abandonné.
+# 3. Nouveaux points : les coins du carton posé, tels quels et projetés
+#    vers le bas et vers le fond jusqu'au premier obstacle.
+#
+# Index spatial : grille régulière sur le plateau ; chaque case liste les
+# cartons qui la recouvrent et les points extrêmes qu'elle contient. Les
+# tests de chevauchement, d'appui, l'espace libre depuis un point et les
+# projections ne lisent que les cases concernées, et les points recouverts
+# par un carton sont retirés à la pose. L'espace libre mesuré depuis le
+# point écarte les références trop grandes sans autre test.
+# Toutes les dimensions sont traitées en mm entiers (layers.to_units).
+import csv
+import io
+from bisect import insort
+
+from .layers import SCALE, to_units
+
+# Part minimale de la base d'un carton qui doit reposer sur un appui
+MIN_SUPPORT = 0.75
+# Tranche de poids (kg) pour l'ordre lourds en bas
+WEIGHT_BAND = 5.0
+# Côté des cases de l'index spatial (mm)
+CELL = 100
+
+
+class _Grid:
+    def __init__(self, X, Y, cell=CELL):
+        self.cell = cell
+        self.nx, self.ny = max(1, -(-X // cell)), max(1, -(-Y // cell))
+        self.boxes = [[] for _ in range(self.nx * self.ny)]
+        self.points = [set() for _ in range(self.nx * self.ny)]
+
+    def cells(self, x0, y0, x1, y1):
+        # Cases recouvertes par le rectangle [x0, x1) x [y0, y1)
+        c = self.cell
+        i0, i1 = x0 // c, min(self.nx - 1, (x1 - 1) // c)
+        j0, j1 = y0 // c, min(self.ny - 1, (y1 - 1) // c)
+        return [j * self.nx + i for j in range(j0, j1 + 1) for i in range(i0, i1 + 1)]
+
+    def cell_of(self, x, y):
+        return min(self.ny - 1, y // self.cell) * self.nx + min(self.nx - 1, x // self.cell)
+
+
+class _Packer:
+    def __init__(self, X, Y, Z, min_support):
+        self.X, self.Y, self.Z = X, Y, Z
+        self.min_support = min_support
+        self.grid = _Grid(X, Y)
+        self.placed = []  # (x0, y0, z0, x1, y1, z1)
+        self.bands = []  # tranche de poids de chaque carton posé
+        self.points = [(0, 0, 0)]  # triés par (z, x, y)
+        self.grid.points[0].add((0, 0, 0))
+        self._stamp = []
+        self._tick = 0
+
+    # --- requêtes sur l'index ---
+    def _near(self, x0, y0, x1, y1):
+        # Cartons dont l'empreinte touche les cases du rectangle (sans doublon)
+        self._tick += 1
+        tick, stamp, out = self._tick, self._stamp, []
+        for cell in self.grid.cells(x0, y0, x1, y1):
+            for k in self.grid.boxes[cell]:
+                if stamp[k] != tick:
+                    stamp[k] = tick
+                    out.append(k)
+        return out
+
+    def fits(self, x, y, z, l, w, h, band):
+        # Dans la palette, sans chevauchement, base portée à min_support au
+        # moins, et uniquement par des cartons d'une tranche de poids
+        # supérieure ou égale (pas de lourd sur un léger)
+        if x + l > self.X or y + w > self.Y or z + h > self.Z:
+            return False
+        x1, y1, z1 = x + l, y + w, z + h
+        support = 0
+        for k in self._near(x, y, x1, y1):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if bx0 >= x1 or bx1 <= x or by0 >= y1 or by1 <= y:
+                continue
+            if bz0 < z1 and bz1 > z:
+                return False
+            if bz1 == z:
+                if self.bands[k] < band:
+                    return False
+                support += (min(bx1, x1) - max(bx0, x)) * (min(by1, y1) - max(by0, y))
+        return z == 0 or support >= self.min_support * l * w
+
+    def free_extent(self, x, y, z):
+        # Espace libre depuis le point le long de x, y et z (demi-droites)
+        ex, ey, ez = self.X - x, self.Y - y, self.Z - z
+        for k in self._near(x, y, self.X, y + 1):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if by0 <= y < by1 and bz0 <= z < bz1 and bx0 >= x:
+                ex = min(ex, bx0 - x)
+        for k in self._near(x, y, x + 1, self.Y):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if bx0 <= x < bx1 and bz0 <= z < bz1 and by0 >= y:
+                ey = min(ey, by0 - y)
+        for k in self._near(x, y, x + 1, y + 1):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if bx0 <= x < bx1 and by0 <= y < by1 and bz0 >= z:
+                ez = min(ez, bz0 - z)
+        return ex, ey, ez
+
+    def _project_down(self, x, y, z):
+        top = 0
+        for k in self._near(x, y, x + 1, y + 1):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if bx0 <= x < bx1 and by0 <= y < by1 and bz1 <= z:
+                top = max(top, bz1)
+        return top
+
+    def _project_back_y(self, x, y, z):
+        end = 0
+        for k in self._near(x, 0, x + 1, max(1, y)):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if bx0 <= x < bx1 and bz0 <= z < bz1 and by1 <= y:
+                end = max(end, by1)
+        return end
+
+    def _project_back_x(self, x, y, z):
+        end = 0
+        for k in self._near(0, y, max(1, x), y + 1):
+            bx0, by0, bz0, bx1, by1, bz1 = self.placed[k]
+            if by0 <= y < by1 and bz0 <= z < bz1 and bx1 <= x:
+                end = max(end, bx1)
+        return end
+
+    # --- points extrêmes ---
+    def _add_point(self, p):
+        x, y, z = p
+        if x >= self.X or y >= self.Y or z >= self.Z:
+            return
+        cell = self.grid.cell_of(x, y)
+        if p in self.grid.points[cell]:
+            return
+        self.grid.points[cell].add(p)
+        insort(self.points, (z, x, y))
+
+    def drop_point(self, z, x, y):
+        self.grid.points[self.grid.cell_of(x, y)].discard((x, y, z))
+        self.points.remove((z, x, y))
+
+    def place(self, x, y, z, l, w, h, band):
+        x1, y1, z1 = x + l, y + w, z + h
+        k = len(self.placed)
+        self.placed.append((x, y, z, x1, y1, z1))
+        self.bands.append(band)
+        self._stamp.append(0)
+        for cell in self.grid.cells(x, y, x1, y1):
+            self.grid.boxes[cell].append(k)
+            # Points désormais à l'intérieur du carton
+            for p in [p for p in self.grid.points[cell] if x <= p[0] < x1 and y <= p[1] < y1 and z <= p[2] < z1]:
+                self.drop_point(p[2], p[0], p[1])
+        # Coins du carton, et leurs projections vers le bas / vers le fond
+        self._add_point((x1, y, z))
+        self._add_point((x, y1, z))
+        self._add_point((x, y, z1))
+        self._add_point((x1, y, self._project_down(x1, y, z)))
+        self._add_point((x1, self._project_back_y(x1, y, z), z))
+        self._add_point((x, y1, self._project_down(x, y1, z)))
+        self._add_point((self._project_back_x(x, y1, z), y1, z))
+        self._add_point((self._project_back_x(x, y, z1), y, z1))
+        self._add_point((x, self._project_back_y(x, y, z1), z1))
+
+
+def _types(cartons):
+    # cartons : [{"sku", "L", "W", "H", "weight", "qty"}] (cm, kg) -> une
+    # entrée par référence : [tranche, l, w, h, poids, n° de référence,
+    # quantité restante], dans l'ordre de préférence : lourds d'abord, puis
+    # grandes bases et cartons hauts
+    types = []
+    for idx, c in enumerate(cartons):
+        l, w, h = to_units(c["L"], up=True), to_units(c["W"], up=True), to_units(c["H"], up=True)
+        qty, kg = int(c.get("qty", 0)), float(c.get("weight", 0.0))
+        if l > 0 and w > 0 and h > 0 and qty > 0:
+            types.append([int(kg // WEIGHT_BAND), max(l, w), min(l, w), h, kg, idx, qty])
+    types.sort(key=lambda t: (-t[0], -t[1] * t[2], -t[3]))
+    return types
+
+
+def build_mixed_pallet(pal_L, pal_w, pal_H, pal_p_max, cartons, min_support=MIN_SUPPORT):
+    # Renvoie les cartons posés (x, y, z, l, w, h, sku) en cm, dans l'ordre
+    # de pose (de bas en haut pour un même empilement), les totaux, et les
+    # cartons chargés et non chargés par ligne de commande (index dans
+    # cartons : une référence peut figurer sur plusieurs lignes).
+    X, Y, Z = to_units(pal_L), to_units(pal_w), to_units(pal_H)
+    types = _types(cartons)
+    loaded = [0] * len(cartons)
+    placed = []
+    weight = vol = 0.0
+    if X > 0 and Y > 0 and Z > 0:
+        packer = _Packer(X, Y, Z, min_support)
+        while packer.points and types:
+            # Point le plus bas : il reçoit la référence préférée qui y tient.
+            # L'espace libre mesuré depuis le point écarte sans test les
+            # cartons trop grands ; un point où rien ne tient est abandonné
+            # (la palette ne fait que se remplir).
+            z, x, y = packer.points[0]
+            ex, ey, ez = packer.free_extent(x, y, z)
+            spot = None
+            for t in types:
+                band, a, b, h, kg = t[:5]
+                if h > ez or b > ex or b > ey or (pal_p_max > 0 and weight + kg > pal_p_max):
+                    continue
+                for l, w in ((a, b), (b, a)) if a != b else ((a, b),):
+                    if l <= ex and w <= ey and packer.fits(x, y, z, l, w, h, band):
+                        spot = (t, l, w)
+                        break
+                if spot is not None:
+                    break
+            if spot is None:
+                packer.drop_point(z, x, y)
+                continue
+            t, l, w = spot
+            band, _, _, h, kg, idx, _ = t
+            packer.place(x, y, z, l, w, h, band)
+            t[6] -= 1
+            if t[6] == 0:
+                types.remove(t)
+            weight += kg
+            vol += l * w * h
+            loaded[idx] += 1
+            placed.append((x / SCALE, y / SCALE, z / SCALE, l / SCALE, w / SCALE, h / SCALE, cartons[idx]["sku"]))
+
+    height = max((p[2] + p[5] for p in placed), default=0.0)
+    return {
+        "placements": placed,
+        "total": len(placed),
+        "poids": weight,
+        "hauteur": height,
+        "utilisation_vol": vol / (X * Y * Z) * 100 if X > 0 and Y > 0 and Z > 0 else 0,
+        "par_reference": {idx: n for idx, n in enumerate(loaded)},
+        "non_charges": {idx: int(c.get("qty", 0)) - n for idx, (c, n) in enumerate(zip(cartons, loaded))
+                        if int(c.get("qty", 0)) > n},
+    }
+
+
+def placements_csv(result):
+    # Plan de chargement (une ligne par carton, dans l'ordre de pose)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["Ordre", "Référence", "x (cm)", "y (cm)", "z (cm)", "Longueur (cm)", "Largeur (cm)", "Hauteur (cm)"])
+    for n, (x, y, z, l, w, h, sku) in enumerate(result["placements"], 1):
+        writer.writerow([n, sku, x, y, z, l, w, h])
+    return out.getvalue()
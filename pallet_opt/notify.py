@@ -0,0 +1,392 @@
+# ==========================================
+# ENVOI DES AVIS TELEGRAM EN ARRIÈRE-PLAN
+# ==========================================
+# Le formulaire d'avis ne fait que déposer le message dans une file bornée
+# et rend la main. Un thread unique par processus (partagé par toutes les
+# sessions) vide la file :
+#   - session HTTP réutilisée (connexion keep-alive, pool de taille 1) ;
+#   - délais de connexion / lecture bornés ;
+#   - nouvelles tentatives avec attente exponentielle (429 : retry_after) ;
+#   - les rafales reçues pendant BATCH_WINDOW sont regroupées en un seul
+#     message (limite Telegram de 4096 caractères respectée) ;
+#   - un envoi définitivement échoué est écrit dans un fichier local (JSON
+#     Lines) et retenté périodiquement, ainsi qu'au démarrage suivant.
+#
+# Serveur de test local imitant l'API Telegram :
+#   python -m pallet_opt.notify stub [--port 8081] [--fail-rate 0.3] [--delay 2]
+# puis TELEGRAM_API_BASE = "http://127.0.0.1:8081" dans les secrets.
+#   python -m pallet_opt.notify send "message" --api http://127.0.0.1:8081
+#   python -m pallet_opt.notify flush          (renvoie le fichier d'attente)
+import argparse
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+API_BASE = "https://api.telegram.org"
+
+DEFAULT_SPOOL = os.environ.get(
+    "PALLET_OPT_TELEGRAM_SPOOL",
+    os.path.join(os.path.expanduser("~"), ".cache", "pallet_opt", "telegram_spool.jsonl"),
+)
+
+# (connexion, lecture) en secondes
+TIMEOUT = (3.05, 10)
+MAX_QUEUE = 200
+RETRIES = 4
+BACKOFF = 0.5
+BACKOFF_MAX = 30.0
+# Fenêtre de regroupement des rafales et taille maximale d'un lot
+BATCH_WINDOW = 1.0
+MAX_BATCH = 20
+MAX_TEXT = 4096
+BATCH_SEPARATOR = "\n\n— — —\n\n"
+# Intervalle de reprise du fichier d'attente (s)
+SPOOL_RETRY = 60.0
+
+# Marqueur de fin déposé dans la file par close()
+_STOP = object()
+
+
+class DeliveryError(Exception):
+    def __init__(self, message, retry_after=None, permanent=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+def batch_texts(texts, limit=MAX_TEXT, separator=BATCH_SEPARATOR):
+    # Regroupe les textes en messages d'au plus limit caractères ; un texte
+    # trop long à lui seul est découpé
+    batches, current = [], ""
+    for text in texts:
+        while len(text) > limit:
+            if current:
+                batches.append(current)
+                current = ""
+            batches.append(text[:limit])
+            text = text[limit:]
+        if not current:
+            current = text
+        elif len(current) + len(separator) + len(text) <= limit:
+            current += separator + text
+        else:
+            batches.append(current)
+            current = text
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TelegramNotifier:
+    def __init__(self, token, chat_id, api_base=API_BASE, spool_path=DEFAULT_SPOOL, parse_mode="Markdown",
+                 timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH,
+                 maxsize=MAX_QUEUE, spool_retry=SPOOL_RETRY):
+        self.url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+        self.spool_path = spool_path
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.spool_retry = spool_retry
+        self.stats = {"queued": 0, "sent": 0, "batches": 0, "retries": 0, "spooled": 0, "resent": 0}
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._spool_lock = threading.Lock()
+        self._session = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        # stats est mis à jour par les sessions (submit) et par le thread
+        self._stats_lock = threading.Lock()
+
+    # --- Côté page ---
+    def submit(self, text):
+        # Ne bloque jamais : file pleine -> écrit directement dans le fichier
+        # d'attente, repris par le thread. Renvoie False dans ce cas.
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            self._spool([text], "file pleine")
+            return False
+        self._count("queued")
+        return True
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self, timeout=5.0):
+        # Vide la file (au mieux dans le délai), puis arrête le thread. Ne
+        # bloque jamais au-delà de timeout : file pleine ou thread arrêté, le
+        # marqueur de fin n'est pas déposé et le thread s'arrête sur _stop
+        # au lot suivant (messages restants écrits dans le fichier d'attente)
+        if self._thread is None:
+            return
+        # timeout None : pas de délai (attente de la fin des envois)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._stop.set()
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._session is not None:
+            self._session.close()
+
+    # --- Thread d'envoi ---
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+                self._thread.start()
+                atexit.register(self.close, 2.0)
+
+    def _run(self):
+        self.resend_spool()
+        last_spool = time.monotonic()
+        while True:
+            try:
+                texts = [self._queue.get(timeout=self.spool_retry)]
+            except queue.Empty:
+                texts = []
+            if texts and texts[0] is not _STOP:
+                texts += self._collect()
+            stop = _STOP in texts
+            texts = [t for t in texts if t is not _STOP]
+            if stop:
+                texts += self._drain()
+            if texts:
+                self._deliver(texts)
+            if stop:
+                return
+            if self._stop.is_set():
+                # Arrêt demandé sans marqueur (file pleine) : le reste attend
+                # le prochain démarrage dans le fichier d'attente
+                rest = self._drain()
+                if rest:
+                    self._spool(rest, "arrêt")
+                return
+            if time.monotonic() - last_spool >= self.spool_retry:
+                self.resend_spool()
+                last_spool = time.monotonic()
+
+    def _collect(self):
+        # Messages arrivés pendant la fenêtre de regroupement (rafale)
+        texts, deadline = [], time.monotonic() + self.batch_window
+        while len(texts) + 1 < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                texts.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            if texts[-1] is _STOP:
+                break
+        return texts
+
+    def _drain(self):
+        texts = []
+        while True:
+            try:
+                text = self._queue.get_nowait()
+            except queue.Empty:
+                return texts
+            if text is not _STOP:
+                texts.append(text)
+
+    def _deliver(self, texts):
+        batches = batch_texts(texts)
+        self._count("batches", len(batches))
+        for text in batches:
+            try:
+                self._send(text)
+                self._count("sent")
+            except DeliveryError as exc:
+                self._spool([text], str(exc), permanent=exc.permanent)
+
+    def _send(self, text):
+        # Une requête, avec nouvelles tentatives sur erreur réseau, 429 et 5xx
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return self._post(text)
+            except DeliveryError as exc:
+                if exc.permanent or attempt == self.retries or self._stop.is_set():
+                    raise
+                self._count("retries")
+                wait = exc.retry_after if exc.retry_after is not None else delay * (1 + random.random())
+                time.sleep(min(wait, BACKOFF_MAX))
+                delay *= 2
+
+    def _post(self, text):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        payload = {"chat_id": self.chat_id, "text": text}
+        if self.parse_mode:
+            payload["parse_mode"] = self.parse_mode
+        try:
+            response = self._session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as exc:
+            raise DeliveryError(f"réseau : {exc}") from exc
+        if response.status_code == 200:
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        description = body.get("description", response.reason)
+        if response.status_code == 429:
+            raise DeliveryError(f"429 {description}", retry_after=body.get("parameters", {}).get("retry_after"))
+        if response.status_code == 400 and self.parse_mode and "parse" in str(description).lower():
+            # Markdown invalide dans le texte de l'utilisateur : renvoi en
+            # texte brut plutôt qu'un échec définitif
+            payload.pop("parse_mode")
+            response = self._session.post(self.url, json=payload, timeout=self.timeout)
+            if response.status_code == 200:
+                return
+        raise DeliveryError(f"{response.status_code} {description}", permanent=400 <= response.status_code < 500)
+
+    # --- Fichier d'attente ---
+    def _spool(self, texts, error, permanent=False):
+        os.makedirs(os.path.dirname(os.path.abspath(self.spool_path)), exist_ok=True)
+        lines = "".join(json.dumps({"ts": time.time(), "text": t, "error": error, "permanent": permanent},
+                                   ensure_ascii=False) + "\n" for t in texts)
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+        self._count("spooled", len(texts))
+
+    def resend_spool(self):
+        # Reprend les messages en attente ; ceux qui échouent encore (ou
+        # refusés définitivement par l'API) sont réécrits dans le fichier
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return 0
+            with open(self.spool_path, encoding="utf-8") as fh:
+                records = []
+                for line in fh:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # ligne tronquée
+            os.remove(self.spool_path)
+        kept = [r for r in records if r.get("permanent")]
+        retry = [r["text"] for r in records if not r.get("permanent")]
+        resent = 0
+        for text in batch_texts(retry):
+            try:
+                self._send(text)
+                resent += 1
+            except DeliveryError as exc:
+                kept.append({"ts": time.time(), "text": text, "error": str(exc), "permanent": exc.permanent})
+        if kept:
+            with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as fh:
+                fh.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in kept))
+        self._count("resent", resent)
+        return resent
+
+
+# ==========================================
+# SERVEUR DE TEST (IMITATION DE L'API TELEGRAM)
+# ==========================================
+def make_stub_server(port=8081, fail_rate=0.0, delay=0.0, host="127.0.0.1"):
+    # POST /bot<token>/sendMessage -> {"ok": true, ...}. fail_rate : part des
+    # requêtes rejetées (500 ou 429 en alternance) ; delay : latence ajoutée.
+    # Les messages reçus sont conservés dans server.messages.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if delay:
+                time.sleep(delay)
+            if not self.path.endswith("/sendMessage"):
+                return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            if random.random() < fail_rate:
+                self.server.failures += 1
+                if self.server.failures % 2:
+                    return self._reply(500, {"ok": False, "error_code": 500, "description": "Internal Server Error"})
+                return self._reply(429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                         "parameters": {"retry_after": 1}})
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request: invalid JSON"})
+            self.server.messages.append(payload)
+            self._reply(200, {"ok": True, "result": {"message_id": len(self.server.messages), "text": payload.get("text")}})
+
+        def _reply(self, status, data):
+            raw = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, fmt, *args):
+            sys.stderr.write("stub: " + fmt % args + "\n")
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.messages, server.failures = [], 0
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pallet_opt.notify")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("stub", help="serveur local imitant l'API Telegram")
+    p.add_argument("--port", type=int, default=8081)
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    p.add_argument("--delay", type=float, default=0.0)
+    for name in ("send", "flush"):
+        p = sub.add_parser(name)
+        if name == "send":
+            p.add_argument("text", nargs="+")
+        p.add_argument("--api", default=os.environ.get("TELEGRAM_API_BASE", API_BASE))
+        p.add_argument("--token", default=os.environ.get("TELEGRAM_TOKEN", "test"))
+        p.add_argument("--chat-id", default=os.environ.get("TELEGRAM_CHAT_ID", "0"))
+        p.add_argument("--spool", default=DEFAULT_SPOOL)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "stub":
+        server = make_stub_server(args.port, args.fail_rate, args.delay)
+        print(f"API Telegram simulée sur http://127.0.0.1:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    notifier = TelegramNotifier(args.token, args.chat_id, api_base=args.api, spool_path=args.spool)
+    if args.cmd == "send":
+        for text in args.text:
+            notifier.submit(text)
+        notifier.close(timeout=None)
+    else:
+        print(f"{notifier.resend_spool()} message(s) renvoyé(s)")
+    print(json.dumps(notifier.stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# ==========================================
+# EXÉCUTION PARALLÈLE (POOL DE PROCESSUS)
+# ==========================================
+# Les gros lots (catalogue, balayages) sont découpés en tranches réparties
+# sur les cœurs. Entrées et sorties transitent par des tableaux NumPy en
+# mémoire partagée : seuls les noms des segments et les bornes de tranche
+# sont sérialisés vers les workers. Chaque tranche écrit à sa place dans le
+# tableau de sortie, l'ordre des résultats est donc toujours celui des
+# entrées.
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batch import RESULT_DTYPE, solve_best
+from .containers import professional_load_calc
+
+# En dessous, le coût de lancement des tâches dépasse le gain
+MIN_PARALLEL_ROWS = 4096
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def get_executor(workers):
+    # Un pool par nombre de workers, réutilisé d'un appel à l'autre. "spawn"
+    # évite de forker un processus Streamlit multi-threadé.
+    with _executors_lock:
+        pool = _executors.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executors[workers] = pool
+        return pool
+
+
+def shutdown():
+    with _executors_lock:
+        for pool in _executors.values():
+            pool.shutdown(cancel_futures=True)
+        _executors.clear()
+
+
+def _attach(name, shape, dtype):
+    # Les workers "spawn" partagent le resource_tracker du parent : c'est le
+    # parent qui libère (unlink) les segments après usage.
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_shard(kernel, in_spec, out_spec, start, stop, args):
+    in_shm, inputs = _attach(*in_spec)
+    out_shm, outputs = _attach(*out_spec)
+    try:
+        outputs[start:stop] = kernel(inputs[start:stop], *args)
+    finally:
+        del inputs, outputs
+        in_shm.close()
+        out_shm.close()
+    return stop - start
+
+
+def run_sharded(kernel, inputs, out_dtype, out_tail=(), args=(), workers=None, shard_size=None):
+    # kernel(tranche_entrées, *args) -> tranche_sorties, fonction de niveau
+    # module (sérialisable). Le résultat est une copie en mémoire privée.
+    inputs = np.ascontiguousarray(inputs)
+    n = inputs.shape[0]
+    workers = workers or default_workers()
+    out_shape = (n,) + tuple(out_tail)
+    if workers <= 1 or n < MIN_PARALLEL_ROWS:
+        out = np.empty(out_shape, dtype=out_dtype)
+        if n:
+            out[:] = kernel(inputs, *args)
+        return out
+
+    if shard_size is None:
+        # Environ 4 tranches par worker pour lisser les écarts de durée
+        shard_size = max(1, -(-n // (workers * 4)))
+    out_dtype = np.dtype(out_dtype)
+    in_shm = shared_memory.SharedMemory(create=True, size=max(inputs.nbytes, 1))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(out_shape)) * out_dtype.itemsize, 1))
+    try:
+        np.ndarray(inputs.shape, dtype=inputs.dtype, buffer=in_shm.buf)[:] = inputs
+        in_spec = (in_shm.name, inputs.shape, inputs.dtype)
+        out_spec = (out_shm.name, out_shape, out_dtype)
+        pool = get_executor(workers)
+        futures = [pool.submit(_run_shard, kernel, in_spec, out_spec, start, min(start + shard_size, n), args)
+                   for start in range(0, n, shard_size)]
+        for f in futures:
+            f.result()
+        out = np.ndarray(out_shape, dtype=out_dtype, buffer=out_shm.buf).copy()
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+    return out
+
+
+# ==========================================
+# NOYAUX PRÊTS À L'EMPLOI
+# ==========================================
+def _best_kernel(boxes, pallets):
+    return solve_best(boxes, pallets)
+
+
+def parallel_solve_best(boxes, pallets, workers=None, shard_size=None):
+    # Équivalent parallèle de batch.solve_best
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    pallets = np.asarray(pallets, dtype=np.float64).reshape(-1, 4)
+    return run_sharded(_best_kernel, boxes, RESULT_DTYPE, (pallets.shape[0],), (pallets,), workers, shard_size)
+
+
+# Colonnes d'entrée : les 10 paramètres de professional_load_calc, dans l'ordre
+CONTAINER_INPUT_COLUMNS = ("cont_L", "cont_W", "cont_H", "p_L", "p_W", "p_H",
+                           "box_unit_weight", "pallet_support_weight", "b_per_p", "max_load")
+
+CONTAINER_RESULT_DTYPE = np.dtype([
+    ("palettes_sol", "i8"), ("niveaux", "i8"), ("total_palettes", "i8"),
+    ("poids_total_brut", "f8"), ("utilisation_vol", "f8"),
+])
+
+
+def _container_kernel(rows):
+    out = np.empty(rows.shape[0], dtype=CONTAINER_RESULT_DTYPE)
+    for i, row in enumerate(rows.tolist()):
+        res = professional_load_calc(*row)
+        out[i] = tuple(res[name] for name in CONTAINER_RESULT_DTYPE.names)
+    return out
+
+
+def parallel_container_calc(rows, workers=None, shard_size=None):
+    # rows : (n, 10) dans l'ordre de CONTAINER_INPUT_COLUMNS
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CONTAINER_INPUT_COLUMNS))
+    return run_sharded(_container_kernel, rows, CONTAINER_RESULT_DTYPE, (), (), workers, shard_size)
@@ -0,0 +1,125 @@
+# ==========================================
+# CHAÎNE CARTON -> PALETTE -> CONTENEURS
+# ==========================================
+# Un seul calcul pour les deux pages : le meilleur chargement palette
+# (cached_pallet, comme app.py) devient l'unité de charge de
+# professional_load_calc (comme pages/app3.py), pour chaque type de
+# conteneur. pallet_unit fixe la conversion (hauteur du support, poids de
+# la palette vide) ; app.py l'utilise pour alimenter la page conteneur.
+#
+# En lot (une liste de commandes), les résultats intermédiaires sont
+# partagés : une palette n'est calculée qu'une fois par entrée canonique
+# (dimensions au mm, box triées), la géométrie une fois par jeu de
+# dimensions (seuls les poids diffèrent), le plan au sol une fois par
+# couple (conteneur, empreinte de palette) et chaque chargement conteneur
+# une fois par entrée canonique.
+from .cache import canonical_container, canonical_pallet, cached_container, input_order, make_key, pallet_value
+from .containers import CONTAINER_TYPES, floor_layout, professional_load_calc
+
+# Hauteur du support sous les box (cm), comme render.PALLET_BASE_H
+SUPPORT_HEIGHT = 14.4
+# Poids de la palette vide (kg), comme app.py
+SUPPORT_WEIGHT = 25.0
+
+# Entrées par défaut d'un carton (mêmes valeurs que la page palette)
+ITEM_DEFAULTS = {"pal_L": 120.0, "pal_w": 80.0, "pal_H": 200.0, "pal_p_max": 1000.0, "box_poids": 0.0}
+PALLET_KEYS = ["pal_L", "pal_w", "pal_H", "pal_p_max", "L", "W", "H", "box_poids"]
+
+# Champs de professional_load_calc recopiés par conteneur
+CONTAINER_KEYS = ["palettes_sol", "niveaux", "total_palettes", "poids_total_brut", "utilisation_vol", "orient"]
+# Chargement d'une palette vide (aucune box ne tient) : rien n'est expédié
+EMPTY_LOAD = {"palettes_sol": 0, "niveaux": 0, "total_palettes": 0, "poids_total_brut": 0, "utilisation_vol": 0, "orient": "N/A",
+              "total_box": 0}
+
+
+def standard_containers():
+    return [name for name in CONTAINER_TYPES if name != "Personnaliser..."]
+
+
+def pallet_unit(best, pal_L, pal_w, box_poids, support_height=SUPPORT_HEIGHT, support_weight=SUPPORT_WEIGHT):
+    # Palette chargée vue par le conteneur (paramètres de pages/app3.py)
+    loaded = best.get("Hauteur Totale", best["Hauteur"] * best["Nb Couches"])
+    return {"p_L": float(pal_L), "p_W": float(pal_w), "p_H": round(loaded + support_height, 3), "b_per_p": int(best["Total"]),
+            "w_box": float(box_poids), "w_pal": float(support_weight)}
+
+
+class _Memo(dict):
+    # Résultats intermédiaires partagés par le lot (clé -> valeur, compteur
+    # de calculs effectifs)
+    def __init__(self):
+        super().__init__()
+        self.computed = 0
+
+    def get_or_compute(self, key, compute):
+        if key not in self:
+            self[key] = compute()
+            self.computed += 1
+        return self[key]
+
+
+def run_pipeline(items, containers=None, cache=None, support_height=SUPPORT_HEIGHT, support_weight=SUPPORT_WEIGHT,
+                 stats=None):
+    # items : [{"L", "W", "H", "box_poids", "pal_L", "pal_w", "pal_H", "pal_p_max", ...}]
+    # (cm, kg ; pallet par défaut : ITEM_DEFAULTS). Les autres champs (sku,
+    # libellé...) sont recopiés. containers : noms de CONTAINER_TYPES (par
+    # défaut : tous les standards). cache : ResultCache partagé ou None.
+    # Renvoie un résultat par item : {**champs, "best", "unit", "containers":
+    # {nom: {..., "total_box"}}, "meilleur_conteneur"} (None si aucune box
+    # n'est chargée, EMPTY_LOAD partout si la palette est vide). stats : dict rempli
+    # avec le nombre de calculs effectifs par étape.
+    from .layers import layout_geometry
+
+    containers = standard_containers() if containers is None else list(containers)
+    geometries, pallets, floors, loads = _Memo(), _Memo(), _Memo(), _Memo()
+
+    def geometry(*dims):
+        return geometries.get_or_compute(dims, lambda: layout_geometry(*dims))
+
+    def floor(*dims):
+        return floors.get_or_compute(dims, lambda: floor_layout(*dims))
+
+    def solve_pallet(args):
+        # Même calcul que cached_pallet (entrées au mm, géométrie sur les
+        # dimensions triées, résultat dans l'ordre saisi) : résultats
+        # identiques avec ou sans cache
+        canon = canonical_pallet(*args)
+        if cache is not None:
+            value = pallets.get_or_compute(canon, lambda: cache.get_or_compute(
+                make_key("pallet", *canon), lambda: pallet_value(canon, geometry)))
+        else:
+            value = pallets.get_or_compute(canon, lambda: pallet_value(canon, geometry))
+        return input_order(value, canon, *args[4:7])[1]
+
+    def load(args):
+        canon = canonical_container(*args)
+        if cache is not None:
+            return loads.get_or_compute(canon, lambda: cached_container(cache, *args, floor=floor))
+        cont = [v / 10 for v in canon[:6]] + [canon[6] / 1000, canon[7] / 1000, canon[8], canon[9] / 1000]
+        return loads.get_or_compute(canon, lambda: professional_load_calc(*cont, floor=floor))
+
+    out = []
+    for item in items:
+        spec = {**ITEM_DEFAULTS, **item}
+        args = tuple(float(spec[k]) for k in PALLET_KEYS)
+        best = solve_pallet(args)
+        unit = pallet_unit(best, args[0], args[1], args[7], support_height, support_weight)
+        loaded = {}
+        for name in containers:
+            if unit["b_per_p"] == 0:
+                loaded[name] = dict(EMPTY_LOAD)
+                continue
+            c = CONTAINER_TYPES[name]
+            res = load((c["L"], c["W"], c["H"], unit["p_L"], unit["p_W"], unit["p_H"], unit["w_box"], unit["w_pal"],
+                        unit["b_per_p"], c["MaxPayload"]))
+            row = {key: res.get(key, 0) for key in CONTAINER_KEYS}
+            row["total_box"] = row["total_palettes"] * unit["b_per_p"]
+            loaded[name] = row
+        top = max(loaded, key=lambda n: loaded[n]["total_box"], default=None)
+        if top is not None and loaded[top]["total_box"] == 0:
+            top = None
+        out.append({**item, "best": best, "unit": unit, "containers": loaded, "meilleur_conteneur": top})
+
+    if stats is not None:
+        stats.update({"items": len(out), "palettes": pallets.computed, "geometries": geometries.computed,
+                      "plans_sol": floors.computed, "conteneurs": loads.computed})
+    return out
@@ -0,0 +1,147 @@
+# ==========================================
+# PROFILAGE DES RERUNS (OPT-IN)
+# ==========================================
+# Chronomètre chaque étape d'un rerun Streamlit (solveur, DataFrame,
+# génération HTML, rendu des composants, export) et ajoute une ligne JSON
+# par rerun dans un journal local partagé par toutes les sessions. Le
+# journal s'agrège en p50 / p95 par étape, affichés dans le panneau de
+# débogage ou exportés au format texte Prometheus :
+#   python -m pallet_opt.profiling [journal.jsonl] [--prometheus sortie.prom]
+#
+# Activation : PALLET_OPT_PROFILE=1, ou ?debug=1 dans l'URL de la page.
+# Désactivé, stage() renvoie un contexte vide réutilisé : coût négligeable.
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+DEFAULT_LOG = os.environ.get(
+    "PALLET_OPT_PROFILE_LOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "pallet_opt", "timings.jsonl"),
+)
+
+# Nombre de reruns récents pris en compte pour les percentiles du panneau
+SUMMARY_WINDOW = 5000
+
+_NULL = contextlib.nullcontext()
+_log_lock = threading.Lock()
+
+
+def enabled_by_env():
+    return os.environ.get("PALLET_OPT_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+class Profiler:
+    def __init__(self, page, enabled=True, log_path=DEFAULT_LOG):
+        self.page = page
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages = {}
+        self._start = time.perf_counter()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self):
+        return time.perf_counter() - self._start
+
+    def rows(self):
+        # Lignes du panneau de débogage (ms), étapes dans l'ordre d'exécution
+        return [{"Étape": name, "Durée (ms)": seconds * 1e3} for name, seconds in self.stages.items()]
+
+    def flush(self):
+        # Ajoute le rerun au journal ; une seule écriture par ligne (mode
+        # append) pour que les sessions concurrentes ne s'entremêlent pas.
+        if not self.enabled or not self.stages:
+            return
+        line = json.dumps({"ts": time.time(), "page": self.page, "run": self.run_id,
+                           "total": self.total(), "stages": self.stages}, separators=(",", ":"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        with _log_lock, open(self.log_path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+def read_log(path=DEFAULT_LOG, last=SUMMARY_WINDOW):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        lines = deque(fh, maxlen=last) if last else list(fh)
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue  # ligne tronquée (écriture interrompue)
+    return records
+
+
+def summarize(records, page=None):
+    # {(page, étape): {"count", "p50", "p95", "mean"}} en secondes ; l'étape
+    # "total" couvre le rerun entier
+    samples = {}
+    for rec in records:
+        if page is not None and rec.get("page") != page:
+            continue
+        for name, seconds in list(rec.get("stages", {}).items()) + [("total", rec.get("total", 0.0))]:
+            samples.setdefault((rec.get("page"), name), []).append(seconds)
+    out = {}
+    for key, values in samples.items():
+        arr = np.asarray(values, dtype=np.float64)
+        p50, p95 = np.percentile(arr, [50, 95])
+        out[key] = {"count": int(arr.size), "p50": float(p50), "p95": float(p95), "mean": float(arr.mean())}
+    return out
+
+
+def prometheus_text(summary):
+    # Format texte d'exposition Prometheus (type summary, quantiles 0.5 / 0.95)
+    lines = [
+        "# HELP pallet_opt_stage_seconds Durée des étapes d'un rerun Streamlit.",
+        "# TYPE pallet_opt_stage_seconds summary",
+    ]
+    for (page, stage), s in sorted(summary.items()):
+        labels = f'page="{page}",stage="{stage}"'
+        lines.append(f'pallet_opt_stage_seconds{{{labels},quantile="0.5"}} {s["p50"]:.6f}')
+        lines.append(f'pallet_opt_stage_seconds{{{labels},quantile="0.95"}} {s["p95"]:.6f}')
+        lines.append(f"pallet_opt_stage_seconds_sum{{{labels}}} {s['mean'] * s['count']:.6f}")
+        lines.append(f"pallet_opt_stage_seconds_count{{{labels}}} {s['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pallet_opt.profiling")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG)
+    parser.add_argument("--last", type=int, default=0, help="seulement les N derniers reruns (0 = tous)")
+    parser.add_argument("--prometheus", help="écrit le résumé au format texte Prometheus dans ce fichier")
+    args = parser.parse_args(argv)
+
+    summary = summarize(read_log(args.log, args.last))
+    if args.prometheus:
+        tmp = args.prometheus + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(prometheus_text(summary))
+        os.replace(tmp, args.prometheus)
+    for (page, stage), s in sorted(summary.items()):
+        print(f"{page:12s} {stage:22s} n={s['count']:6d}  p50={s['p50'] * 1e3:9.2f} ms  p95={s['p95'] * 1e3:9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# ==========================================
+# RENDU DES PLACEMENTS (CANVAS / WEBGL)
+# ==========================================
+# Le visuel reçoit un tableau compact de box (x, y, z, l, w, h), en mm sur
+# des entiers 16 bits little-endian encodés en base64 : 16 octets par box
+# dans la page, quelle que soit la mise en forme. viewer.html dessine le
+# plan au sol en Canvas 2D (un seul chemin) et la vue 3D en WebGL2 (un cube
+# instancié par box, un seul appel de dessin) : des milliers de box
+# s'affichent en une image.
+import base64
+import html
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from .layers import SCALE
+
+VIEWER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "viewer.html")
+HEADER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "header.html")
+
+# Épaisseur d'une palette EUR (cm), dessinée sous les box
+PALLET_BASE_H = 14.4
+
+
+@lru_cache(maxsize=1)
+def _template():
+    with open(VIEWER_PATH, encoding="utf-8") as fh:
+        return fh.read()
+
+
+@lru_cache(maxsize=8)
+def header_html(title):
+    # Bandeau des pages (carrousel, polices distantes). Chaîne identique d'un
+    # rerun à l'autre : le navigateur garde l'iframe au lieu de la recharger.
+    with open(HEADER_PATH, encoding="utf-8") as fh:
+        return fh.read().replace("__TITLE__", html.escape(title))
+
+
+def encode_boxes(boxes):
+    # boxes : (x, y, z, l, w, h) en cm -> base64 d'un tableau uint16 en mm
+    arr = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    mm = np.clip(np.rint(arr * SCALE), 0, np.iinfo(np.uint16).max).astype("<u2")
+    return base64.b64encode(mm.tobytes()).decode("ascii")
+
+
+def pallet_boxes(best):
+    # Box d'une palette à partir du meilleur résultat (layers.best_layout) :
+    # couches identiques, ou "couches" de l'empilement mixte, de bas en haut
+    # jusqu'au total (dernière couche partielle si le poids limite).
+    if best.get("couches"):
+        layers = [(c["placements"], c["Hauteur"]) for c in best["couches"]]
+    else:
+        layers = [(best["placements"], best["Hauteur"])] * int(best["Nb Couches"])
+        if best["Total"] > best["Par Couche"] * best["Nb Couches"]:
+            layers.append((best["placements"], best["Hauteur"]))
+    boxes, z, left = [], 0.0, int(best["Total"])
+    for placements, h in layers:
+        for x, y, l, w in placements[:left]:
+            boxes.append((x, y, z, l, w, h))
+        left -= min(left, len(placements))
+        z += h
+        if left <= 0:
+            break
+    return boxes
+
+
+def viewer_html(boxes, bounds, base=PALLET_BASE_H, floor_label="Plan au sol", volume_label="Volume"):
+    # boxes : (x, y, z, l, w, h) en cm ; bounds : (longueur, largeur, hauteur)
+    # de la palette ou du conteneur en cm ; base : support dessiné sous z = 0.
+    replacements = {
+        "__BOXES__": encode_boxes(boxes),
+        "__BOUNDS__": json.dumps([round(float(v) * SCALE) for v in bounds]),
+        "__BASE__": str(round(float(base) * SCALE)),
+        "__FLOOR_LABEL__": html.escape(floor_label),
+        "__VOLUME_LABEL__": html.escape(volume_label),
+    }
+    page = _template()
+    for key, value in replacements.items():
+        page = page.replace(key, value)
+    return page
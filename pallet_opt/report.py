@@ -0,0 +1,149 @@
+# ==========================================
+# RAPPORTS EXCEL (XLSXWRITER, MÉMOIRE CONSTANTE)
+# ==========================================
+# Un rapport est une suite de feuilles (titre, en-têtes, lignes) dont les
+# lignes sont des itérables, souvent des générateurs branchés directement
+# sur la sortie du solveur ou sur le fichier résultat du mode catalogue.
+# XlsxWriter écrit en mode constant_memory : chaque ligne est envoyée sur
+# disque dès que la suivante commence, la mémoire ne dépend donc pas du
+# nombre de lignes. Le classeur n'est construit qu'à la demande (bouton de
+# téléchargement différé dans les pages).
+import os
+import tempfile
+
+import pandas as pd
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+MAX_SHEET_ROWS = 1048576
+
+# Taille des blocs relus dans le fichier résultat du mode catalogue
+EXPORT_CHUNK = 20000
+
+
+def _sheet_names(title):
+    # "Résultats", "Résultats (2)", ... (31 caractères maximum)
+    yield title[:31]
+    n = 2
+    while True:
+        suffix = f" ({n})"
+        yield title[:31 - len(suffix)] + suffix
+        n += 1
+
+
+def write_workbook(path, sheets):
+    # sheets : itérable de (titre, en-têtes, lignes). Une feuille pleine
+    # continue sur "titre (2)", etc.
+    import xlsxwriter
+
+    # Chaînes écrites telles quelles : la détection d'URL / de formule coûte
+    # une expression régulière par cellule
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True,
+                                          "strings_to_urls": False, "strings_to_formulas": False,
+                                          "tmpdir": tempfile.gettempdir()})
+    header_fmt = workbook.add_format({"bold": True, "font_color": "white", "bg_color": "#2c3e50"})
+    try:
+        for title, header, rows in sheets:
+            names = _sheet_names(title)
+            sheet, r = None, MAX_SHEET_ROWS
+            for row in rows:
+                if r >= MAX_SHEET_ROWS:
+                    sheet, r = workbook.add_worksheet(next(names)), 1
+                    sheet.set_column(0, len(header) - 1, 16)
+                    sheet.freeze_panes(1, 0)
+                    sheet.write_row(0, 0, header, header_fmt)
+                sheet.write_row(r, 0, row)
+                r += 1
+            if sheet is None:
+                sheet = workbook.add_worksheet(next(names))
+                sheet.set_column(0, len(header) - 1, 16)
+                sheet.write_row(0, 0, header, header_fmt)
+    finally:
+        workbook.close()
+
+
+def workbook_bytes(sheets):
+    # Classeur complet en octets (pour st.download_button). Il est écrit dans
+    # un fichier temporaire : seul le fichier final compressé passe en mémoire.
+    fd, path = tempfile.mkstemp(prefix="pallet_report_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_workbook(path, sheets)
+        with open(path, "rb") as fh:
+            return fh.read()
+    finally:
+        os.remove(path)
+
+
+def _records(rows, header):
+    for row in rows:
+        yield [row.get(col) for col in header]
+
+
+# ==========================================
+# FEUILLES PAR PAGE
+# ==========================================
+def pallet_report(params, results, best):
+    # params : {libellé: valeur} des entrées ; results : lignes de
+    # core.solve_pallet ; best : résultat retenu (layers.best_layout)
+    summary = list(params.items()) + [
+        ("Orientation retenue", best["Orientation"]),
+        ("Box par palette", best["Total"]),
+        ("Box par couche", best["Par Couche"]),
+        ("Nombre de couches", best["Nb Couches"]),
+        ("Hauteur chargée (cm)", best.get("Hauteur Totale", best["Hauteur"] * best["Nb Couches"])),
+        ("Poids (kg)", best["Poids (kg)"]),
+    ]
+    orient_cols = ["Orientation", "Hauteur", "Total", "Par Couche", "Nb Couches", "Poids (kg)", "nx", "ny"]
+    layer_cols = ["Couche", "Orientation", "Hauteur", "Par Couche"]
+    if best.get("couches"):
+        layers = ([i, c["Orientation"], c["Hauteur"], c["Par Couche"]] for i, c in enumerate(best["couches"], 1))
+    else:
+        layers = ([i, best["Orientation"], best["Hauteur"], best["Par Couche"]] for i in range(1, int(best["Nb Couches"]) + 1))
+    return [
+        ("Palette", ["Paramètre", "Valeur"], summary),
+        ("Orientations", orient_cols, _records(results, orient_cols)),
+        ("Couches", layer_cols, layers),
+        ("Plan au sol", ["x (cm)", "y (cm)", "Longueur (cm)", "Largeur (cm)"], best["placements"]),
+    ]
+
+
+def container_report(params, res, plan=None):
+    # params : {libellé: valeur} ; res : professional_load_calc ou
+    # consolidation.load_mixed_container ; plan : shipment.plan_shipment
+    summary = list(params.items()) + [
+        ("Palettes au sol", res["palettes_sol"]),
+        ("Niveaux", res["niveaux"]),
+        ("Total palettes", res["total_palettes"]),
+        ("Poids brut total (kg)", res["poids_total_brut"]),
+        ("Poids des box (kg)", res.get("poids_total_box", 0)),
+        ("Poids des supports (kg)", res.get("poids_total_supports", 0)),
+        ("Utilisation volume (%)", res["utilisation_vol"]),
+    ]
+    sheets = [
+        ("Conteneur", ["Paramètre", "Valeur"], summary),
+        ("Zones", ["Zone", "Orientation", "Palettes"], res["zones"]),
+        ("Plan au sol", ["x (cm)", "y (cm)", "Longueur (cm)", "Largeur (cm)"], res["placements"]),
+    ]
+    if res.get("palettes"):
+        sheets.append(("Palettes", ["x (cm)", "y (cm)", "z (cm)", "Longueur (cm)", "Largeur (cm)", "Hauteur (cm)", "Type"],
+                       res["palettes"]))
+    if plan and plan["containers"]:
+        cols = list(plan["containers"][0])
+        sheets.append(("Plan d'expédition", cols, _records(plan["containers"], cols)))
+    return sheets
+
+
+def _csv_rows(path, chunk_size, dtype=None):
+    for chunk in pd.read_csv(path, chunksize=chunk_size, keep_default_na=False, dtype=dtype):
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def batch_report(csv_path, summary, chunk_size=EXPORT_CHUNK):
+    # csv_path : fichier résultat de catalogue.CatalogueRun, relu par blocs
+    from .catalogue import RESULT_COLUMNS
+
+    return [
+        ("Synthèse", list(summary.columns), summary.itertuples(index=False, name=None)),
+        # Identifiants relus tels quels ("00123" ne devient pas 123)
+        ("Résultats", RESULT_COLUMNS, _csv_rows(csv_path, chunk_size, dtype={c: str for c in ("sku", "Palette", "Orientation")})),
+    ]
@@ -0,0 +1,291 @@
+# ==========================================
+# SERVICE HTTP JSON (ASYNCIO, POOL DE PROCESSUS)
+# ==========================================
+# Expose les calculs de la CLI (cli.pallet_record, cli.container_record)
+# en HTTP pour le WMS / l'ERP, sans Streamlit. Une boucle asyncio gère les
+# connexions (keep-alive, délais de lecture bornés : un client lent ne
+# bloque personne) ; les calculs partent dans le pool de processus de
+# parallel.py. Les workers partagent le cache SQLite des pages.
+#
+#   python -m pallet_opt.server [--host 127.0.0.1] [--port 8600] [--workers N]
+#
+#   POST /pallet     {"box": "45x35x25", "weight": 15, "pallet": "EUR", ...}
+#   POST /container  {"type": "40HC", "pallet": "120x80x160", "boxes_per_pallet": 40, ...}
+#   POST /batch      {"items": [{"kind": "pallet", ...}, {"kind": "container", ...}]}
+#   GET  /health, GET /stats
+#
+# Les champs sont ceux des options de la CLI ("max-weight" ou max_weight).
+# Dans un lot, chaque élément reçoit son résultat ou {"error": ...} ; les
+# éléments identiques ne sont calculés qu'une fois.
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+HOST = "127.0.0.1"
+PORT = 8600
+
+MAX_BODY = 8 * 1024 * 1024
+MAX_BATCH_ITEMS = 10000
+MAX_HEADERS = 100
+# Délai de lecture d'une requête (en-têtes + corps) et d'attente entre deux
+# requêtes d'une connexion keep-alive
+READ_TIMEOUT = 10.0
+IDLE_TIMEOUT = 30.0
+# Éléments d'un lot envoyés ensemble à un worker
+BATCH_CHUNK = 64
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+_worker_caches = {}
+
+_FIELDS = {
+    "pallet": ("box", "weight", "pallet", "height", "max_weight", "placements"),
+    "container": ("container", "dims", "payload", "pallet", "boxes_per_pallet", "box_weight", "pallet_weight", "placements"),
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==========================================
+# CALCULS (EXÉCUTÉS DANS LES WORKERS)
+# ==========================================
+def _solve(cache_path, kind, item):
+    from .cache import ResultCache
+    from .cli import _option_name, container_record, pallet_record
+
+    cache = None
+    if cache_path:
+        # Une connexion SQLite par worker et par fichier, ouverte au premier calcul
+        cache = _worker_caches.get(cache_path)
+        if cache is None:
+            cache = _worker_caches[cache_path] = ResultCache(cache_path)
+    func = pallet_record if kind == "pallet" else container_record
+    names = _FIELDS[kind]
+    # Comme pour la CLI, les champs qui ne sont pas des options (id, sku...)
+    # sont recopiés en tête du résultat
+    options, extra = {}, {}
+    for key, value in item.items():
+        if key == "kind":
+            continue
+        name = _option_name(key)
+        if name in names:
+            options[name] = value
+        else:
+            extra[key] = value
+    return {**extra, **func(**options, cache=cache)}
+
+
+def solve_items(cache_path, items):
+    # [(kind, item)] -> [résultat ou {"error": ...}], dans l'ordre
+    out = []
+    for kind, item in items:
+        try:
+            out.append(_solve(cache_path, kind, item))
+        except (ValueError, TypeError, KeyError) as exc:
+            out.append({"error": str(exc)})
+    return out
+
+
+# ==========================================
+# SERVEUR
+# ==========================================
+class PalletService:
+    def __init__(self, workers=None, cache_path=None):
+        from .cache import DEFAULT_PATH
+        from .parallel import default_workers, get_executor
+
+        self.workers = workers or default_workers()
+        self.cache_path = DEFAULT_PATH if cache_path is None else cache_path
+        self.pool = get_executor(self.workers)
+        self.started = time.time()
+        self.counters = {"requests": 0, "items": 0, "errors": 0, "connections": 0}
+
+    # --- Routes ---
+    async def handle(self, method, path, body):
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            return {"ok": True}
+        if path == "/stats":
+            return await self._stats()
+        if path not in ("/pallet", "/container", "/batch"):
+            raise HTTPError(404, f"route inconnue : {path}")
+        if method != "POST":
+            raise HTTPError(405, "POST attendu")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError as exc:
+            raise HTTPError(400, f"JSON invalide : {exc}") from exc
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "objet JSON attendu")
+        if path == "/batch":
+            return {"results": await self.batch(payload.get("items"))}
+        [result] = await self._run([(path[1:], payload)])
+        if "error" in result:
+            raise HTTPError(422, result["error"])
+        return result
+
+    async def batch(self, items):
+        if not isinstance(items, list):
+            raise HTTPError(400, "\"items\" doit être une liste")
+        if len(items) > MAX_BATCH_ITEMS:
+            raise HTTPError(413, f"au plus {MAX_BATCH_ITEMS} éléments par lot")
+        # Déduplication : une clé JSON canonique par élément
+        unique, index = [], {}
+        slots = []
+        for item in items:
+            if not isinstance(item, dict) or item.get("kind", "pallet") not in ("pallet", "container"):
+                slots.append(None)
+                continue
+            key = json.dumps(item, sort_keys=True)
+            if key not in index:
+                index[key] = len(unique)
+                unique.append((item.get("kind", "pallet"), item))
+            slots.append(index[key])
+        results = await self._run(unique)
+        error = {"error": "élément invalide : objet avec \"kind\" = \"pallet\" ou \"container\" attendu"}
+        return [error if slot is None else results[slot] for slot in slots]
+
+    async def _run(self, items):
+        loop = asyncio.get_running_loop()
+        # Tranches réparties sur tous les workers, au plus BATCH_CHUNK éléments
+        size = min(BATCH_CHUNK, max(1, -(-len(items) // self.workers)))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        parts = await asyncio.gather(*(loop.run_in_executor(self.pool, solve_items, self.cache_path, chunk)
+                                       for chunk in chunks))
+        results = [r for part in parts for r in part]
+        self.counters["items"] += len(results)
+        self.counters["errors"] += sum(1 for r in results if "error" in r)
+        return results
+
+    async def _stats(self):
+        from .cache import ResultCache
+
+        def cache_stats():
+            if not self.cache_path:
+                return None
+            cache = ResultCache(self.cache_path)
+            try:
+                return cache.stats()
+            finally:
+                cache.close()
+
+        return {"uptime": time.time() - self.started, "workers": self.workers, **self.counters,
+                "cache": await asyncio.to_thread(cache_stats)}
+
+    # --- HTTP/1.1 minimal ---
+    async def serve_connection(self, reader, writer):
+        self.counters["connections"] += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as exc:
+                    await self._respond(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, path, version, headers, body = request
+                self.counters["requests"] += 1
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive")
+                try:
+                    status, data = 200, await self.handle(method, path, body)
+                except HTTPError as exc:
+                    status, data = exc.status, {"error": str(exc)}
+                except Exception as exc:  # erreur interne : la connexion reste utilisable
+                    status, data = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                await self._respond(writer, status, data, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        try:
+            line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode("latin1").split()
+        except ValueError:
+            raise HTTPError(400, "ligne de requête invalide")
+        try:
+            headers, body = await asyncio.wait_for(self._read_rest(reader), READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "requête trop lente")
+        return method.upper(), path, version.upper(), headers, body
+
+    async def _read_rest(self, reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(400, "trop d'en-têtes")
+            name, _, value = line.decode("latin1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length invalide")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"corps limité à {MAX_BODY} octets")
+        return headers, (await reader.readexactly(length) if length else b"")
+
+    async def _respond(self, writer, status, data, keep_alive):
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(raw)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin1") + raw)
+        await writer.drain()
+
+
+async def serve(host=HOST, port=PORT, workers=None, cache_path=None, ready=None):
+    service = PalletService(workers, cache_path)
+    server = await asyncio.start_server(service.serve_connection, host, port, limit=64 * 1024)
+    if ready is not None:
+        ready(server)
+    print(f"pallet-opt : http://{host}:{port} ({service.workers} workers, cache {service.cache_path or 'désactivé'})",
+          file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pallet_opt.server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument("--cache", default=None, help="fichier du cache partagé ('' : sans cache)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        from .parallel import shutdown
+
+        shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
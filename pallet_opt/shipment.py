@@ -0,0 +1,96 @@
+# ==========================================
+# PLANIFICATION D'EXPÉDITION MULTI-CONTENEURS
+# ==========================================
+# Pour une quantité de box donnée, choisit le mix de conteneurs le moins
+# cher (sac à dos de couverture non borné : chaque type peut être pris
+# autant de fois que nécessaire) puis répartit les palettes dans les
+# conteneurs retenus.
+#
+# Passage à l'échelle : il existe toujours une solution optimale où les
+# types autres que le meilleur rapport coût / palette sont utilisés moins
+# de c* fois (c* = capacité du meilleur type). Au-delà de c* x capacité
+# max palettes, le surplus est donc couvert directement par le meilleur
+# type et la programmation dynamique ne porte que sur un reste borné.
+import math
+
+
+def _cover_dp(need, options):
+    # options : [(nom, capacité, coût)]. dp[q] = (coût, nb conteneurs) minimal
+    # pour transporter au moins q palettes.
+    INF = (math.inf, math.inf)
+    dp = [INF] * (need + 1)
+    choice = [None] * (need + 1)
+    dp[0] = (0.0, 0)
+    for q in range(1, need + 1):
+        best, pick = INF, None
+        for idx, (_, cap, cost) in enumerate(options):
+            prev = dp[max(0, q - cap)]
+            cand = (prev[0] + cost, prev[1] + 1)
+            if cand < best:
+                best, pick = cand, idx
+        dp[q] = best
+        choice[q] = pick
+    counts = [0] * len(options)
+    q = need
+    while q > 0:
+        idx = choice[q]
+        counts[idx] += 1
+        q = max(0, q - options[idx][1])
+    return counts
+
+
+def plan_shipment(target_box, b_per_p, containers, w_box=0.0, w_pal=0.0):
+    # containers : {nom: {"capacity": palettes par conteneur, "cost": coût,
+    #                     "payload": charge utile max (kg, optionnel)}}
+    # Renvoie le mix retenu, le coût total et le détail par conteneur.
+    b_per_p = int(b_per_p)
+    target_box = int(target_box)
+    n_pallets = math.ceil(target_box / b_per_p) if b_per_p > 0 and target_box > 0 else 0
+    options = [(name, int(spec["capacity"]), float(spec["cost"]))
+               for name, spec in containers.items() if int(spec["capacity"]) > 0]
+    # Un type sans coût (non renseigné) couvrirait toute la commande
+    # gratuitement : il n'entre dans le mix que si aucun type n'a de coût
+    # (le mix minimise alors le nombre de conteneurs)
+    if any(cost > 0 for _, _, cost in options):
+        options = [o for o in options if o[2] > 0]
+    if n_pallets == 0 or not options:
+        return {"n_pallets": n_pallets, "mix": {}, "cost": 0.0, "containers": [], "feasible": n_pallets == 0}
+
+    # Type au meilleur rapport coût / palette (à égalité : le plus grand)
+    best_idx = min(range(len(options)), key=lambda i: (options[i][2] / options[i][1], -options[i][1]))
+    c_best = options[best_idx][1]
+    max_cap = max(cap for _, cap, _ in options)
+    threshold = c_best * max_cap
+    bulk = 0
+    if n_pallets > threshold:
+        bulk = math.ceil((n_pallets - threshold) / c_best)
+    counts = _cover_dp(n_pallets - bulk * c_best, options)
+    counts[best_idx] += bulk
+
+    mix = {options[i][0]: counts[i] for i in range(len(options)) if counts[i]}
+    cost = sum(counts[i] * options[i][2] for i in range(len(options)))
+
+    # Répartition : les plus grands conteneurs d'abord, remplis au maximum ;
+    # la dernière palette porte le reliquat de box.
+    slots = sorted(((name, cap) for (name, cap, _), n in zip(options, counts) for _ in range(n)),
+                   key=lambda s: -s[1])
+    last_pallet_box = target_box - (n_pallets - 1) * b_per_p
+    remaining = n_pallets
+    detail = []
+    for num, (name, cap) in enumerate(slots, 1):
+        pals = min(cap, remaining)
+        remaining -= pals
+        boxes = pals * b_per_p
+        if remaining == 0 and pals > 0:
+            boxes -= b_per_p - last_pallet_box
+        payload = boxes * w_box + pals * w_pal
+        max_payload = containers[name].get("payload", 0)
+        detail.append({
+            "Conteneur": f"#{num} {name}",
+            "Palettes": pals,
+            "Box": boxes,
+            "Remplissage (%)": pals / cap * 100 if cap else 0.0,
+            "Poids (kg)": payload,
+            "Charge utile (%)": payload / max_payload * 100 if max_payload else 0.0,
+        })
+    return {"n_pallets": n_pallets, "mix": mix, "cost": cost, "containers": detail, "feasible": True}
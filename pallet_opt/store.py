@@ -0,0 +1,227 @@
+# ==========================================
+# STOCKAGE EN COLONNES SUR DISQUE (MEMMAP)
+# ==========================================
+# Résultats de lots et de balayages (plusieurs millions de lignes) écrits
+# dans un dossier : une colonne par fichier .npy et un petit manifest.json
+# (nombre de lignes, types, bornes de chaque colonne, métadonnées).
+#
+#   dossier/
+#     manifest.json
+#     L.npy, W.npy, ...            colonnes
+#     order.<nom>.npy              permutations de tri précalculées
+#
+# L'écriture se fait par blocs (append), puis finalize() fixe le nombre de
+# lignes, calcule les bornes et les permutations de tri demandées. À la
+# lecture, les colonnes sont ouvertes en memmap : une requête (filtres,
+# tri, page) parcourt la permutation et les colonnes par blocs et ne
+# charge que la page demandée. La mémoire d'une session ne dépend pas du
+# nombre de lignes.
+import json
+import os
+import shutil
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+STORE_VERSION = 1
+# Lignes lues à la fois par les requêtes
+DEFAULT_CHUNK = 262144
+
+_OPS = {
+    ">=": np.greater_equal, ">": np.greater, "<=": np.less_equal, "<": np.less,
+    "==": np.equal, "!=": np.not_equal,
+}
+
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.npy")
+
+
+def _order_path(path, name):
+    return os.path.join(path, f"order.{name}.npy")
+
+
+class StoreWriter:
+    def __init__(self, path, schema, meta=None):
+        # schema : {colonne: dtype NumPy} ; un dossier existant est remplacé
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        self.path = path
+        self.schema = {name: np.dtype(dtype) for name, dtype in schema.items()}
+        self.meta = meta or {}
+        self.rows = 0
+        # Données brutes ajoutées à la suite, converties en .npy par finalize
+        self._raw = {name: open(os.path.join(path, f"{name}.raw"), "wb") for name in self.schema}
+
+    def append(self, columns):
+        # columns : {colonne: tableau}, toutes les colonnes du schéma, même longueur
+        lengths = {len(columns[name]) for name in self.schema}
+        if len(lengths) != 1:
+            raise ValueError(f"colonnes de longueurs différentes : {sorted(lengths)}")
+        for name, dtype in self.schema.items():
+            np.ascontiguousarray(columns[name], dtype=dtype).tofile(self._raw[name])
+        self.rows += lengths.pop()
+
+    def finalize(self, orders=None, chunk_size=DEFAULT_CHUNK):
+        # orders : {nom: [(colonne, décroissant), ...]} : permutations de tri
+        # (première clé principale, les suivantes départagent ; tri stable)
+        columns = {}
+        for name, dtype in self.schema.items():
+            raw = self._raw.pop(name)
+            raw.close()
+            lo = hi = None
+            if not self.rows:
+                np.save(_column_path(self.path, name), np.empty(0, dtype))
+                os.remove(raw.name)
+                columns[name] = {"dtype": dtype.str, "min": lo, "max": hi}
+                continue
+            src = np.memmap(raw.name, dtype=dtype, mode="r", shape=(self.rows,))
+            dst = np.lib.format.open_memmap(_column_path(self.path, name), mode="w+", dtype=dtype, shape=(self.rows,))
+            for start in range(0, self.rows, chunk_size):
+                block = np.asarray(src[start:start + chunk_size])
+                dst[start:start + len(block)] = block
+                if block.dtype.kind in "iuf":
+                    b_lo, b_hi = block.min().item(), block.max().item()
+                    lo = b_lo if lo is None else min(lo, b_lo)
+                    hi = b_hi if hi is None else max(hi, b_hi)
+            dst.flush()
+            del src, dst
+            os.remove(raw.name)
+            columns[name] = {"dtype": dtype.str, "min": lo, "max": hi}
+
+        store = ColumnStore(self.path, _manifest={"version": STORE_VERSION, "rows": self.rows, "columns": columns,
+                                                  "orders": {}, "meta": self.meta})
+        for name, keys in (orders or {}).items():
+            # np.lexsort : dernière clé principale ; décroissant par négation
+            # (stable, les ex aequo restent dans l'ordre des clés suivantes)
+            lex = []
+            for column, descending in reversed(keys):
+                values = np.asarray(store.column(column))
+                lex.append(-values if descending else values)
+            perm = np.lexsort(lex) if lex and self.rows else np.arange(self.rows)
+            np.save(_order_path(self.path, name), perm.astype(np.int64 if self.rows >= 2 ** 31 else np.int32))
+            store.manifest["orders"][name] = [[column, bool(descending)] for column, descending in keys]
+        with open(os.path.join(self.path, MANIFEST), "w", encoding="utf-8") as fh:
+            json.dump(store.manifest, fh, indent=1)
+        return ColumnStore(self.path)
+
+    def abort(self):
+        for raw in self._raw.values():
+            raw.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class ColumnStore:
+    def __init__(self, path, _manifest=None):
+        self.path = path
+        if _manifest is None:
+            with open(os.path.join(path, MANIFEST), encoding="utf-8") as fh:
+                _manifest = json.load(fh)
+            if _manifest.get("version") != STORE_VERSION:
+                raise ValueError(f"version de stockage non prise en charge : {_manifest.get('version')}")
+        self.manifest = _manifest
+        self._columns = {}
+
+    @classmethod
+    def create(cls, path, schema, meta=None):
+        return StoreWriter(path, schema, meta)
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    @property
+    def meta(self):
+        return self.manifest["meta"]
+
+    def bounds(self, name):
+        spec = self.manifest["columns"][name]
+        return spec["min"], spec["max"]
+
+    def column(self, name):
+        # Colonne complète en memmap (lecture seule) : rien n'est chargé avant l'accès
+        if name not in self._columns:
+            if name not in self.manifest["columns"]:
+                raise KeyError(name)
+            self._columns[name] = np.load(_column_path(self.path, name), mmap_mode="r") if len(self) else \
+                np.empty(0, np.dtype(self.manifest["columns"][name]["dtype"]))
+        return self._columns[name]
+
+    def order(self, name):
+        if name not in self.manifest["orders"]:
+            raise ValueError(f"tri non précalculé : {name!r} ({', '.join(self.manifest['orders'])})")
+        return np.load(_order_path(self.path, name), mmap_mode="r") if len(self) else np.empty(0, np.int32)
+
+    def query(self, where=(), order=None, chunk_size=DEFAULT_CHUNK):
+        return Query(self, where, order, chunk_size)
+
+    def close(self):
+        self._columns.clear()
+
+    def delete(self):
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class Query:
+    # where : [(colonne, opérateur, valeur)] combinés par "et" ; order : nom
+    # d'un tri précalculé (None : ordre d'écriture)
+    def __init__(self, store, where=(), order=None, chunk_size=DEFAULT_CHUNK):
+        self.store = store
+        self.where = [(column, _OPS[op], value) for column, op, value in where]
+        for column, _, _ in self.where:
+            store.column(column)
+        self.perm = store.order(order) if order is not None else None
+        self.chunk_size = chunk_size
+        # (position dans l'ordre, lignes retenues avant) en début de bloc :
+        # une page lointaine reprend au dernier point connu
+        self._marks = [(0, 0)]
+        self._count = None
+
+    def _blocks(self, start=0):
+        # (position, index des lignes retenues du bloc), dans l'ordre demandé
+        n = len(self.store)
+        for pos in range(start, n, self.chunk_size):
+            stop = min(pos + self.chunk_size, n)
+            idx = np.asarray(self.perm[pos:stop]) if self.perm is not None else np.arange(pos, stop)
+            if self.where:
+                # Lecture triée (accès séquentiel au fichier), puis ordre d'origine
+                sorted_idx = np.sort(idx) if self.perm is not None else idx
+                keep = np.ones(len(idx), dtype=bool)
+                for column, op, value in self.where:
+                    keep &= op(self.store.column(column)[sorted_idx], value)
+                if self.perm is not None:
+                    keep = keep[np.searchsorted(sorted_idx, idx)]
+                idx = idx[keep]
+            yield pos, idx
+
+    def count(self):
+        if self._count is None:
+            if not self.where:
+                self._count = len(self.store)
+            else:
+                self._count = sum(len(idx) for _, idx in self._blocks())
+        return self._count
+
+    def indices(self, offset=0, limit=50):
+        # Index des lignes offset .. offset + limit du résultat
+        start, seen = max(m for m in self._marks if m[1] <= offset)
+        out = []
+        for pos, idx in self._blocks(start):
+            if (pos, seen) not in self._marks:
+                self._marks.append((pos, seen))
+            if seen + len(idx) > offset:
+                out.append(idx[max(0, offset - seen):])
+                if sum(len(o) for o in out) >= limit:
+                    break
+            seen += len(idx)
+        return np.concatenate(out)[:limit] if out else np.empty(0, dtype=np.int64)
+
+    def page(self, offset=0, limit=50, columns=None):
+        # {colonne: tableau} pour la page demandée (lecture des seules lignes visibles)
+        idx = self.indices(offset, limit)
+        return {name: np.asarray(self.store.column(name)[idx]) for name in (columns or self.store.columns)}
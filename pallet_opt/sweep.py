@@ -0,0 +1,318 @@
+# ==========================================
+# BALAYAGE DES DIMENSIONS DE CARTON (VECTORISÉ)
+# ==========================================
+# Pour un volume intérieur fixé, évalue toute une grille de cartons
+# candidats (L, W libres, H déduit du volume) et compte les box par palette
+# et par conteneur. Les règles sont celles de core.solve_pallet (grille
+# simple, meilleure orientation, plafond de poids) et de
+# containers.professional_load_calc (palettes gerbées, charge utile) ;
+# les couches mixtes de layers.py ne sont pas prises en compte ici, la
+# page recalcule les meilleurs candidats avec le solveur complet.
+#
+# Les 6 orientations ne demandent que 9 divisions par palette : nx, ny et
+# le nombre de couches ne dépendent que de la dimension placée sur chaque
+# axe, pas de l'orientation complète.
+#
+# sweep_store écrit les candidats bloc par bloc dans un stockage en colonnes
+# sur disque (store.py) au lieu de tout garder en mémoire ; le classement et
+# la carte lisent indifféremment un résultat en mémoire ou ce stockage.
+import math
+
+import numpy as np
+
+from .core import ORIENTATIONS
+from .containers import CONTAINER_TYPES, floor_layout
+from .store import StoreWriter
+
+# Candidats traités à la fois (tableaux (3, n) d'entiers et de flottants)
+DEFAULT_CHUNK = 250000
+# Jeu entre le haut de la pile de palettes et le plafond (cf. apply_load)
+CEILING_CLEARANCE = 5
+
+
+def iter_candidate_boxes(volume, l_range, w_range, step=0.5, h_step=0.1, h_range=(0.0, math.inf),
+                         chunk_size=DEFAULT_CHUNK):
+    # volume en cm3 ; l_range / w_range : (min, max) en cm. Une seule des
+    # permutations (L >= W) est gardée : les 6 orientations sont de toute
+    # façon évaluées. H est arrondi au pas supérieur (volume >= cible).
+    # Blocs d'environ chunk_size candidats (quelques longueurs à la fois).
+    if volume <= 0 or step <= 0 or h_step <= 0:
+        raise ValueError("volume, step et h_step doivent être positifs")
+    ls = np.round(np.arange(l_range[0], l_range[1] + step / 2, step), 6)
+    ws = np.round(np.arange(w_range[0], w_range[1] + step / 2, step), 6)
+    ls, ws = ls[ls > 0], ws[ws > 0]
+    per = max(1, chunk_size // max(1, len(ws)))
+    for start in range(0, len(ls), per):
+        L, W = (a.ravel() for a in np.meshgrid(ls[start:start + per], ws, indexing="ij"))
+        keep = L >= W
+        L, W = L[keep], W[keep]
+        H = np.round(np.ceil(np.round(volume / (L * W) / h_step, 6)) * h_step, 6)
+        keep = (H >= h_range[0]) & (H <= h_range[1])
+        yield np.column_stack([L[keep], W[keep], H[keep]])
+
+
+def candidate_boxes(volume, l_range, w_range, step=0.5, h_step=0.1, h_range=(0.0, math.inf)):
+    blocks = list(iter_candidate_boxes(volume, l_range, w_range, step, h_step, h_range))
+    return np.concatenate(blocks) if blocks else np.empty((0, 3))
+
+
+def _best_grid(dims, pal_L, pal_w, pal_H, pal_p_max, box_poids):
+    # dims (3, n) -> total, nb de couches et hauteur de box de la meilleure
+    # orientation (la première en cas d'égalité, comme best_result)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q_L = np.trunc(pal_L / dims).astype(np.int64)
+        q_w = np.trunc(pal_w / dims).astype(np.int64)
+        q_H = np.trunc(pal_H / dims).astype(np.int64)
+    max_p = int(pal_p_max / box_poids) if box_poids > 0 else None
+    n = dims.shape[1]
+    total = np.full(n, -1, dtype=np.int64)
+    layers = np.zeros(n, dtype=np.int64)
+    height = np.zeros(n, dtype=np.float64)
+    for a, b, c in ORIENTATIONS:
+        pc = q_L[a] * q_w[b]
+        t = pc * q_H[c]
+        if max_p is not None:
+            t = np.minimum(t, max_p)
+        better = t > total
+        total = np.where(better, t, total)
+        layers = np.where(better, np.where(pc > 0, t // np.where(pc > 0, pc, 1), 0), layers)
+        height = np.where(better, dims[c], height)
+    return total, layers, height
+
+
+def _container_boxes(total, layers, height, floor, cont_H, max_load, box_poids, base_height, pallet_weight):
+    # professional_load_calc avec p_H = hauteur chargée + support, par candidat
+    # (hauteur nulle : couche incomplète sans support, une seule rangée)
+    p_H = layers * height + base_height
+    with np.errstate(divide="ignore", invalid="ignore"):
+        levels = np.trunc((cont_H - CEILING_CLEARANCE) / np.where(p_H > 0, p_H, np.inf))
+    levels = np.maximum(1, levels).astype(np.int64)
+    pallets = floor * levels
+    gross = total * box_poids + pallet_weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_weight = np.trunc(max_load / np.where(gross > 0, gross, 1)).astype(np.int64)
+    pallets = np.where(gross > 0, np.minimum(pallets, by_weight), pallets)
+    return np.where(total > 0, pallets * total, 0)
+
+
+def evaluate(boxes, pallets, containers=(), box_poids=0.0, base_height=15.0, pallet_weight=25.0,
+             chunk_size=DEFAULT_CHUNK):
+    # boxes (n, 3) ; pallets : {nom: (pal_L, pal_w, pal_H, pal_p_max)} ;
+    # containers : noms de CONTAINER_TYPES. Renvoie des colonnes NumPy :
+    # {"boxes", "pallets": {nom: box par palette},
+    #  "containers": {nom: box par conteneur}, "container_pallet": {nom: index de la palette retenue}}
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 3)
+    n = boxes.shape[0]
+    names = list(pallets)
+    pallet_out = {name: np.empty(n, dtype=np.int64) for name in names}
+    cont_out = {name: np.zeros(n, dtype=np.int64) for name in containers}
+    cont_pick = {name: np.zeros(n, dtype=np.int8) for name in containers}
+    # Plan au sol calculé une seule fois par couple (conteneur, palette)
+    floors = {(c, p): floor_layout(CONTAINER_TYPES[c]["L"], CONTAINER_TYPES[c]["W"],
+                                   pallets[p][0], pallets[p][1])["palettes_sol"]
+              for c in containers for p in names}
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        dims = boxes[start:stop].T
+        for k, name in enumerate(names):
+            total, layers, height = _best_grid(dims, *pallets[name], box_poids)
+            pallet_out[name][start:stop] = total
+            for cont in containers:
+                spec = CONTAINER_TYPES[cont]
+                count = _container_boxes(total, layers, height, floors[cont, name], spec["H"], spec["MaxPayload"],
+                                         box_poids, base_height, pallet_weight)
+                better = count > cont_out[cont][start:stop]
+                cont_out[cont][start:stop] = np.where(better, count, cont_out[cont][start:stop])
+                cont_pick[cont][start:stop] = np.where(better, k, cont_pick[cont][start:stop])
+    return {"boxes": boxes, "pallet_names": names, "pallets": pallet_out,
+            "containers": cont_out, "container_pallet": cont_pick}
+
+
+def sweep(volume, l_range, w_range, pallets, containers=(), step=0.5, h_step=0.1, h_range=(0.0, math.inf),
+          box_poids=0.0, base_height=15.0, pallet_weight=25.0):
+    boxes = candidate_boxes(volume, l_range, w_range, step, h_step, h_range)
+    return evaluate(boxes, pallets, containers, box_poids, base_height, pallet_weight)
+
+
+def surface(boxes):
+    # Surface de carton (cm2) : départage les candidats à nombre égal
+    L, W, H = boxes.T
+    return 2 * (L * W + L * H + W * H)
+
+
+# ==========================================
+# STOCKAGE SUR DISQUE
+# ==========================================
+def target_column(result, kind, name):
+    # Colonne des box par palette / conteneur : "pallet.0", "container.2"...
+    names = _names(result)[0 if kind == "pallet" else 1]
+    return f"{kind}.{names.index(name)}"
+
+
+def _names(result):
+    if isinstance(result, dict):
+        return result["pallet_names"], list(result["containers"])
+    return result.meta["pallet_names"], result.meta["containers"]
+
+
+def _view(result):
+    # (fonction colonne -> tableau, stockage ou None) : un résultat en
+    # mémoire (evaluate) est vu avec les noms de colonnes du stockage
+    if not isinstance(result, dict):
+        return result.column, result
+    boxes = result["boxes"]
+    columns = {"L": boxes[:, 0], "W": boxes[:, 1], "H": boxes[:, 2]}
+    columns.update({f"pallet.{i}": result["pallets"][n] for i, n in enumerate(result["pallet_names"])})
+    columns.update({f"container.{j}": v for j, v in enumerate(result["containers"].values())})
+    return columns.__getitem__, None
+
+
+def _store_columns(result, pallets):
+    # Bloc d'evaluate -> colonnes du stockage, avec les taux de remplissage
+    # (volume des box / volume de la palette ou du conteneur, en %)
+    boxes = result["boxes"]
+    volume = boxes[:, 0] * boxes[:, 1] * boxes[:, 2]
+    out = {"L": boxes[:, 0], "W": boxes[:, 1], "H": boxes[:, 2], "surface": surface(boxes)}
+    for i, name in enumerate(result["pallet_names"]):
+        pal_L, pal_w, pal_H = pallets[name][:3]
+        counts = result["pallets"][name]
+        out[f"pallet.{i}"] = counts
+        out[f"fill.pallet.{i}"] = counts * volume / (pal_L * pal_w * pal_H) * 100 if pal_L * pal_w * pal_H > 0 else 0 * volume
+    for j, (name, counts) in enumerate(result["containers"].items()):
+        spec = CONTAINER_TYPES[name]
+        out[f"container.{j}"] = counts
+        out[f"fill.container.{j}"] = counts * volume / (spec["L"] * spec["W"] * spec["H"]) * 100
+        out[f"pick.{j}"] = result["container_pallet"][name]
+    return out
+
+
+def sweep_store(path, volume, l_range, w_range, pallets, containers=(), step=0.5, h_step=0.1, h_range=(0.0, math.inf),
+                box_poids=0.0, base_height=15.0, pallet_weight=25.0, chunk_size=DEFAULT_CHUNK):
+    # Même calcul que sweep, écrit bloc par bloc dans le dossier path (voir
+    # store.py). Colonnes : L, W, H, surface, pallet.i / fill.pallet.i (box
+    # et remplissage % par palette), container.j / fill.container.j /
+    # pick.j (palette retenue). Un tri précalculé par colonne de box : plus
+    # de box d'abord, puis moins de carton (comme ranking).
+    names, containers = list(pallets), list(containers)
+    schema = {"L": "f8", "W": "f8", "H": "f8", "surface": "f8"}
+    for i in range(len(names)):
+        schema.update({f"pallet.{i}": "i4", f"fill.pallet.{i}": "f4"})
+    for j in range(len(containers)):
+        schema.update({f"container.{j}": "i4", f"fill.container.{j}": "f4", f"pick.{j}": "i1"})
+    meta = {"kind": "sweep", "volume": volume, "pallet_names": names, "pallets": {n: list(pallets[n]) for n in names},
+            "containers": containers, "box_poids": box_poids, "base_height": base_height, "pallet_weight": pallet_weight}
+    writer = StoreWriter(path, schema, meta)
+    try:
+        for boxes in iter_candidate_boxes(volume, l_range, w_range, step, h_step, h_range, chunk_size):
+            result = evaluate(boxes, pallets, containers, box_poids, base_height, pallet_weight, chunk_size)
+            writer.append(_store_columns(result, pallets))
+        targets = [f"pallet.{i}" for i in range(len(names))] + [f"container.{j}" for j in range(len(containers))]
+        return writer.finalize({col: [(col, True), ("surface", False)] for col in targets})
+    except BaseException:
+        writer.abort()
+        raise
+
+
+# ==========================================
+# CLASSEMENT ET CARTE
+# ==========================================
+
+
+def ranking(result, kind, name, top=20, chunk_size=DEFAULT_CHUNK):
+    # Meilleurs candidats pour une palette ou un conteneur : plus de box
+    # d'abord, puis moins de carton. Les permutations d'un même carton (H
+    # déduit du volume peut dépasser L) ne sont listées qu'une fois. Sur un
+    # stockage, le tri précalculé est lu bloc par bloc jusqu'au top.
+    column, store = _view(result)
+    key = target_column(result, kind, name)
+    pallet_names, containers = _names(result)
+    if store is None:
+        blocks = [np.lexsort((surface(result["boxes"]), -column(key)))]
+    else:
+        perm = store.order(key)
+        blocks = (np.asarray(perm[i:i + chunk_size]) for i in range(0, len(perm), chunk_size))
+    rows, seen = [], set()
+    for block in blocks:
+        for i in block:
+            if len(rows) >= top:
+                return rows
+            box = (float(column("L")[i]), float(column("W")[i]), float(column("H")[i]))
+            if tuple(sorted(box)) in seen:
+                continue
+            seen.add(tuple(sorted(box)))
+            row = {"L": box[0], "W": box[1], "H": box[2], "Box": int(column(key)[i])}
+            for k, pal in enumerate(pallet_names):
+                row[pal] = int(column(f"pallet.{k}")[i])
+            for k, cont in enumerate(containers):
+                row[cont] = int(column(f"container.{k}")[i])
+            rows.append(row)
+    return rows
+
+
+def heatmap_data(result, kind, name, bins=60, chunk_size=DEFAULT_CHUNK):
+    # Plan L x W regroupé en bins x bins cases ; chaque case garde son
+    # meilleur candidat (plusieurs millions de points -> quelques milliers).
+    # Parcours par blocs : seuls bins x bins meilleurs sont gardés.
+    column, store = _view(result)
+    counts = column(target_column(result, kind, name))
+    n = len(counts)
+    if not n:
+        return []
+    axes = []
+    for axis in ("L", "W"):
+        lo, hi = store.bounds(axis) if store is not None else (column(axis).min(), column(axis).max())
+        lo, hi = float(lo), float(hi)
+        axes.append((lo, (hi - lo) / bins or 1.0))
+    best = np.full(bins * bins, -1, dtype=np.int64)
+    best_idx = np.zeros(bins * bins, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        block = np.asarray(counts[start:start + chunk_size])
+        cell = np.zeros(len(block), dtype=np.int64)
+        for axis, (lo, width) in zip(("L", "W"), axes):
+            values = np.asarray(column(axis)[start:start + chunk_size])
+            cell = cell * bins + np.minimum(((values - lo) / width).astype(np.int64), bins - 1)
+        # Meilleur du bloc par case (premier en cas d'égalité), puis fusion
+        order = np.lexsort((-block, cell))
+        cells, first = np.unique(cell[order], return_index=True)
+        pick = order[first]
+        better = block[pick] > best[cells]
+        best[cells[better]] = block[pick[better]]
+        best_idx[cells[better]] = start + pick[better]
+    rows = []
+    (l0, lw), (w0, ww) = axes
+    for c in np.flatnonzero(best >= 0):
+        ix, iy = divmod(int(c), bins)
+        i = best_idx[c]
+        rows.append({"L0": round(l0 + ix * lw, 2), "L1": round(l0 + (ix + 1) * lw, 2),
+                     "W0": round(w0 + iy * ww, 2), "W1": round(w0 + (iy + 1) * ww, 2),
+                     "L": float(column("L")[i]), "W": float(column("W")[i]), "H": float(column("H")[i]),
+                     "Box": int(best[c])})
+    return rows
+
+
+def heatmap_spec(result, kind, name, bins=60, reference=None):
+    # Spécification vega-lite (st.vega_lite_chart) ; reference : (L, W) du
+    # carton actuel, marqué d'un point
+    layers = [{
+        "mark": {"type": "rect"},
+        "encoding": {
+            "x": {"field": "L0", "type": "quantitative", "title": "Longueur (cm)"},
+            "x2": {"field": "L1"},
+            "y": {"field": "W0", "type": "quantitative", "title": "Largeur (cm)"},
+            "y2": {"field": "W1"},
+            "color": {"field": "Box", "type": "quantitative", "title": "Box", "scale": {"scheme": "oranges"}},
+            "tooltip": [{"field": f, "type": "quantitative"} for f in ("L", "W", "H", "Box")],
+        },
+    }]
+    if reference is not None:
+        layers.append({
+            "data": {"values": [{"L": reference[0], "W": reference[1]}]},
+            "mark": {"type": "point", "shape": "cross", "size": 120, "color": "#2c3e50", "filled": True},
+            "encoding": {"x": {"field": "L", "type": "quantitative"}, "y": {"field": "W", "type": "quantitative"}},
+        })
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": f"{name} : box par {'palette' if kind == 'pallet' else 'conteneur'}",
+        "data": {"values": heatmap_data(result, kind, name, bins)},
+        "layer": layers,
+    }
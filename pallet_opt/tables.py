@@ -0,0 +1,159 @@
+# ==========================================
+# TABLES PRÉCALCULÉES DES COUCHES (PALETTES STANDARDS)
+# ==========================================
+# Pour les palettes EUR (120x80) et ISO (120x100), le nombre de box par
+# couche (moteur de couche mixte, layers.best_layer) est précalculé pour
+# toutes les empreintes de box sur une grille de 5 mm, et stocké dans des
+# fichiers .npy ouverts en mémoire partagée (mmap). Une couche standard
+# devient alors une simple lecture d'index ; les dimensions hors grille ou
+# les palettes personnalisées repassent par le calcul.
+#
+# Construction :  python -m pallet_opt.tables build
+# Vérification :  python -m pallet_opt.tables check
+#
+# Les sols de conteneurs standards sont couverts par loading_table.py.
+import ast
+import mmap
+import os
+import sys
+
+from .layers import MAX_WORK, _layer_solver, to_units
+
+TABLE_DIR = os.environ.get(
+    "PALLET_OPT_TABLES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables_data"),
+)
+
+# Grille des empreintes (mm) : de MIN_DIM à la longueur de la palette
+STEP = 5
+MIN_DIM = 50
+
+# Sols de palettes précalculés (mm)
+STANDARD_PALLETS = [(1200, 800), (1200, 1000)]
+
+_tables = {}
+
+
+def table_path(X, Y):
+    return os.path.join(TABLE_DIR, f"layers_{X}x{Y}_{STEP}mm.npy")
+
+
+def grid_values(X):
+    import numpy as np
+
+    return np.arange(MIN_DIM, X + 1, STEP)
+
+
+class MappedTable:
+    # Table .npy (int16, 2D, ordre C) lue en mmap sans NumPy : mêmes valeurs
+    # que np.load(path, mmap_mode="r") (vérifié par check), mais la
+    # recherche d'une couche ne coûte ni l'import de NumPy (démarrage de la
+    # CLI) ni la lecture du fichier entier.
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:6] != b"\x93NUMPY":
+            raise ValueError(f"{path} : fichier .npy invalide")
+        size = 2 if self._mm[6] == 1 else 4
+        length = int.from_bytes(self._mm[8:8 + size], "little")
+        header = ast.literal_eval(self._mm[8 + size:8 + size + length].decode("latin1"))
+        if header["descr"] != "<i2" or header["fortran_order"] or len(header["shape"]) != 2:
+            raise ValueError(f"{path} : table int16 2D attendue, trouvé {header}")
+        self.shape = tuple(header["shape"])
+        self._offset = 8 + size + length
+
+    def __getitem__(self, index):
+        i, j = index
+        pos = self._offset + 2 * (i * self.shape[1] + j)
+        return int.from_bytes(self._mm[pos:pos + 2], "little", signed=True)
+
+
+def build_table(X, Y):
+    import numpy as np
+
+    dims = grid_values(X)
+    table = np.zeros((len(dims), len(dims)), dtype=np.int16)
+    for i, a in enumerate(dims.tolist()):
+        for j, b in enumerate(dims[:i + 1].tolist()):
+            # Même budget que le calcul en ligne : la table reproduit
+            # exactement la réponse du solveur
+            count = _layer_solver.__wrapped__(X, Y, a, b, MAX_WORK)[0]
+            table[i, j] = table[j, i] = count
+    return table
+
+
+def build(pallets=STANDARD_PALLETS, verbose=False):
+    import numpy as np
+
+    os.makedirs(TABLE_DIR, exist_ok=True)
+    for X, Y in pallets:
+        table = build_table(X, Y)
+        tmp = table_path(X, Y) + ".tmp.npy"
+        np.save(tmp, table)
+        os.replace(tmp, table_path(X, Y))
+        _tables.pop((X, Y), None)
+        if verbose:
+            print(f"{table_path(X, Y)} : {table.shape[0]}x{table.shape[1]}")
+
+
+def load_table(X, Y):
+    # Ouverture paresseuse en mmap : les pages ne sont lues qu'à l'accès et
+    # sont partagées entre sessions et processus par le cache du système.
+    if (X, Y) not in _tables:
+        path = table_path(X, Y)
+        _tables[(X, Y)] = MappedTable(path) if os.path.exists(path) else None
+    return _tables[(X, Y)]
+
+
+def lookup_units(X, Y, a, b):
+    # Nombre de box par couche en unités mm, ou None si hors table
+    if (X, Y) not in STANDARD_PALLETS:
+        return None
+    if a % STEP or b % STEP or min(a, b) < MIN_DIM or max(a, b) > X:
+        return None
+    table = load_table(X, Y)
+    if table is None:
+        return None
+    return int(table[(a - MIN_DIM) // STEP, (b - MIN_DIM) // STEP])
+
+
+def lookup(pal_L, pal_w, bl, bw):
+    X, Y = to_units(pal_L), to_units(pal_w)
+    return lookup_units(X, Y, to_units(bl, up=True), to_units(bw, up=True))
+
+
+def check(samples=2000, seed=0):
+    # Compare un échantillon de la table au solveur en ligne, et la lecture
+    # MappedTable à np.load(mmap_mode="r")
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    mismatches = []
+    for X, Y in STANDARD_PALLETS:
+        table = load_table(X, Y)
+        if table is None:
+            raise FileNotFoundError(f"Table absente : {table_path(X, Y)} (lancer 'python -m pallet_opt.tables build')")
+        mapped = np.load(table_path(X, Y), mmap_mode="r")
+        if mapped.shape != table.shape:
+            raise ValueError(f"{table_path(X, Y)} : forme {table.shape} lue, {mapped.shape} attendue")
+        dims = grid_values(X)
+        for i, j in rng.integers(0, len(dims), size=(samples, 2)).tolist():
+            a, b = int(dims[i]), int(dims[j])
+            live = _layer_solver.__wrapped__(X, Y, max(a, b), min(a, b), MAX_WORK)[0]
+            if int(table[i, j]) != live or int(mapped[i, j]) != live:
+                mismatches.append((X, Y, a, b, int(table[i, j]), live))
+    return mismatches
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "build":
+        build(verbose=True)
+    elif command == "check":
+        bad = check()
+        for row in bad[:20]:
+            print("Écart (X, Y, a, b, table, solveur) :", row)
+        print("OK" if not bad else f"{len(bad)} écarts")
+        sys.exit(1 if bad else 0)
+    else:
+        sys.exit("usage : python -m pallet_opt.tables [build|check]")